@@ -53,10 +53,20 @@ export default function App() {
   useEffect(() => {
     const fetchVideos = async () => {
       try {
-        const response = await fetch('http://localhost:8000/video/feed');
-        if (response.ok) {
+        // The feed is paged; follow next_cursor until every video is loaded
+        const feedVideos: any[] = [];
+        let cursor: string | null = null;
+        do {
+          const params = new URLSearchParams({ limit: '100' });
+          if (cursor) params.set('cursor', cursor);
+          const response = await fetch(`http://localhost:8000/video/feed?${params}`);
+          if (!response.ok) break;
           const data = await response.json();
-          const mappedVideos: Video[] = data.videos.map((v: any) => ({
+          feedVideos.push(...data.videos);
+          cursor = data.next_cursor;
+        } while (cursor);
+        if (feedVideos.length > 0) {
+          const mappedVideos: Video[] = feedVideos.map((v: any) => ({
             id: v.video_id,
             title: v.lecture_title,
             url: v.lecture_url || '',
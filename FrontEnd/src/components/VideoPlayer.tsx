@@ -470,7 +470,7 @@ export function VideoPlayer({ video, onBack }: VideoPlayerProps) {
                   ) : (
                     <video
                       ref={panoptoVideoRef}
-                      src={videoFilename ? `/videos/${videoFilename}` : '/videos/lecture.mp4'}
+                      src={videoFilename ? `http://localhost:8000/video/${video.id}/stream` : '/videos/lecture.mp4'}
                       controls
                       className="w-full h-full bg-black"
                       onTimeUpdate={() => {
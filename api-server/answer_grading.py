@@ -0,0 +1,86 @@
+import re
+from typing import Any, Dict, Optional, Tuple
+
+_OPTION_PREFIX = re.compile(r'^\(?([A-Za-z])[\).:]?(\s|$)')
+_NON_WORD = re.compile(r'[^\w\s]')
+# Longest first, so "ations" is stripped before "s"
+_SUFFIXES = ('ational', 'ations', 'ation', 'ings', 'ing', 'edly', 'ies', 'ied', 'ed', 'es', 'ly', 's')
+
+
+def _stem(word: str) -> str:
+    if word.endswith('ss'):
+        # "process" and "processes" should meet at "process"
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def normalize_answer(answer: str) -> str:
+    """
+    Canonical form of a free-text answer for memoizing verdicts: lowercase, punctuation removed,
+    whitespace collapsed and common English suffixes stripped, e.g. "Sorting, arrays!" -> "sort array".
+    """
+    words = _NON_WORD.sub(' ', answer.lower()).split()
+    return ' '.join(_stem(word) for word in words)
+
+
+def _plain(text: str) -> str:
+    """Lowercase with punctuation removed and whitespace collapsed, for comparing option texts."""
+    return ' '.join(_NON_WORD.sub(' ', text.lower()).split())
+
+
+def mcq_choice(question: Dict[str, Any], user_answer: str) -> Optional[str]:
+    """
+    The option id a user picked, accepting the id itself ("b", "B)", "(b)"), the option text ("Paris.")
+    or both ("B. Paris"). A letter followed by other text only counts when that text is the option's.
+    Returns None when the answer matches no option.
+    """
+    answer = user_answer.strip()
+    plain_answer = _plain(answer)
+    options = question.get('options') or []
+    option_texts = {str(opt.get('id', '')).upper(): _plain(str(opt.get('text', ''))) for opt in options}
+
+    if plain_answer.upper() in option_texts:
+        return plain_answer.upper()
+    for option_id, text in option_texts.items():
+        if text and plain_answer == text:
+            return option_id
+    match = _OPTION_PREFIX.match(answer)
+    if match:
+        option_id = match.group(1).upper()
+        if option_id in option_texts and _plain(answer[match.end():]) == option_texts[option_id]:
+            return option_id
+    # Quizzes without stored options still compare by letter
+    return plain_answer.upper() if not options else None
+
+
+def grade_mcq(question: Dict[str, Any], user_answer: str) -> Tuple[bool, str]:
+    """Grade a multiple choice answer locally, with feedback built from the stored explanation."""
+    correct_id = str(question.get('answer', '')).strip().upper()
+    is_correct = mcq_choice(question, user_answer) == correct_id
+    explanation = question.get('explanation', '')
+
+    if is_correct:
+        return True, f"Correct! {explanation}".strip()
+
+    correct_text = next(
+        (opt.get('text', '') for opt in question.get('options') or [] if str(opt.get('id', '')).upper() == correct_id),
+        ''
+    )
+    correct_label = f"{correct_id}) {correct_text}" if correct_text else correct_id
+    return False, f"Not quite. The correct answer is {correct_label}. {explanation}".strip()
+
+
+def grade_short_answer_leniently(correct_answer: str, user_answer: str) -> Tuple[bool, str]:
+    """Word-overlap comparison used when the validation service cannot grade a short answer."""
+    user_words = set(w.lower() for w in user_answer.split() if len(w) > 2)
+    correct_words = set(w.lower() for w in correct_answer.split() if len(w) > 2)
+    overlap = user_words & correct_words
+    # Check for substring matches or stem matches
+    has_overlap = len(overlap) > 0
+    has_substring = user_answer.lower()[:15] in correct_answer.lower() or correct_answer.lower()[:15] in user_answer.lower()
+    has_stem_match = any(uw in cw or cw in uw for uw in user_words for cw in correct_words)
+    is_correct = has_overlap or has_substring or has_stem_match
+    return is_correct, "Good answer!" if is_correct else f"The expected answer was: {correct_answer}"
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+_MISSING = object()
+
+# Stats of every named cache, so hit rates can be reported in one place
+_cache_stats: Dict[str, "CacheStats"] = {}
+
+
+class CacheStats:
+    """Hit/miss counters for a named cache or cache-like lookup."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.size_fn = None
+        _cache_stats[name] = self
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+        if self.size_fn is not None:
+            stats['size'] = self.size_fn()
+        return stats
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with an optional per-entry TTL and hit/miss counters.
+    Entries past maxsize are evicted least recently used first; entries older than ttl_seconds are treated as misses.
+    """
+
+    def __init__(self, name: str, maxsize: int = 256, ttl_seconds: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats(name)
+        self.stats.size_fn = self.__len__
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, stored_at = entry
+                if self.ttl_seconds is None or time.monotonic() - stored_at < self.ttl_seconds:
+                    self._data.move_to_end(key)
+                    self.stats.record(hit=True)
+                    return value
+                del self._data[key]
+            self.stats.record(hit=False)
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hits, misses and hit rate for every cache created in this process, keyed by cache name."""
+    return {name: stats.as_dict() for name, stats in _cache_stats.items()}
+
+
+def all_cache_stats() -> List["CacheStats"]:
+    return list(_cache_stats.values())
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Optional, List, Dict
 from pydantic import BaseModel
 
 
@@ -7,6 +7,14 @@ class LectureRequest(BaseModel):
     lecture_title: str
     lecture_topic: str
     video_filename: Optional[str] = None
+    pregenerate_quizzes: Optional[bool] = None  # generate every segment's quiz after ingestion; server default if unset
+
+
+class BatchLectureRequest(BaseModel):
+    """Request for processing several lectures, e.g. a whole module, at batch priority."""
+    lectures: List[LectureRequest]
+    batch_title: Optional[str] = None
+    max_concurrency: int = 1  # Jobs from this batch allowed to run at once (capped server-side)
 
 
 # Quiz-related models
@@ -47,12 +55,33 @@ class JobStatusResponse(BaseModel):
     created_at: str
     completed_at: Optional[str] = None
     failed_at: Optional[str] = None
+    cancelled_at: Optional[str] = None
     error: Optional[str] = None
+    stage_seconds: Optional[Dict[str, float]] = None  # Time spent in each pipeline stage so far
+    quiz_pregeneration: Optional[Dict[str, Any]] = None  # status, total, completed and failed segment quizzes
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    batch_title: Optional[str] = None
+    status: str
+    created_at: str
+    total_jobs: int
+    finished_jobs: int
+    progress: float
+    status_counts: Dict[str, int]
+    jobs: List[JobStatusResponse]
+
+class JobListResponse(BaseModel):
+    jobs: List[JobStatusResponse]
+    total: int
+    offset: int
+    limit: int
 
 class SegmentQuestionsRequest(BaseModel):
     video_id: str
     segment_id: int
     num_questions: int = 3
+    fresh: bool = False  # bypass the content-hash cache and always generate a new quiz
 
 class VideoQuestionsRequest(BaseModel):
     video_id: str
@@ -104,4 +133,25 @@ class AnswerValidationResponse(BaseModel):
     user_answer: str
     correct_answer: str
     feedback: str
-    explanation: str
\ No newline at end of file
+    explanation: str
+
+
+class QuestionAnswer(BaseModel):
+    question_number: int
+    user_answer: str
+
+
+class BatchAnswerSubmission(BaseModel):
+    """Request for submitting every answer to a quiz at once."""
+    video_id: str
+    quiz_id: str
+    answers: List[QuestionAnswer]
+
+
+class BatchAnswerValidationResponse(BaseModel):
+    """Per-question results for a whole-quiz submission."""
+    video_id: str
+    quiz_id: str
+    total_questions: int
+    correct_count: int
+    results: List[AnswerValidationResponse]
\ No newline at end of file
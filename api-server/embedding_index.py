@@ -0,0 +1,134 @@
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from search_index import tokenize
+
+EMBEDDING_DIM = 1024
+WINDOW_SECONDS = 30.0
+
+
+def _feature(token: str):
+    """Stable (index, sign) for a token; crc32 rather than hash() so saved matrices stay valid across processes."""
+    h = zlib.crc32(token.encode('utf-8'))
+    return h % EMBEDDING_DIM, 1.0 if (h >> 31) & 1 else -1.0
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    L2-normalized hashed bag-of-words vectors (unigrams and bigrams, sublinear tf), one row per text.
+    A CPU-only stand-in for a sentence embedding model: cheap, deterministic and good at lexical overlap.
+    """
+    vectors = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        terms = tokenize(text)
+        features = Counter(terms)
+        features.update(f"{a} {b}" for a, b in zip(terms, terms[1:]))
+        for feature, tf in features.items():
+            index, sign = _feature(feature)
+            vectors[row, index] += sign * (1.0 + math.log(tf))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def build_windows(segments: List[Dict[str, Any]], window_seconds: float = WINDOW_SECONDS) -> List[Dict[str, Any]]:
+    """Consecutive transcript entries of each segment grouped into windows of about window_seconds."""
+    windows = []
+    for segment in segments:
+        current = None
+        for entry in segment.get('transcript') or []:
+            start = entry.get('start_timestamp', 0.0)
+            if current is None or start - current['start'] >= window_seconds:
+                current = {'segment_number': segment.get('segment_number'), 'start': start, 'end': start, 'texts': []}
+                windows.append(current)
+            current['end'] = entry.get('end_timestamp', start)
+            current['texts'].append(entry.get('text', '').strip())
+    return [{
+        'segment_number': w['segment_number'],
+        'start': w['start'],
+        'end': w['end'],
+        'text': ' '.join(t for t in w['texts'] if t)
+    } for w in windows]
+
+
+class VideoEmbeddingIndex:
+    """Transcript windows of one video and their embedding matrix, for top-k cosine retrieval."""
+
+    def __init__(self, segment_numbers: np.ndarray, starts: np.ndarray, ends: np.ndarray, texts: np.ndarray,
+                 vectors: np.ndarray):
+        self.segment_numbers = segment_numbers
+        self.starts = starts
+        self.ends = ends
+        self.texts = texts
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def build(cls, segments: List[Dict[str, Any]]) -> "VideoEmbeddingIndex":
+        windows = build_windows(segments)
+        return cls(
+            segment_numbers=np.array([w['segment_number'] if w['segment_number'] is not None else -1 for w in windows], dtype=np.int32),
+            starts=np.array([w['start'] for w in windows], dtype=np.float32),
+            ends=np.array([w['end'] for w in windows], dtype=np.float32),
+            texts=np.array([w['text'] for w in windows], dtype=np.str_),
+            vectors=embed_texts([w['text'] for w in windows])
+        )
+
+    def save(self, path: str) -> None:
+        # Write then rename, so a reader never loads a half-written file
+        temp_path = f"{path}.tmp.npz"
+        np.savez_compressed(temp_path, segment_numbers=self.segment_numbers, starts=self.starts, ends=self.ends,
+                            texts=self.texts, vectors=self.vectors)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "VideoEmbeddingIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['segment_numbers'], data['starts'], data['ends'], data['texts'], data['vectors'])
+
+    def top_k(self, query: str, k: int = 3, segment_numbers: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """The k windows most similar to query (optionally only from some segments), in playback order."""
+        if not len(self):
+            return []
+        scores = self.vectors @ embed_texts([query])[0]
+        if segment_numbers is not None:
+            scores = np.where(np.isin(self.segment_numbers, segment_numbers), scores, -np.inf)
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(self.starts[best])]
+        return [{
+            'segment_number': int(self.segment_numbers[i]),
+            'start_timestamp': float(self.starts[i]),
+            'end_timestamp': float(self.ends[i]),
+            'text': str(self.texts[i]),
+            'score': float(scores[i])
+        } for i in best]
+
+
+class EmbeddingIndexStore:
+    """Per-video indexes saved as {directory}/{video_id}.npz at ingestion and loaded on demand."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, video_id: str) -> str:
+        return os.path.join(self.directory, f"{os.path.basename(video_id)}.npz")
+
+    def build_and_save(self, video_id: str, segments: List[Dict[str, Any]]) -> VideoEmbeddingIndex:
+        os.makedirs(self.directory, exist_ok=True)
+        index = VideoEmbeddingIndex.build(segments)
+        index.save(self.path(video_id))
+        return index
+
+    def load(self, video_id: str) -> Optional[VideoEmbeddingIndex]:
+        path = self.path(video_id)
+        return VideoEmbeddingIndex.load(path) if os.path.exists(path) else None
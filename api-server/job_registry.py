@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+
+TERMINAL_JOB_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class JobRegistry:
+    """
+    In-memory job table with bounded size.
+
+    Behaves like the plain dict it replaces (jobs[job_id]['status'] = ...), but finished jobs
+    (completed / failed / cancelled) are evicted once they are older than ttl_seconds, and the
+    oldest finished jobs are evicted first when more than max_jobs entries are held.
+    Jobs that are still running are never evicted. Eviction happens when a job is added, so a
+    job can disappear between two reads: use jobs.get(job_id) where the job may have finished.
+    """
+
+    def __init__(self, max_jobs: int = 1000, ttl_seconds: float = 3600):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # job_id -> monotonic time the job reached a terminal status
+        self._finished_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __setitem__(self, job_id: str, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            self._evict_locked()
+
+    def __getitem__(self, job_id: str) -> Dict[str, Any]:
+        return self._jobs[job_id]
+
+    def __delitem__(self, job_id: str) -> None:
+        with self._lock:
+            del self._jobs[job_id]
+            self._finished_at.pop(job_id, None)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def get(self, job_id: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id, default)
+
+    def evict_expired(self) -> None:
+        with self._lock:
+            self._evict_locked()
+
+    def list(self, status: Optional[str] = None, offset: int = 0, limit: int = 50) -> Tuple[List[Tuple[str, Dict[str, Any]]], int]:
+        """Return (page of (job_id, job) newest first, total matching) optionally filtered by status."""
+        with self._lock:
+            matching = [(job_id, job) for job_id, job in reversed(self._jobs.items())
+                        if status is None or job.get('status') == status]
+        return matching[offset:offset + limit], len(matching)
+
+    def _evict_locked(self) -> None:
+        now = time.monotonic()
+
+        # Oldest first, stopping at the first job that has not expired, so adding a job does not walk the table
+        while self._jobs:
+            job_id, job = next(iter(self._jobs.items()))
+            finished = self._finished_at_locked(job_id, job, now)
+            if finished is None or now - finished < self.ttl_seconds:
+                break
+            self._drop_locked(job_id)
+
+        if len(self._jobs) > self.max_jobs:
+            # Oldest finished jobs go first, running jobs are kept even above the cap
+            for job_id, job in list(self._jobs.items()):
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                if self._finished_at_locked(job_id, job, now) is not None:
+                    self._drop_locked(job_id)
+
+    def _finished_at_locked(self, job_id: str, job: Dict[str, Any], now: float) -> Optional[float]:
+        """When the job was first seen finished, or None if it is still running."""
+        # Jobs move to a terminal status in place (jobs[id]['status'] = ...), so pick that up here
+        if job.get('status') in TERMINAL_JOB_STATUSES:
+            return self._finished_at.setdefault(job_id, now)
+        self._finished_at.pop(job_id, None)
+        return None
+
+    def _drop_locked(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._finished_at.pop(job_id, None)
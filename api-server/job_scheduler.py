@@ -0,0 +1,61 @@
+import asyncio
+import itertools
+from typing import Awaitable, Callable, List, Optional
+
+# Lower value runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+
+class JobScheduler:
+    """
+    Runs lecture jobs on a fixed number of worker tasks, taking the highest priority job first
+    (FIFO within the same priority). Single submissions use PRIORITY_INTERACTIVE so they
+    overtake queued batch work.
+    """
+
+    def __init__(self, max_concurrent_jobs: int = 2):
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the worker tasks, must be called from the running event loop."""
+        if self._workers:
+            return
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrent_jobs)]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, run_job: Callable[[], Awaitable[None]], priority: int = PRIORITY_INTERACTIVE) -> asyncio.Future:
+        """Queue run_job and return a future that resolves once it has finished running."""
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        if not self._workers:
+            self.start()
+        done = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((priority, next(self._sequence), run_job, done))
+        return done
+
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, run_job, done = await self._queue.get()
+            try:
+                await run_job()
+            except Exception as e:
+                # Jobs record their own failures, this only keeps the worker alive
+                print(f"Scheduled job raised: {e}")
+            finally:
+                if not done.done():
+                    done.set_result(None)
+                self._queue.task_done()
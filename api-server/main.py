@@ -7,28 +7,56 @@
 # Should be received to understand the segment to be watched
 
 import asyncio
+import functools
+import mimetypes
+import hashlib
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
-import requests
-from fastapi import FastAPI, HTTPException, Query, UploadFile, File
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query, Request, UploadFile, File
+from pydantic import BaseModel, ValidationError
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-from data_models import LectureRequest, JobStatusResponse, SegmentQuestionsRequest, VideoQuestionsRequest, SegmentSolutionRequest, QuizDocument, QuizListResponse, DirectSegmentQuestionsRequest, AnswerSubmission, AnswerValidationResponse
+from data_models import LectureRequest, BatchLectureRequest, BatchStatusResponse, JobStatusResponse, JobListResponse, SegmentQuestionsRequest, VideoQuestionsRequest, SegmentSolutionRequest, QuizDocument, QuizListResponse, DirectSegmentQuestionsRequest, AnswerSubmission, AnswerValidationResponse, BatchAnswerSubmission, BatchAnswerValidationResponse
+from job_registry import JobRegistry, TERMINAL_JOB_STATUSES
+from job_scheduler import JobScheduler, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+from metrics import RequestMetricsMiddleware, metrics_response
+from cache import CacheStats, LRUCache, cache_stats
+from segment_index import SegmentIntervalIndex
+from singleflight import SingleFlight
+from video_streaming import stream_file
+from uploads import UploadError, receive_upload
+from storage import create_repository, outline_entry
+from responses import CompressionMiddleware, FastJSONResponse
+from search_index import TranscriptSearchIndex
+from embedding_index import EmbeddingIndexStore
+from summaries import build_summaries
+from quiz_client import QuizServiceClient, QuizServiceError, QuizServiceUnavailable
+from answer_grading import grade_mcq, grade_short_answer_leniently, normalize_answer
 import json
 import os
+import sys
+
+# Make the repo root (full_pipeline) and transcription/ importable, as run_server.sh does via PYTHONPATH
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (repo_root, os.path.join(repo_root, 'transcription')):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from pipeline_metrics import stage_timer, record_bytes
 
 # Try to import full_pipeline - may not be available in all environments
 try:
-    from full_pipeline import get_data
-except ImportError:
+    from full_pipeline import get_data, get_data_from_file
+except (ImportError, SystemExit):
+    # full_pipeline exits when its own imports (yt_dlp, mlx_whisper) are missing
     print("Warning: full_pipeline not available. Transcription endpoints will not work.")
-    get_data = None
+    get_data = get_data_from_file = None
 # Initialize FastAPI app
-app = FastAPI(title="LectureAI API", description="API for lecture transcription and analysis", version="1.0.0")
+app = FastAPI(title="LectureAI API", description="API for lecture transcription and analysis", version="1.0.0",
+              default_response_class=FastJSONResponse)
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -41,27 +69,145 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Firebase setup
-cred = credentials.Certificate("ic_hack.json")
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+# Compress JSON bodies above the threshold; video streams and the Prometheus scrape go out as-is
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+app.add_middleware(CompressionMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES,
+                   skip_path_suffixes=("/stream", "/metrics"))
+
+# Per-route request latency, exported on /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
+# Storage for videos, segments, quizzes and batches: Firestore, or SQLite to run offline (":memory:" for in-memory)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "firestore")
+if STORAGE_BACKEND == "sqlite":
+    storage = create_repository("sqlite", path=os.environ.get("STORAGE_SQLITE_PATH", "lectureai.sqlite3"))
+else:
+    storage = create_repository(STORAGE_BACKEND, credentials_path=os.environ.get("FIREBASE_CREDENTIALS", "ic_hack.json"))
+
+# Blocking storage calls run on their own pool so a slow read never stalls the event loop
+STORAGE_THREADS = int(os.environ.get("STORAGE_THREADS", os.environ.get("FIRESTORE_THREADS", "16")))
+storage_executor = ThreadPoolExecutor(max_workers=STORAGE_THREADS, thread_name_prefix="storage")
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking storage call on the storage pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(storage_executor, functools.partial(fn, *args, **kwargs))
+
+# Job tracking storage, finished jobs are evicted after a TTL (their status stays readable from Firestore)
+JOB_REGISTRY_MAX_JOBS = int(os.environ.get("JOB_REGISTRY_MAX_JOBS", "1000"))
+JOB_REGISTRY_TTL_SECONDS = float(os.environ.get("JOB_REGISTRY_TTL_SECONDS", "3600"))
+jobs = JobRegistry(max_jobs=JOB_REGISTRY_MAX_JOBS, ttl_seconds=JOB_REGISTRY_TTL_SECONDS)
+
+# Cancellation flags for jobs that are still running, checked by the pipeline between steps
+job_cancel_events: Dict[str, threading.Event] = {}
+
+ACTIVE_JOB_STATUSES = ('pending', 'processing', 'cancelling')
+
+# Pipeline jobs run on a fixed pool of workers; single submissions are scheduled ahead of batch work
+MAX_CONCURRENT_JOBS = int(os.environ.get("MAX_CONCURRENT_JOBS", "2"))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "2"))
+# Batch jobs across all batches; kept below MAX_CONCURRENT_JOBS so a worker is always left for single submissions
+BATCH_MAX_RUNNING_JOBS = max(1, min(int(os.environ.get("BATCH_MAX_RUNNING_JOBS", str(MAX_CONCURRENT_JOBS - 1))),
+                                    MAX_CONCURRENT_JOBS - 1))
+batch_job_slots: Optional[asyncio.Semaphore] = None  # created at startup
+job_scheduler = JobScheduler(max_concurrent_jobs=MAX_CONCURRENT_JOBS)
+
+# Batch submissions, oldest dropped beyond MAX_TRACKED_BATCHES (each batch is also stored in Firestore)
+MAX_TRACKED_BATCHES = 200
+batches: Dict[str, Dict[str, Any]] = {}
+
+# Shared pooled client for the Kotlin quiz service, opened at startup
+QUIZ_SERVICE_URL = os.environ.get("QUIZ_SERVICE_URL", "http://localhost:8080")
+quiz_service = QuizServiceClient(
+    QUIZ_SERVICE_URL,
+    max_concurrency=int(os.environ.get("QUIZ_SERVICE_MAX_CONCURRENCY", "8")),
+    generation_timeout=float(os.environ.get("QUIZ_GENERATION_TIMEOUT_SECONDS", "120")),
+    validation_timeout=float(os.environ.get("QUIZ_VALIDATION_TIMEOUT_SECONDS", "30")),
+)
+
+# Background quiz pre-generation after ingestion; kept well below the client's concurrency so student requests still get slots
+QUIZ_PREGENERATION_DEFAULT = os.environ.get("QUIZ_PREGENERATION_DEFAULT", "false").lower() == "true"
+QUIZ_PREGENERATION_CONCURRENCY = int(os.environ.get("QUIZ_PREGENERATION_CONCURRENCY", "2"))
+QUIZ_PREGENERATION_QUESTIONS = 3  # what the player asks for, so its first request hits the content-hash cache
+quiz_pregeneration_slots: Optional[asyncio.Semaphore] = None
+quiz_pregeneration_tasks = set()
+
+# Downloaded and uploaded videos, served by /video/{video_id}/stream
+VIDEO_DIR = os.environ.get(
+    "VIDEO_STORAGE_DIR",
+    os.path.join(os.path.dirname(__file__), '..', 'FrontEnd', 'public', 'videos')
+)
+
+# Per-video segment boundary indexes for the player's segment-at-time lookups
+SEGMENT_INDEX_CACHE_SIZE = int(os.environ.get("SEGMENT_INDEX_CACHE_SIZE", "512"))
+segment_index_cache = LRUCache('segment_index', maxsize=SEGMENT_INDEX_CACHE_SIZE)
+
+# Video feed paging; first pages are cached briefly and dropped whenever a video changes
+VIDEO_FEED_DEFAULT_PAGE_SIZE = 20
+VIDEO_FEED_MAX_PAGE_SIZE = 100
+VIDEO_FEED_CACHE_TTL_SECONDS = float(os.environ.get("VIDEO_FEED_CACHE_TTL_SECONDS", "10"))
+video_feed_cache = LRUCache('video_feed', maxsize=64, ttl_seconds=VIDEO_FEED_CACHE_TTL_SECONDS)
+
+
+# Generated quizzes keyed by (video_id, segment_id, content hash), so repeat requests skip the LLM
+QUIZ_CONTENT_CACHE_SIZE = int(os.environ.get("QUIZ_CONTENT_CACHE_SIZE", "1024"))
+quiz_content_cache = LRUCache('quiz_content', maxsize=QUIZ_CONTENT_CACHE_SIZE)
+# Lookups that missed in memory and went to the stored quizzes in Firestore
+quiz_store_stats = CacheStats('quiz_content_store')
+
+# Quiz and joined segment transcript per (video_id, quiz_id), so answer submissions skip the Firestore reads
+ANSWER_CONTEXT_CACHE_SIZE = int(os.environ.get("ANSWER_CONTEXT_CACHE_SIZE", "512"))
+ANSWER_CONTEXT_CACHE_TTL_SECONDS = float(os.environ.get("ANSWER_CONTEXT_CACHE_TTL_SECONDS", "600"))
+answer_context_cache = LRUCache('answer_context', maxsize=ANSWER_CONTEXT_CACHE_SIZE,
+                                ttl_seconds=ANSWER_CONTEXT_CACHE_TTL_SECONDS)
 
-# Job tracking storage
-jobs: Dict[str, Dict[str, Any]] = {}
+# Quiz-service verdicts for short answers, keyed by question and normalized answer text
+ANSWER_VERDICT_CACHE_SIZE = int(os.environ.get("ANSWER_VERDICT_CACHE_SIZE", "10000"))
+ANSWER_VERDICT_CACHE_TTL_SECONDS = float(os.environ.get("ANSWER_VERDICT_CACHE_TTL_SECONDS", "86400"))
+answer_verdict_cache = LRUCache('answer_verdict', maxsize=ANSWER_VERDICT_CACHE_SIZE,
+                                ttl_seconds=ANSWER_VERDICT_CACHE_TTL_SECONDS)
 
-QUESTION_GENERATION_ENDPOINT = "http://localhost:8080/quiz"
+# Full-text search over every ingested transcript, updated per video at ingestion and rebuilt at startup
+SEARCH_INDEX_WARM = os.environ.get("SEARCH_INDEX_WARM", "true").lower() == "true"
+search_index = TranscriptSearchIndex()
 
-async def download_and_save_video(job_id: str, video_url: str) -> Optional[str]:
+# Per-video embedding matrices over transcript windows, so handlers send only the relevant context
+EMBEDDING_INDEX_DIR = os.environ.get("EMBEDDING_INDEX_DIR", os.path.join(os.path.dirname(__file__), 'embedding_index'))
+EMBEDDING_CONTEXT_WINDOWS = int(os.environ.get("EMBEDDING_CONTEXT_WINDOWS", "3"))
+embedding_store = EmbeddingIndexStore(EMBEDDING_INDEX_DIR)
+embedding_index_cache = LRUCache('embedding_index', maxsize=64)
+
+# Concurrent identical video reads share one Firestore fetch, reused for a moment afterwards
+VIDEO_READ_COALESCE_TTL_SECONDS = float(os.environ.get("VIDEO_READ_COALESCE_TTL_SECONDS", "1"))
+video_reads = SingleFlight('video_reads', ttl_seconds=VIDEO_READ_COALESCE_TTL_SECONDS)
+
+
+def video_changed(video_id: str) -> None:
+    """
+    Drop cached reads that depend on a video after it is created, re-ingested or changes status.
+    Called from worker threads too: the caches lock, and video_reads hands the invalidation to the event loop.
+    """
+    segment_index_cache.invalidate(video_id)
+    video_feed_cache.clear()
+    video_reads.invalidate(('segments', video_id))
+    video_reads.invalidate(('metadata', video_id))
+
+async def download_and_save_video(job_id: str, video_url: str, cancel_event: Optional[threading.Event] = None) -> Optional[str]:
     """Download video from Panopto and save it locally."""
     try:
         import yt_dlp
+        from yt_dlp.utils import DownloadCancelled
+
+        def abort_if_cancelled(_progress):
+            if cancel_event is not None and cancel_event.is_set():
+                raise DownloadCancelled("Job was cancelled")
         
         # Generate unique filename
         video_filename = f"{job_id}.mp4"
-        video_dir = os.path.join(os.path.dirname(__file__), '..', 'FrontEnd', 'public', 'videos')
-        os.makedirs(video_dir, exist_ok=True)
+        os.makedirs(VIDEO_DIR, exist_ok=True)
         
-        output_path = os.path.join(video_dir, video_filename)
+        output_path = os.path.join(VIDEO_DIR, video_filename)
         base_no_ext = os.path.splitext(output_path)[0]
         
         ydl_opts = {
@@ -71,13 +217,16 @@ async def download_and_save_video(job_id: str, video_url: str) -> Optional[str]:
             "merge_output_format": "mp4",
             "noplaylist": True,
             "quiet": False,
+            "progress_hooks": [abort_if_cancelled],
         }
         
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, lambda: yt_dlp.YoutubeDL(ydl_opts).download([video_url]))
+        with stage_timer("video_download", jobs[job_id].setdefault('stage_seconds', {})):
+            await loop.run_in_executor(None, lambda: yt_dlp.YoutubeDL(ydl_opts).download([video_url]))
         
         # Check if file exists
         if os.path.exists(output_path):
+            record_bytes("video_download", os.path.getsize(output_path))
             print(f"Video downloaded successfully: {video_filename}")
             return video_filename
         else:
@@ -90,48 +239,162 @@ async def download_and_save_video(job_id: str, video_url: str) -> Optional[str]:
 
 
 
-async def lecture_processing_task(job_id: str, lecture_url: str):
-    """Run the synchronous pipeline in a thread pool and then process results."""
+def update_video(video_id: str, fields: Dict[str, Any]) -> None:
+    storage.update_video(video_id, fields)
+    video_changed(video_id)
+
+
+def mark_job_cancelled(job_id: str) -> None:
+    """Record that a job stopped because it was cancelled."""
+    cancelled_at = datetime.now().isoformat()
+    job = jobs.get(job_id)
+    if job is not None:
+        job['status'] = 'cancelled'
+        job['cancelled_at'] = cancelled_at
+    try:
+        update_video(job_id, {'status': 'cancelled', 'cancelled_at': cancelled_at})
+    except Exception as e:
+        print(f"[{job_id}] Failed to mark video as cancelled: {e}")
+
+
+def mark_job_failed(job_id: str, error: str) -> None:
+    """Record a job failure, also on the video document so it outlives the in-memory job."""
+    failed_at = datetime.now().isoformat()
+    # The registry may already have evicted a job that failed after completing (e.g. starting pregeneration)
+    job = jobs.get(job_id)
+    if job is not None:
+        job['status'] = 'failed'
+        job['error'] = error
+        job['failed_at'] = failed_at
+    try:
+        update_video(job_id, {'status': 'failed', 'error': error, 'failed_at': failed_at})
+    except Exception as e:
+        print(f"[{job_id}] Failed to mark video as failed: {e}")
+
+
+def mark_job_processing(job_id: str) -> None:
+    """Record that a scheduler worker has picked the job up (download and transcription count as processing)."""
+    if jobs[job_id]['status'] != 'pending':
+        return
+    jobs[job_id]['status'] = 'processing'
+    try:
+        update_video(job_id, {'status': 'processing'})
+    except Exception as e:
+        print(f"[{job_id}] Failed to mark video as processing: {e}")
+
+
+async def lecture_processing_task(job_id: str, lecture_url: str, video_path: Optional[str] = None):
+    """
+    Run the synchronous pipeline in a thread pool and then process results.
+    With video_path (an uploaded file) the download is skipped and audio is extracted locally.
+    """
     # Ensure get_data is available
     if get_data is None:
-        jobs[job_id]['status'] = 'failed'
-        jobs[job_id]['error'] = 'Transcription pipeline not available'
+        await run_db(mark_job_failed, job_id, 'Transcription pipeline not available')
+        job_cancel_events.pop(job_id, None)
+        return
+
+    cancel_event = job_cancel_events.setdefault(job_id, threading.Event())
+    if cancel_event.is_set():
+        # Cancelled while still waiting in the scheduler queue
+        print(f"[{job_id}] Cancelled before it started.")
+        await run_db(mark_job_cancelled, job_id)
+        job_cancel_events.pop(job_id, None)
         return
 
+    await run_db(mark_job_processing, job_id)
     try:
         loop = asyncio.get_running_loop()
         
-        # Download video first
-        print(f"[{job_id}] Starting video download...")
-        video_filename = await download_and_save_video(job_id, lecture_url)
-        
-        # Update Firebase with video filename
-        if video_filename:
-            print(f"[{job_id}] Updating Firebase with video filename: {video_filename}")
-            db.collection('videos').document(job_id).update({
-                'video_filename': video_filename
-            })
+        if video_path is None:
+            # Download video first
+            print(f"[{job_id}] Starting video download...")
+            video_filename = await download_and_save_video(job_id, lecture_url, cancel_event)
+            if cancel_event.is_set():
+                print(f"[{job_id}] Cancelled during video download.")
+                await run_db(mark_job_cancelled, job_id)
+                return
+            
+            # Update Firebase with video filename
+            if video_filename:
+                print(f"[{job_id}] Updating Firebase with video filename: {video_filename}")
+                await run_db(update_video, job_id, {'video_filename': video_filename})
         
-        # Run blocking pipeline in executor
-        print(f"[{job_id}] Starting transcription pipeline (get_data)...")
-        await loop.run_in_executor(None, get_data, lecture_url, f"{job_id}_chapters.json")
+        # Run blocking pipeline in executor; the cancel event makes it return early and free the worker thread
+        with stage_timer("transcription_pipeline", jobs[job_id].setdefault('stage_seconds', {})):
+            if video_path is None:
+                print(f"[{job_id}] Starting transcription pipeline (get_data)...")
+                await loop.run_in_executor(None, get_data, lecture_url, f"{job_id}_chapters.json", cancel_event)
+            else:
+                print(f"[{job_id}] Starting transcription pipeline from uploaded file (get_data_from_file)...")
+                await loop.run_in_executor(None, get_data_from_file, video_path, f"{job_id}_chapters.json", cancel_event)
+        if cancel_event.is_set():
+            print(f"[{job_id}] Cancelled after transcription pipeline.")
+            await run_db(mark_job_cancelled, job_id)
+            return
         
         # Process results (also blocking, run in executor)
         print(f"[{job_id}] Processing results (process_lecture_job)...")
         await loop.run_in_executor(None, process_lecture_job, job_id)
         print(f"[{job_id}] Job processing complete.")
+        
+        # A finished job can be evicted from the registry as soon as another job is added
+        job = jobs.get(job_id)
+        if job is not None and job['status'] == 'completed' and job.get('pregenerate_quizzes'):
+            start_quiz_pregeneration(job_id)
     except Exception as e:
+        if cancel_event.is_set():
+            print(f"[{job_id}] Job cancelled: {e}")
+            await run_db(mark_job_cancelled, job_id)
+            return
         print(f"Background task failed for job {job_id}: {e}")
         import traceback
         traceback.print_exc()
-        jobs[job_id]['status'] = 'failed'
-        jobs[job_id]['error'] = str(e)
-        jobs[job_id]['failed_at'] = datetime.now().isoformat()
+        await run_db(mark_job_failed, job_id, str(e))
+    finally:
+        job_cancel_events.pop(job_id, None)
+        # Remove any partial chapters file left behind by a cancelled pipeline
+        if cancel_event.is_set() and os.path.exists(f"{job_id}_chapters.json"):
+            try:
+                os.remove(f"{job_id}_chapters.json")
+            except OSError:
+                pass
 
-@app.post("/submit-lecture", response_model=dict)
-async def submit_lecture_url(request: LectureRequest):
-    """Submit a lecture URL for processing and return a job ID for polling."""
-    print(f"Received submission for: {request.lecture_url}")
+@app.on_event("startup")
+async def start_background_services():
+    global quiz_pregeneration_slots, batch_job_slots
+    quiz_pregeneration_slots = asyncio.Semaphore(QUIZ_PREGENERATION_CONCURRENCY)
+    batch_job_slots = asyncio.Semaphore(BATCH_MAX_RUNNING_JOBS)
+    job_scheduler.start()
+    await quiz_service.start()
+    if SEARCH_INDEX_WARM:
+        asyncio.create_task(warm_search_index())
+
+
+async def warm_search_index() -> None:
+    """Index the transcripts of every completed video, one video at a time in the background."""
+    try:
+        video_ids = await run_db(storage.list_video_ids, 'completed')
+        for video_id in video_ids:
+            video_data = await run_db(storage.get_video, video_id)
+            segments = await run_db(storage.list_segments, video_id)
+            search_index.add_video(video_id, segments, (video_data or {}).get('lecture_title', ''))
+        print(f"Search index ready: {search_index.video_count} videos, {len(search_index)} transcript entries")
+    except Exception as e:
+        print(f"Failed to build search index: {e}")
+
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    for task in list(quiz_pregeneration_tasks):
+        task.cancel()
+    await job_scheduler.stop()
+    await quiz_service.close()
+
+
+def create_lecture_job(request: LectureRequest, batch_id: Optional[str] = None,
+                       extra_fields: Optional[Dict[str, Any]] = None) -> str:
+    """Register a pending job and create its video document (plus any extra_fields), returns the job ID."""
     job_id = str(uuid.uuid4())
     
     # Initialize job status
@@ -141,30 +404,51 @@ async def submit_lecture_url(request: LectureRequest):
         'lecture_url': request.lecture_url,
         'lecture_title': request.lecture_title,
         'lecture_topic': request.lecture_topic,
+        'batch_id': batch_id,
+        'pregenerate_quizzes': QUIZ_PREGENERATION_DEFAULT if request.pregenerate_quizzes is None else request.pregenerate_quizzes,
         'segments': None,
         'error': None
     }
+    job_cancel_events[job_id] = threading.Event()
+    
+    # Create the main document
+    video_data = {
+        'lecture_url': request.lecture_url,
+        'lecture_title': request.lecture_title,
+        'lecture_topic': request.lecture_topic,
+        'segments_collection': f'videos/{job_id}/segments',  # Reference to subcollection
+        'segment_count': 0,
+        'status': 'pending',
+        'created_at': datetime.now().isoformat()
+    }
+    
+    # Add video filename if provided
+    if request.video_filename:
+        video_data['video_filename'] = request.video_filename
+    if batch_id:
+        video_data['batch_id'] = batch_id
+    if extra_fields:
+        video_data.update(extra_fields)
     
     try:
-        # Create the main document
-        video_data = {
-            'lecture_url': request.lecture_url,
-            'lecture_title': request.lecture_title,
-            'lecture_topic': request.lecture_topic,
-            'segments_collection': f'videos/{job_id}/segments',  # Reference to subcollection
-            'segment_count': 0,
-            'status': 'pending',
-            'created_at': datetime.now().isoformat()
-        }
-        
-        # Add video filename if provided
-        if request.video_filename:
-            video_data['video_filename'] = request.video_filename
-        
-        db.collection('videos').document(job_id).set(video_data)
+        storage.create_video(job_id, video_data)
+        video_changed(job_id)
+    except Exception:
+        del jobs[job_id]
+        job_cancel_events.pop(job_id, None)
+        raise
+    return job_id
+
+
+@app.post("/submit-lecture", response_model=dict)
+async def submit_lecture_url(request: LectureRequest):
+    """Submit a lecture URL for processing and return a job ID for polling."""
+    print(f"Received submission for: {request.lecture_url}")
+    try:
+        job_id = await run_db(create_lecture_job, request)
         
-        # Start processing asynchronously (task handles its own exceptions)
-        asyncio.create_task(lecture_processing_task(job_id, request.lecture_url))
+        # Queue processing ahead of any batch work (task handles its own exceptions)
+        job_scheduler.submit(lambda: lecture_processing_task(job_id, request.lecture_url), PRIORITY_INTERACTIVE)
         
         return {"job_id": job_id, "status": "submitted"}
         
@@ -172,6 +456,109 @@ async def submit_lecture_url(request: LectureRequest):
         print(f"Error submitting lecture: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to submit lecture: {str(e)}")
 
+
+async def run_batch(batch_id: str, job_requests: List[tuple], max_concurrency: int):
+    """
+    Feed a batch's jobs into the scheduler, never holding more than max_concurrency of them at once,
+    nor more than BATCH_MAX_RUNNING_JOBS batch jobs across all batches.
+    """
+    slots = asyncio.Semaphore(max_concurrency)
+    for job_id, lecture_url in job_requests:
+        await slots.acquire()
+        await batch_job_slots.acquire()
+        done = job_scheduler.submit(
+            lambda job_id=job_id, lecture_url=lecture_url: lecture_processing_task(job_id, lecture_url),
+            PRIORITY_BATCH
+        )
+        done.add_done_callback(lambda _: (slots.release(), batch_job_slots.release()))
+    print(f"[batch {batch_id}] All {len(job_requests)} jobs queued.")
+
+
+@app.post("/submit-lectures", response_model=dict)
+async def submit_lecture_batch(request: BatchLectureRequest):
+    """Submit a batch of lectures (e.g. a whole module) to be processed behind single submissions."""
+    if not request.lectures:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one lecture")
+    
+    batch_id = str(uuid.uuid4())
+    max_concurrency = max(1, min(request.max_concurrency, BATCH_MAX_CONCURRENCY))
+    print(f"Received batch {batch_id} with {len(request.lectures)} lectures")
+    
+    job_requests = []
+    try:
+        # Video documents are created concurrently, so one slow insert does not hold up the rest
+        created = await asyncio.gather(*(run_db(create_lecture_job, lecture, batch_id) for lecture in request.lectures),
+                                       return_exceptions=True)
+        job_requests = [(job_id, lecture.lecture_url) for job_id, lecture in zip(created, request.lectures)
+                        if not isinstance(job_id, BaseException)]
+        errors = [result for result in created if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+        job_ids = [job_id for job_id, _ in job_requests]
+        
+        batch = {
+            'batch_id': batch_id,
+            'batch_title': request.batch_title,
+            'job_ids': job_ids,
+            'max_concurrency': max_concurrency,
+            'created_at': datetime.now().isoformat()
+        }
+        await run_db(storage.save_batch, batch)
+        batches[batch_id] = batch
+        while len(batches) > MAX_TRACKED_BATCHES:
+            del batches[next(iter(batches))]
+        
+        asyncio.create_task(run_batch(batch_id, job_requests, max_concurrency))
+        
+        return {"batch_id": batch_id, "job_ids": job_ids, "status": "submitted"}
+        
+    except Exception as e:
+        print(f"Error submitting batch: {e}")
+        # Jobs created before the failure will never be scheduled, fail them so they do not stay pending forever
+        for job_id, _ in job_requests:
+            await run_db(mark_job_failed, job_id, f"Batch submission failed: {e}")
+            job_cancel_events.pop(job_id, None)
+        raise HTTPException(status_code=500, detail=f"Failed to submit batch: {str(e)}")
+
+
+@app.get("/batch/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status_endpoint(batch_id: str):
+    """Get aggregate progress for a batch submission."""
+    batch = batches.get(batch_id)
+    if batch is None:
+        batch = await run_db(storage.get_batch, batch_id)
+        if batch is None:
+            raise HTTPException(status_code=404, detail="Batch not found")
+    
+    job_statuses = await asyncio.gather(*(run_db(job_status, job_id) for job_id in batch['job_ids']))
+    job_statuses = [status or {'job_id': job_id, 'status': 'unknown', 'created_at': ''}
+                    for job_id, status in zip(batch['job_ids'], job_statuses)]
+    
+    status_counts: Dict[str, int] = {}
+    for job in job_statuses:
+        status_counts[job['status']] = status_counts.get(job['status'], 0) + 1
+    
+    total = len(job_statuses)
+    finished = sum(count for status, count in status_counts.items() if status in TERMINAL_JOB_STATUSES)
+    if finished == total:
+        batch_status = 'completed'
+    elif status_counts.get('pending', 0) == total:
+        batch_status = 'pending'
+    else:
+        batch_status = 'processing'
+    
+    return {
+        'batch_id': batch_id,
+        'batch_title': batch.get('batch_title'),
+        'status': batch_status,
+        'created_at': batch.get('created_at', ''),
+        'total_jobs': total,
+        'finished_jobs': finished,
+        'progress': finished / total if total else 1.0,
+        'status_counts': status_counts,
+        'jobs': job_statuses
+    }
+
 def process_lecture_job(job_id: str) -> None:
     """Process the lecture transcription job (sync - runs in thread pool)."""
     try:
@@ -190,21 +577,31 @@ def process_lecture_job(job_id: str) -> None:
         with open(json_file_path, 'r', encoding='utf-8') as f:
             transcription_result = json.load(f)
         
-        # Store each segment as a separate document in subcollection
-        segments_ref = db.collection('videos').document(job_id).collection('segments')
-        
-
         segments = transcription_result if isinstance(transcription_result, list) else transcription_result.get('segments', [])
         
-        for segment in segments:
-            segments_ref.document(str(segment.get("segment_number"))).set(segment)
+        # Summaries are only recomputed for segments that changed since a previous ingestion of this video
+        with stage_timer("summarize", job.setdefault('stage_seconds', {})):
+            segment_summaries = build_summaries(segments, storage.list_segment_summaries(job_id))
         
-        # Update main document with metadata
-        db.collection('videos').document(job_id).update({
-            'status': 'completed',
-            'segment_count': len(segments),
-            'processed_at': datetime.now().isoformat()
-        })
+        # Store each segment as a separate document in subcollection, together with the metadata update.
+        # Summaries go in their own documents first: on the video document they would outweigh everything else.
+        with stage_timer("storage_write", job['stage_seconds']):
+            storage.write_segment_summaries(job_id, segment_summaries)
+            storage.write_segments(job_id, segments, {
+                'status': 'completed',
+                'segment_count': len(segments),
+                'segment_outline': build_segment_outline(segments),
+                'processed_at': datetime.now().isoformat()
+            })
+        
+        # Drop any index or feed page built before this ingestion
+        video_changed(job_id)
+        search_index.add_video(job_id, segments, job.get('lecture_title', ''))
+        try:
+            embedding_index_cache.set(job_id, embedding_store.build_and_save(job_id, segments))
+        except Exception as e:
+            # Retrieval falls back to whole transcripts, not worth failing the ingestion over
+            print(f"[{job_id}] Failed to build embedding index: {e}")
         
         # Update job with results
         jobs[job_id]['status'] = 'completed'
@@ -216,9 +613,7 @@ def process_lecture_job(job_id: str) -> None:
         except OSError:
             pass  # File cleanup failed, but job succeeded
     except Exception as e:
-        jobs[job_id]['status'] = 'failed'
-        jobs[job_id]['error'] = str(e)
-        jobs[job_id]['failed_at'] = datetime.now().isoformat()
+        mark_job_failed(job_id, str(e))
         
         # Clean up the temporary JSON file even on failure
         json_file_path = f"{job_id}_chapters.json"
@@ -229,62 +624,141 @@ def process_lecture_job(job_id: str) -> None:
             pass  # File cleanup failed
 
 
-@app.get("/job-status/{job_id}")
-async def get_job_status_endpoint(job_id: str):
-    """Get the status of a job by its ID."""
-    if job_id not in jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
+def job_status_from_video(job_id: str) -> Optional[Dict[str, Any]]:
+    """Status for a job no longer held in memory, read from its videos/{id} document."""
+    video_data = storage.get_video(job_id)
+    if video_data is None:
+        return None
     
-    job = jobs[job_id]
+    result = {
+        'job_id': job_id,
+        'status': video_data.get('status', ''),
+        'created_at': video_data.get('created_at', '')
+    }
+    if result['status'] == 'completed':
+        result['completed_at'] = video_data.get('processed_at')
+    elif result['status'] == 'failed':
+        result['error'] = video_data.get('error')
+        result['failed_at'] = video_data.get('failed_at')
+    elif result['status'] == 'cancelled':
+        result['cancelled_at'] = video_data.get('cancelled_at')
+    if video_data.get('quiz_pregeneration'):
+        result['quiz_pregeneration'] = video_data['quiz_pregeneration']
+    return result
+
+
+def job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Status for a job, from the in-memory registry or, once evicted, from Firestore."""
+    job = jobs.get(job_id)
+    if job is None:
+        return job_status_from_video(job_id)
+    return format_job_status(job_id, job)
+
+
+def format_job_status(job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the status response for an in-memory job."""
     result = {
         'job_id': job_id,
         'status': job['status'],
         'created_at': job['created_at']
     }
     
+    if job.get('stage_seconds'):
+        result['stage_seconds'] = job['stage_seconds']
+    if job.get('quiz_pregeneration'):
+        result['quiz_pregeneration'] = job['quiz_pregeneration']
+    
     if job['status'] == 'completed':
-        result['status'] = 'completed'
+        result['completed_at'] = job.get('completed_at')
     elif job['status'] == 'failed':
         result['error'] = job['error']
         result['failed_at'] = job['failed_at']
+    elif job['status'] == 'cancelled':
+        result['cancelled_at'] = job['cancelled_at']
     
     return result
 
+
+@app.get("/job-status/{job_id}")
+async def get_job_status_endpoint(job_id: str):
+    """Get the status of a job by its ID."""
+    result = await run_db(job_status, job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return result
+
+
+@app.get("/jobs", response_model=JobListResponse)
+async def list_jobs_endpoint(
+    status: Optional[str] = Query(None, description="Only return jobs with this status"),
+    offset: int = Query(0, ge=0, description="Number of jobs to skip"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of jobs to return")
+):
+    """List jobs held in memory, newest first."""
+    page, total = jobs.list(status=status, offset=offset, limit=limit)
+    return {
+        'jobs': [format_job_status(job_id, job) for job_id, job in page],
+        'total': total,
+        'offset': offset,
+        'limit': limit
+    }
+
 @app.delete("/job/{job_id}")
 async def delete_job_endpoint(job_id: str):
-    """Delete a job from storage."""
+    """Cancel a running job, or delete a finished job from storage."""
     if job_id not in jobs:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    if jobs[job_id]['status'] in ACTIVE_JOB_STATUSES:
+        # The background task notices the flag at its next checkpoint and moves the job to 'cancelled'
+        cancel_event = job_cancel_events.get(job_id)
+        if cancel_event is not None:
+            cancel_event.set()
+            jobs[job_id]['status'] = 'cancelling'
+            return {"message": "Job cancellation requested", "status": "cancelling"}
+    
     del jobs[job_id]
     return {"message": "Job deleted successfully"}
 
+def build_segment_outline(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Compact per-segment entries (no transcript) stored on the video document at ingestion."""
+    outline = [outline_entry(str(segment.get('segment_number')), segment) for segment in segments]
+    outline.sort(key=lambda s: s['segment_number'] or 0)
+    return outline
+
+
+def get_segment_outline(video_id: str) -> List[Dict[str, Any]]:
+    """
+    A video's segment outline ordered by segment_number, read from the video document in one small read.
+    Videos ingested before outlines existed fall back to reading the outline fields of their segments.
+    """
+    video_data = storage.get_video(video_id)
+    if video_data is not None and video_data.get('segment_outline') is not None:
+        return video_data['segment_outline']
+    
+    return storage.list_segment_outline(video_id)
+
+
 @app.get("/video/{video_id}/segments")
 async def get_video_segments_endpoint(
     video_id: str, 
     start_segment: Optional[int] = Query(None, description="Start segment ID"),
     end_segment: Optional[int] = Query(None, description="End segment ID")
 ):
-    """Get segments for a video from the subcollection."""
+    """Get segments for a video from its segment outline."""
     try:
-        segments_ref = db.collection('videos').document(video_id).collection('segments')
+        outline = await video_reads.do(('segments', video_id), lambda: run_db(get_segment_outline, video_id))
         
         if start_segment is not None and end_segment is not None:
             # Get a range of segments
-            segments_query = segments_ref.where('segment_number', '>=', start_segment).where('segment_number', '<=', end_segment).order_by('segment_number')
-        else:
-            # Get all segments ordered by segment_number
-            segments_query = segments_ref.order_by('segment_number')
-        
-        segments = []
-        for segment_doc in segments_query.stream():
-            segment_data = segment_doc.to_dict()
-            segments.append({
-                'segment_id': segment_doc.id,
-                "segment_title": segment_data.get("segment_title", ""),
-                "segment_start_timestamp": segment_data.get("segment_start_timestamp", 0.0),
-                "segment_end_timestamp": segment_data.get("segment_end_timestamp", 0.0)
-            })
+            outline = [s for s in outline if start_segment <= s.get('segment_number', 0) <= end_segment]
+        
+        segments = [{
+            'segment_id': segment['segment_id'],
+            "segment_title": segment.get("segment_title", ""),
+            "segment_start_timestamp": segment.get("segment_start_timestamp", 0.0),
+            "segment_end_timestamp": segment.get("segment_end_timestamp", 0.0)
+        } for segment in outline]
         
         return {
             'video_id': video_id,
@@ -298,9 +772,8 @@ async def get_video_segments_endpoint(
 async def get_video_metadata_endpoint(video_id: str):
     """Get video metadata without segments."""
     try:
-        video_doc = db.collection('videos').document(video_id).get()
-        if video_doc.exists:
-            video_data = video_doc.to_dict()
+        video_data = await video_reads.do(('metadata', video_id), lambda: run_db(storage.get_video, video_id))
+        if video_data is not None:
             return {
                 
                 'lecture_url': video_data.get('lecture_url', ''),
@@ -309,102 +782,269 @@ async def get_video_metadata_endpoint(video_id: str):
                 
                 'lecture_topic': video_data.get('lecture_topic', ''),
             
-                'video_filename': video_doc.get('video_filename', '')
+                'video_filename': video_data.get('video_filename', '')
             }
         else:
             raise HTTPException(status_code=404, detail='Video not found')
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f'Failed to retrieve video: {str(e)}')
 
+@app.api_route("/video/{video_id}/stream", methods=["GET", "HEAD"])
+async def stream_video_endpoint(video_id: str, request: Request):
+    """Stream a video's file with HTTP Range support, so seeking only fetches the bytes it needs."""
+    video_data = await video_reads.do(('metadata', video_id), lambda: run_db(storage.get_video, video_id))
+    if video_data is None or not video_data.get('video_filename'):
+        raise HTTPException(status_code=404, detail='Video not found')
+    
+    # video_filename comes from the video document, never let it point outside the video directory
+    video_path = os.path.join(VIDEO_DIR, os.path.basename(video_data['video_filename']))
+    if not os.path.isfile(video_path):
+        raise HTTPException(status_code=404, detail='Video file not found')
+    
+    media_type = mimetypes.guess_type(video_path)[0] or 'video/mp4'
+    return stream_file(request, video_path, media_type)
+
+
+def get_segment_index(video_id: str) -> SegmentIntervalIndex:
+    """The cached segment boundary index for a video, built from its segment outline on first use."""
+    index = segment_index_cache.get(video_id)
+    if index is not None:
+        return index
+    return load_segment_index(video_id)
+
+
+def load_segment_index(video_id: str) -> SegmentIntervalIndex:
+    """Build a video's segment boundary index from its outline and cache it."""
+    index = SegmentIntervalIndex(get_segment_outline(video_id))
+    # Videos still being ingested have no segments yet, don't pin that
+    if len(index):
+        segment_index_cache.set(video_id, index)
+    return index
+
+
 @app.get("/video/{video_id}/segment-at-time")
 async def get_current_lecture_segment_endpoint(video_id: str, timestamp: float = Query(..., description="Timestamp in seconds")):
-    """Retrieve the current lecture segment based on video ID and timestamp."""
+    """Retrieve the current lecture segment based on video ID and timestamp (the next segment when between segments)."""
     try:
-        # Get segments from subcollection
-        segments_ref = db.collection('videos').document(video_id).collection('segments')
-        segments = segments_ref.stream()
-        
-        for segment_doc in segments:
-            segment = segment_doc.to_dict()
-
-            if segment.get('segment_start_timestamp', 0) <= timestamp <= segment.get('segment_end_timestamp', 0):
-                return {
-                    "segment_id": segment_doc.id,
-                    "segment_title": segment.get("segment_title", ""),
-                    "segment_start_timestamp": segment.get("segment_start_timestamp", 0.0),
-                    "segment_end_timestamp": segment.get("segment_end_timestamp", 0.0)
-                }
+        # Cache hits are answered on the event loop, only a miss goes to Firestore
+        index = segment_index_cache.get(video_id)
+        if index is None:
+            index = await run_db(load_segment_index, video_id)
+        segment = index.segment_at(timestamp) or index.next_segment(timestamp)
+        if segment is None:
+            raise HTTPException(status_code=404, detail="No segment found at the specified timestamp")
         
-        raise HTTPException(status_code=404, detail="No segment found at the specified timestamp")
+        return {
+            "segment_id": segment["segment_id"],
+            "segment_title": segment["segment_title"],
+            "segment_start_timestamp": segment["segment_start_timestamp"],
+            "segment_end_timestamp": segment["segment_end_timestamp"]
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving segment: {str(e)}")
 
+def number_questions(quiz_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Add unique question numbers to each question of a generated quiz."""
+    questions = quiz_data.get('questions', [])
+    for idx, question in enumerate(questions, start=1):
+        question['question_number'] = idx
+    return questions
+
+
+def quiz_response_data(quiz: Dict[str, Any]) -> Dict[str, Any]:
+    """The quiz fields returned to clients, the same for a stored quiz document and a fresh quiz-service result."""
+    return {
+        'quiz_id': quiz.get('quiz_id'),
+        'source_window_minutes': quiz.get('source_window_minutes', 0),
+        'questions': quiz.get('questions', [])
+    }
+
+
+def build_quiz_segment(segment: Dict[str, Any]) -> Dict[str, Any]:
+    """Construct clean segment object for Kotlin API from a stored segment."""
+    return {
+        "segment_title": segment.get("segment_title", "Untitled Segment"),
+        "segment_start_timestamp": segment.get("segment_start_timestamp", 0.0),
+        "segment_end_timestamp": segment.get("segment_end_timestamp", 0.0),
+        "transcript": segment.get("transcript", [])
+    }
+
+
+def quiz_content_hash(quiz_segment: Dict[str, Any], num_questions: Optional[int], prior_context: str = '') -> str:
+    """Hash of the exact segment and context sent to the quiz service plus the generation parameters."""
+    key_fields: Dict[str, Any] = {'segment': quiz_segment, 'questions_per_segment': num_questions}
+    if prior_context:
+        # Only when present, so quizzes stored before summaries existed keep their hash
+        key_fields['prior_context'] = prior_context
+    key = json.dumps(key_fields, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+async def get_prior_context(video_id: str, segment_number: Any) -> str:
+    """Bounded summary of the segments before segment_number, stored with the segment's summary at ingestion."""
+    entry = await run_db(storage.get_segment_summary, video_id, segment_number)
+    return (entry or {}).get('prior_context', '')
+
+
+async def find_cached_quiz(video_id: str, segment_id: int, content_hash: str) -> Optional[Dict[str, Any]]:
+    """An existing quiz for this segment content, from memory first and then from the stored quizzes."""
+    cache_key = (video_id, segment_id, content_hash)
+    quiz_doc = quiz_content_cache.get(cache_key)
+    if quiz_doc is not None:
+        return quiz_doc
+    
+    quiz_doc = await run_db(storage.find_quiz_by_content_hash, video_id, content_hash)
+    quiz_store_stats.record(hit=quiz_doc is not None)
+    if quiz_doc is not None:
+        quiz_content_cache.set(cache_key, quiz_doc)
+    return quiz_doc
+
+
+async def generate_and_store_quiz(video_id: str, segment_id: int, quiz_segment: Dict[str, Any],
+                                  num_questions: Optional[int] = None,
+                                  content_hash: Optional[str] = None,
+                                  prior_context: str = '') -> Dict[str, Any]:
+    """Generate a quiz for one segment with the quiz service and store it under videos/{video_id}/quizzes."""
+    payload: Dict[str, Any] = {"segments": [quiz_segment]}
+    if num_questions is not None:
+        payload["questions_per_segment"] = num_questions
+    if prior_context:
+        payload["prior_context"] = prior_context
+    quiz_data = await quiz_service.generate_structured_quiz(payload)
+    
+    quiz_doc = {
+        'quiz_id': quiz_data.get('quiz_id'),
+        'video_id': video_id,
+        'segment_id': segment_id,
+        'source_window_minutes': quiz_data.get('source_window_minutes', 0),
+        'questions': number_questions(quiz_data),
+        'created_at': datetime.now().isoformat()
+    }
+    if content_hash is not None:
+        quiz_doc['content_hash'] = content_hash
+    
+    # Store in subcollection: videos/{video_id}/quizzes/{quiz_id}
+    await run_db(storage.save_quiz, video_id, quiz_doc)
+    video_reads.invalidate(('quizzes', video_id))
+    video_reads.invalidate(('segment_quizzes', video_id, segment_id))
+    if content_hash is not None:
+        quiz_content_cache.set((video_id, segment_id, content_hash), quiz_doc)
+    return quiz_data
+
+
+def start_quiz_pregeneration(job_id: str) -> None:
+    """Generate quizzes for every segment of a completed job in the background."""
+    task = asyncio.create_task(pregenerate_quizzes(job_id))
+    quiz_pregeneration_tasks.add(task)
+    task.add_done_callback(quiz_pregeneration_tasks.discard)
+
+
+async def pregenerate_segment_quiz(video_id: str, segment_number: int, progress: Dict[str, Any]) -> None:
+    async with quiz_pregeneration_slots:
+        try:
+            segment = await run_db(storage.get_segment, video_id, segment_number)
+            if segment is None:
+                raise ValueError(f"Segment {segment_number} not found")
+            quiz_segment = build_quiz_segment(segment)
+            prior_context = await get_prior_context(video_id, segment_number)
+            content_hash = quiz_content_hash(quiz_segment, QUIZ_PREGENERATION_QUESTIONS, prior_context)
+            if await find_cached_quiz(video_id, segment_number, content_hash) is None:
+                await generate_and_store_quiz(video_id, segment_number, quiz_segment,
+                                              QUIZ_PREGENERATION_QUESTIONS, content_hash, prior_context)
+            progress['completed'] += 1
+        except Exception as e:
+            print(f"[{video_id}] Quiz pre-generation failed for segment {segment_number}: {e}")
+            progress['failed'] += 1
+
+
+async def pregenerate_quizzes(job_id: str) -> None:
+    """
+    Store a quiz for each segment of a freshly ingested video, at most QUIZ_PREGENERATION_CONCURRENCY at a time
+    across all videos. Progress is kept on the job and the final summary on the video document.
+    """
+    progress = {
+        'status': 'running',
+        'total': 0,
+        'completed': 0,
+        'failed': 0,
+        'started_at': datetime.now().isoformat()
+    }
+    job = jobs.get(job_id)
+    if job is not None:
+        job['quiz_pregeneration'] = progress
+    
+    try:
+        outline = await run_db(get_segment_outline, job_id)
+        progress['total'] = len(outline)
+        await asyncio.gather(*(
+            pregenerate_segment_quiz(job_id, segment['segment_number'], progress)
+            for segment in outline if segment.get('segment_number') is not None
+        ))
+        progress['status'] = 'completed' if progress['failed'] == 0 else 'completed_with_errors'
+    except asyncio.CancelledError:
+        progress['status'] = 'cancelled'
+        raise
+    except Exception as e:
+        print(f"[{job_id}] Quiz pre-generation failed: {e}")
+        progress['status'] = 'failed'
+        progress['error'] = str(e)
+    finally:
+        progress['finished_at'] = datetime.now().isoformat()
+        try:
+            await run_db(update_video, job_id, {'quiz_pregeneration': dict(progress)})
+        except Exception as e:
+            print(f"[{job_id}] Could not store quiz pre-generation progress: {e}")
+    print(f"[{job_id}] Quiz pre-generation {progress['status']}: {progress['completed']}/{progress['total']} segments")
+
+
 @app.post("/video/segment-questions")
-def generate_segment_questions_endpoint(request: SegmentQuestionsRequest):
-    """Generate questions for a specific segment of a video and store in Firestore."""
+async def generate_segment_questions_endpoint(request: SegmentQuestionsRequest):
+    """
+    Generate questions for a specific segment of a video and store in Firestore.
+    A quiz already generated from the same segment content and num_questions is returned as-is unless fresh is set.
+    """
     try:
         # Get specific segment from subcollection
-        segment_ref = db.collection('videos').document(request.video_id).collection('segments').document(str(request.segment_id))
-        segment_doc = segment_ref.get()
-        
-        if segment_doc.exists:
-            segment = segment_doc.to_dict()
-
-            # Construct clean segment object for Kotlin API
-            clean_segment = {
-                "segment_title": segment.get("segment_title", "Untitled Segment"),
-                "segment_start_timestamp": segment.get("segment_start_timestamp", 0.0),
-                "segment_end_timestamp": segment.get("segment_end_timestamp", 0.0),
-                "transcript": segment.get("transcript", [])
-            }
-
-            # Make the API call to the quiz generation service
-            payload = {
-                "segments": [clean_segment],
-                "questions_per_segment": request.num_questions
-            }
-            response = requests.post(
-                "http://localhost:8080/quiz/structured",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            if response.status_code == 200:
-                quiz_data = response.json()
-                
-                # Store the quiz in Firestore
-                quiz_id = quiz_data.get('quiz_id')
-                
-                # Add unique question numbers to each question
-                questions = quiz_data.get('questions', [])
-                for idx, question in enumerate(questions, start=1):
-                    question['question_number'] = idx
-                
-                quiz_doc = {
-                    'quiz_id': quiz_id,
-                    'video_id': request.video_id,
-                    'segment_id': request.segment_id,
-                    'source_window_minutes': quiz_data.get('source_window_minutes', 0),
-                    'questions': questions,
-                    'created_at': datetime.now().isoformat()
-                }
-                
-                # Store in subcollection: videos/{video_id}/quizzes/{quiz_id}
-                quiz_ref = db.collection('videos').document(request.video_id) \
-                            .collection('quizzes').document(quiz_id)
-                quiz_ref.set(quiz_doc)
-                
+        segment = await run_db(storage.get_segment, request.video_id, request.segment_id)
+        if segment is None:
+            raise HTTPException(status_code=404, detail="Segment not found")
+        
+        clean_segment = build_quiz_segment(segment)
+        prior_context = await get_prior_context(request.video_id, request.segment_id)
+        content_hash = quiz_content_hash(clean_segment, request.num_questions, prior_context)
+        if not request.fresh:
+            cached_quiz = await find_cached_quiz(request.video_id, request.segment_id, content_hash)
+            if cached_quiz is not None:
                 return {
                     "video_id": request.video_id,
                     "segment_id": request.segment_id,
-                    "quiz_id": quiz_id,
-                    "quiz_data": quiz_data,
-                    "stored": True
+                    "quiz_id": cached_quiz.get('quiz_id'),
+                    "quiz_data": quiz_response_data(cached_quiz),
+                    "stored": True,
+                    "cached": True
                 }
-            else:
-                raise HTTPException(status_code=500, detail=f"Quiz generation failed: {response.text}")
         
-        raise HTTPException(status_code=404, detail="Segment not found")
+        quiz_data = await generate_and_store_quiz(request.video_id, request.segment_id, clean_segment,
+                                                  request.num_questions, content_hash, prior_context)
+        
+        return {
+            "video_id": request.video_id,
+            "segment_id": request.segment_id,
+            "quiz_id": quiz_data.get('quiz_id'),
+            "quiz_data": quiz_response_data(quiz_data),
+            "stored": True,
+            "cached": False
+        }
+    except HTTPException:
+        raise
+    except QuizServiceUnavailable:
+        raise HTTPException(status_code=503, detail="Quiz service unavailable. Make sure quiz-service is running on port 8080.")
+    except QuizServiceError as e:
+        raise HTTPException(status_code=500, detail=f"Quiz generation failed: {e.body}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating questions: {str(e)}")
 
@@ -429,50 +1069,20 @@ async def generate_segment_questions_direct(request: DirectSegmentQuestionsReque
             ]
         }
         
-        # Make the API call to the quiz generation service
-        response = requests.post(
-            "http://localhost:8080/quiz/structured",
-            json={"segments": [segment]},
-            headers={"Content-Type": "application/json"}
-        )
+        segment_id = request.segment.segment_number
+        quiz_data = await generate_and_store_quiz(request.video_id, segment_id, segment)
         
-        if response.status_code == 200:
-            quiz_data = response.json()
-            
-            # Store the quiz in Firestore
-            quiz_id = quiz_data.get('quiz_id')
-            segment_id = request.segment.segment_number
-            
-            # Add unique question numbers to each question
-            questions = quiz_data.get('questions', [])
-            for idx, question in enumerate(questions, start=1):
-                question['question_number'] = idx
-            
-            quiz_doc = {
-                'quiz_id': quiz_id,
-                'video_id': request.video_id,
-                'segment_id': segment_id,
-                'source_window_minutes': quiz_data.get('source_window_minutes', 0),
-                'questions': questions,
-                'created_at': datetime.now().isoformat()
-            }
-            
-            # Store in subcollection: videos/{video_id}/quizzes/{quiz_id}
-            quiz_ref = db.collection('videos').document(request.video_id) \
-                        .collection('quizzes').document(quiz_id)
-            quiz_ref.set(quiz_doc)
-            
-            return {
-                "video_id": request.video_id,
-                "segment_id": segment_id,
-                "quiz_id": quiz_id,
-                "quiz_data": quiz_data,
-                "stored": True
-            }
-        else:
-            raise HTTPException(status_code=500, detail=f"Quiz generation failed: {response.text}")
-    except requests.exceptions.ConnectionError:
+        return {
+            "video_id": request.video_id,
+            "segment_id": segment_id,
+            "quiz_id": quiz_data.get('quiz_id'),
+            "quiz_data": quiz_data,
+            "stored": True
+        }
+    except QuizServiceUnavailable:
         raise HTTPException(status_code=503, detail="Quiz service unavailable. Make sure quiz-service is running on port 8080.")
+    except QuizServiceError as e:
+        raise HTTPException(status_code=500, detail=f"Quiz generation failed: {e.body}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating questions: {str(e)}")
 
@@ -511,15 +1121,12 @@ async def generate_video_questions_endpoint(request: VideoQuestionsRequest):
     """Generate questions for the entire video."""
     try:
         # Get video metadata
-        video_doc = db.collection('videos').document(request.video_id).get()
-        if not video_doc.exists:
+        video_data = await run_db(storage.get_video, request.video_id)
+        if video_data is None:
             raise HTTPException(status_code=404, detail="Video not found")
-            
-        video_data = video_doc.to_dict()
         
-        # Get all segments from subcollection
-        segments_ref = db.collection('videos').document(request.video_id).collection('segments')
-        segments = [segment.to_dict() for segment in segments_ref.stream()]
+        # Only the segment count is needed, the outline gives it without reading transcripts
+        segments = await run_db(get_segment_outline, request.video_id)
         
         # Placeholder for question generation logic, based on video and segments
         questions = [
@@ -538,32 +1145,85 @@ async def generate_video_questions_endpoint(request: VideoQuestionsRequest):
             "total_segments": len(segments)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating video questions: {str(e)}")
 
 
+def fetch_video_feed_page(limit: int, cursor: Optional[str] = None, status: Optional[str] = None,
+                          topic: Optional[str] = None) -> Optional[tuple]:
+    """One page of videos newest first as (videos, has_more), or None if cursor is not a known video."""
+    page = storage.video_feed_page(limit, cursor, status, topic)
+    if page is None:
+        return None
+    video_rows, has_more = page
+    
+    videos = []
+    for video_id, video_data in video_rows:
+        videos.append({
+            'video_id': video_id,
+            'lecture_url': video_data.get('lecture_url', ''),
+            'lecture_title': video_data.get('lecture_title', ''),
+            'lecture_topic': video_data.get('lecture_topic', ''),
+            'segment_count': video_data.get('segment_count', 0),
+            'status': video_data.get('status', ''),
+            'created_at': video_data.get('created_at', ''),
+            'video_filename': video_data.get('video_filename', '')
+        })
+    return videos, has_more
+
+
+def fetch_video_feed(status: Optional[str] = None, topic: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Every video matching the filters newest first, read a page at a time."""
+    videos, cursor = [], None
+    while True:
+        page_videos, has_more = fetch_video_feed_page(VIDEO_FEED_MAX_PAGE_SIZE, cursor, status, topic)
+        videos.extend(page_videos)
+        if not has_more:
+            return videos
+        cursor = page_videos[-1]['video_id']
+
+
 @app.get("/video/feed")
-def get_video_feed_endpoint():
-    """Retrieve a feed of all processed videos with metadata."""
+async def get_video_feed_endpoint(
+    limit: Optional[int] = Query(None, ge=1, le=VIDEO_FEED_MAX_PAGE_SIZE,
+                                 description="Videos per page; without limit or cursor every video is returned"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    status: Optional[str] = Query(None, description="Only videos with this status"),
+    topic: Optional[str] = Query(None, description="Only videos with this lecture topic")
+):
+    """
+    Retrieve videos with metadata, newest first. With limit or cursor the feed is paged and next_cursor
+    continues it; total_videos is always the number of videos matching the filters.
+    """
+    cache_key = (status, topic, limit)
+    if cursor is None:
+        cached = video_feed_cache.get(cache_key)
+        if cached is not None:
+            return FastJSONResponse(cached)
+    
     try:
-        videos_ref = db.collection('videos')
-        videos = []
-        for video_doc in videos_ref.stream():
-            video_data = video_doc.to_dict()
-            videos.append({
-                'video_id': video_doc.id,
-                'lecture_title': video_data.get('lecture_title', ''),
-                'lecture_topic': video_data.get('lecture_topic', ''),
-                'segment_count': video_data.get('segment_count', 0),
-                'status': video_data.get('status', ''),
-                'created_at': video_data.get('created_at', '')
-            })
-        
-        return {
-            'videos': videos,
-            'total_videos': len(videos)
-        }
+        if limit is None and cursor is None:
+            videos = await run_db(fetch_video_feed, status, topic)
+            response = {'videos': videos, 'total_videos': len(videos), 'next_cursor': None}
+        else:
+            page = await run_db(fetch_video_feed_page, limit or VIDEO_FEED_DEFAULT_PAGE_SIZE, cursor, status, topic)
+            if page is None:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            videos, has_more = page
+            response = {
+                'videos': videos,
+                'total_videos': await run_db(storage.count_videos, status, topic),
+                'next_cursor': videos[-1]['video_id'] if has_more else None
+            }
+        if cursor is None:
+            video_feed_cache.set(cache_key, response)
+        # Plain JSON already, rendering it directly skips FastAPI's jsonable_encoder pass
+        return FastJSONResponse(response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving video feed: {str(e)}")
 
@@ -571,14 +1231,8 @@ def get_video_feed_endpoint():
 def get_next_segment_id(video_id: str, timestamp: float) -> Optional[int]:
     """Helper function to get the next segment ID after a given timestamp."""
     try:
-        segments_ref = db.collection('videos').document(video_id).collection('segments')
-        segments_query = segments_ref.where('segment_start_timestamp', '>', timestamp).order_by('segment_start_timestamp').limit(1)
-        
-        for segment_doc in segments_query.stream():
-            segment = segment_doc.to_dict()
-            return segment.get('segment_number')
-        
-        return None  # No next segment found
+        segment = get_segment_index(video_id).next_segment(timestamp)
+        return segment['segment_number'] if segment else None  # None when no next segment
     except Exception as e:
         print(f"Error retrieving next segment: {str(e)}")
         return None
@@ -589,24 +1243,18 @@ async def get_segment_quizzes_endpoint(video_id: str, segment_id: int):
     """Retrieve all quizzes stored for a specific segment."""
     try:
         # Query quizzes collection filtered by segment_id
-        quizzes_ref = db.collection('videos').document(video_id) \
-                       .collection('quizzes') \
-                       .where('segment_id', '==', segment_id)
-        
-        quizzes = []
-        for quiz_doc in quizzes_ref.stream():
-            quiz_data = quiz_doc.to_dict()
-            quizzes.append(quiz_data)
+        quizzes = await video_reads.do(('segment_quizzes', video_id, segment_id),
+                                       lambda: run_db(storage.list_segment_quizzes, video_id, segment_id))
         
-        # Sort by created_at descending
-        quizzes.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        # Sort by created_at descending (into a new list, the fetched one is shared)
+        quizzes = sorted(quizzes, key=lambda x: x.get('created_at', ''), reverse=True)
         
-        return {
+        return FastJSONResponse({
             'video_id': video_id,
             'segment_id': segment_id,
             'quizzes': quizzes,
             'total_quizzes': len(quizzes)
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving quizzes: {str(e)}")
 
@@ -616,18 +1264,13 @@ async def get_video_quizzes_endpoint(video_id: str):
     """Retrieve all quizzes stored for a video."""
     try:
         # Get all quizzes from the video's quizzes subcollection
-        quizzes_ref = db.collection('videos').document(video_id).collection('quizzes')
+        all_quizzes = await video_reads.do(('quizzes', video_id), lambda: run_db(storage.list_video_quizzes, video_id))
         
-        all_quizzes = []
-        for quiz_doc in quizzes_ref.order_by('created_at', direction=firestore.Query.DESCENDING).stream():
-            quiz_data = quiz_doc.to_dict()
-            all_quizzes.append(quiz_data)
-        
-        return {
+        return FastJSONResponse({
             'video_id': video_id,
             'quizzes': all_quizzes,
             'total_quizzes': len(all_quizzes)
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving quizzes: {str(e)}")
 
@@ -636,13 +1279,10 @@ async def get_video_quizzes_endpoint(video_id: str):
 async def get_quiz_by_id_endpoint(video_id: str, quiz_id: str):
     """Retrieve a specific quiz by its ID."""
     try:
-        quiz_ref = db.collection('videos').document(video_id) \
-                    .collection('quizzes').document(quiz_id)
-        
-        quiz_doc = quiz_ref.get()
+        quiz_data = await run_db(storage.get_quiz, video_id, quiz_id)
         
-        if quiz_doc.exists:
-            return quiz_doc.to_dict()
+        if quiz_data is not None:
+            return quiz_data
         else:
             raise HTTPException(status_code=404, detail="Quiz not found")
     except HTTPException:
@@ -663,16 +1303,16 @@ async def upload_video_endpoint(file: UploadFile = File(...)):
         file_extension = os.path.splitext(file.filename)[1] if file.filename else '.mp4'
         unique_filename = f"{uuid.uuid4()}{file_extension}"
         
-        # Save to FrontEnd/public/videos directory
-        video_dir = os.path.join(os.path.dirname(__file__), '..', 'FrontEnd', 'public', 'videos')
-        os.makedirs(video_dir, exist_ok=True)
+        # Save to the video storage directory
+        os.makedirs(VIDEO_DIR, exist_ok=True)
         
-        file_path = os.path.join(video_dir, unique_filename)
+        file_path = os.path.join(VIDEO_DIR, unique_filename)
         
         # Write file in chunks
         with open(file_path, 'wb') as f:
             while chunk := await file.read(1024 * 1024):  # Read 1MB at a time
                 f.write(chunk)
+        record_bytes("video_upload", os.path.getsize(file_path))
         
         return {
             "filename": unique_filename,
@@ -682,6 +1322,95 @@ async def upload_video_endpoint(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload video: {str(e)}")
 
+@app.post("/upload-lecture", response_model=dict, openapi_extra={
+    "requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "required": ["file", "lecture_title", "lecture_topic"],
+        "properties": {
+            "file": {"type": "string", "format": "binary"},
+            "lecture_title": {"type": "string"},
+            "lecture_topic": {"type": "string"},
+            "pregenerate_quizzes": {"type": "boolean"}
+        }
+    }}}}
+})
+async def upload_lecture_endpoint(request: Request):
+    """
+    Upload a lecture video and process it from the file (no download), returns a job ID for polling.
+    The multipart body is parsed as it arrives, so the video is written to disk and hashed in one pass.
+    """
+    if get_data_from_file is None:
+        raise HTTPException(status_code=503, detail="Transcription pipeline not available")
+    
+    try:
+        upload = await receive_upload(request, 'file', VIDEO_DIR)
+        record_bytes("video_upload", upload['size'])
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to upload video: {str(e)}")
+    
+    fields = upload['fields']
+    try:
+        lecture_request = LectureRequest(
+            lecture_url='',
+            lecture_title=fields.get('lecture_title'),
+            lecture_topic=fields.get('lecture_topic'),
+            video_filename=upload['filename'],
+            pregenerate_quizzes=fields.get('pregenerate_quizzes') or None
+        )
+    except ValidationError as e:
+        # The form fields can follow the file in the body, so they are only checked once it is stored
+        if not upload['already_stored']:
+            os.remove(os.path.join(VIDEO_DIR, upload['filename']))
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    
+    try:
+        job_id = await run_db(create_lecture_job, lecture_request, None, {
+            'source': 'upload',
+            'original_filename': upload['original_filename'],
+            'content_sha256': upload['sha256'],
+            'file_size': upload['size']
+        })
+        
+        video_path = os.path.join(VIDEO_DIR, upload['filename'])
+        job_scheduler.submit(lambda: lecture_processing_task(job_id, '', video_path), PRIORITY_INTERACTIVE)
+        
+        return {"job_id": job_id, "status": "submitted", "filename": upload['filename'], "size": upload['size'],
+                "sha256": upload['sha256']}
+    except Exception as e:
+        print(f"Error submitting uploaded lecture: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to submit lecture: {str(e)}")
+
+
+@app.get("/search")
+async def search_transcripts_endpoint(
+    q: str = Query(..., min_length=1, description="Search terms"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    video_id: Optional[str] = Query(None, description="Only search this video")
+):
+    """Find where a concept is discussed across all lectures; results carry jump-to timestamps in milliseconds."""
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(None, functools.partial(search_index.search, q, limit, video_id))
+    return {
+        'query': q,
+        'results': results,
+        'total_results': len(results)
+    }
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: request latency per route, pipeline stage timings, byte and token counters."""
+    return metrics_response()
+
+
+@app.get("/cache/stats")
+async def cache_stats_endpoint():
+    """Hits, misses, hit rate and size of every in-process cache."""
+    return cache_stats()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -690,11 +1419,16 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "submit_lecture": "POST /submit-lecture",
+            "submit_lectures": "POST /submit-lectures",
+            "batch_status": "GET /batch/{batch_id}",
             "upload_video": "POST /upload-video",
+            "upload_lecture": "POST /upload-lecture",
             "job_status": "GET /job-status/{job_id}",
             "delete_job": "DELETE /job/{job_id}",
+            "list_jobs": "GET /jobs",
             "video_segments": "GET /video/{video_id}/segments",
             "video_metadata": "GET /video/{video_id}/metadata",
+            "video_stream": "GET /video/{video_id}/stream",
             "segment_at_time": "GET /video/{video_id}/segment-at-time",
             "segment_questions": "POST /video/segment-questions",
             "segment_solution": "POST /video/segment-solution",
@@ -702,113 +1436,202 @@ async def root():
             "segment_quizzes": "GET /video/{video_id}/segment/{segment_id}/quizzes",
             "video_quizzes": "GET /video/{video_id}/quizzes",
             "get_quiz": "GET /video/{video_id}/quiz/{quiz_id}",
-            "submit_answer": "POST /video/submit-answer"
+            "submit_answer": "POST /video/submit-answer",
+            "submit_answers": "POST /video/submit-answers",
+            "metrics": "GET /metrics",
+            "cache_stats": "GET /cache/stats",
+            "search": "GET /search?q="
         }
     }
 
 
+def get_embedding_index(video_id: str):
+    """A video's transcript window index, loaded from disk or built from its segments for older videos."""
+    index = embedding_index_cache.get(video_id)
+    if index is None:
+        index = embedding_store.load(video_id)
+        if index is None:
+            segments = storage.list_segments(video_id)
+            if not segments:
+                return None
+            index = embedding_store.build_and_save(video_id, segments)
+        embedding_index_cache.set(video_id, index)
+    return index
+
+
+def retrieve_context(video_id: str, query: str, segment_numbers: Optional[List[int]] = None) -> str:
+    """The EMBEDDING_CONTEXT_WINDOWS transcript windows most relevant to query, joined in playback order."""
+    index = get_embedding_index(video_id)
+    if index is None:
+        return ""
+    windows = index.top_k(query, EMBEDDING_CONTEXT_WINDOWS, segment_numbers)
+    return " ".join(window['text'] for window in windows)
+
+
+def load_answer_context(video_id: str, quiz_id: str) -> Optional[Dict[str, Any]]:
+    """
+    The quiz and, for each short answer question, the transcript windows of its segment most relevant to the
+    question and expected answer. The whole segment transcript is only read when retrieval finds nothing.
+    Returns None if the quiz does not exist.
+    """
+    quiz_data = storage.get_quiz(video_id, quiz_id)
+    if quiz_data is None:
+        return None
+    
+    # Get transcript context from segment if available; MCQs are graded without it
+    segment_id = quiz_data.get('segment_id')
+    question_context = {}
+    full_transcript = None
+    for q in quiz_data.get('questions', []):
+        if q.get('type', 'mcq') == 'mcq' or not segment_id:
+            continue
+        try:
+            transcript = retrieve_context(video_id, f"{q.get('question', '')} {q.get('answer', '')}", [int(segment_id)])
+        except Exception as e:
+            print(f"Context retrieval failed for video {video_id}: {e}")
+            transcript = ""
+        if not transcript:
+            if full_transcript is None:
+                segment_data = storage.get_segment(video_id, segment_id) or {}
+                full_transcript = " ".join([t.get('text', '') for t in segment_data.get('transcript', [])])
+            transcript = full_transcript
+        question_context[q.get('question_number')] = transcript
+    
+    return {
+        'video_id': video_id,
+        'quiz_id': quiz_id,
+        'quiz': quiz_data,
+        'questions': {q.get('question_number'): q for q in quiz_data.get('questions', [])},
+        'question_context': question_context
+    }
+
+
+async def get_answer_context(video_id: str, quiz_id: str) -> Optional[Dict[str, Any]]:
+    context = answer_context_cache.get((video_id, quiz_id))
+    if context is None:
+        context = await run_db(load_answer_context, video_id, quiz_id)
+        if context is not None:
+            answer_context_cache.set((video_id, quiz_id), context)
+    return context
+
+
+async def grade_answer(context: Dict[str, Any], question: Dict[str, Any], user_answer: str) -> Dict[str, Any]:
+    """
+    is_correct and feedback for one answer. MCQs are graded locally; short answers are answered from the
+    verdict cache or go to the quiz service, falling back to a lenient comparison if it returns an error.
+    """
+    question_type = question.get('type', 'mcq')
+    correct_answer = question.get('answer', '')
+    
+    if question_type == 'mcq':
+        is_correct, feedback = grade_mcq(question, user_answer)
+        return {'is_correct': is_correct, 'feedback': feedback}
+    
+    normalized = normalize_answer(user_answer)
+    verdict_key = (context['video_id'], context['quiz_id'], question.get('question_number'), normalized)
+    if normalized:
+        verdict = answer_verdict_cache.get(verdict_key)
+        if verdict is not None:
+            return verdict
+    
+    # Call the Kotlin validation service
+    validation_payload = {
+        "transcript": context['question_context'].get(question.get('question_number'), ""),
+        "question_text": question.get('question', ''),
+        "question_type": question_type,
+        "correct_answer": correct_answer,
+        "user_answer": user_answer,
+        "options": question.get('options')
+    }
+    try:
+        result = await quiz_service.validate_answer(validation_payload)
+    except QuizServiceError:
+        # Fallback verdicts are not cached, the service may grade this answer differently once it recovers
+        is_correct, feedback = grade_short_answer_leniently(correct_answer, user_answer)
+        return {'is_correct': is_correct, 'feedback': feedback}
+    
+    verdict = {'is_correct': result.get('is_correct', False), 'feedback': result.get('feedback', '')}
+    if normalized:
+        answer_verdict_cache.set(verdict_key, verdict)
+    return verdict
+
+
 @app.post("/video/submit-answer", response_model=AnswerValidationResponse)
 async def submit_answer(request: AnswerSubmission):
-    """Submit a user's answer and get AI-powered validation with feedback."""
+    """Submit a user's answer and get validation with feedback (AI-powered for short answers)."""
     try:
-        # Get the quiz from Firestore
-        quiz_ref = db.collection('videos').document(request.video_id) \
-                    .collection('quizzes').document(request.quiz_id)
-        quiz_doc = quiz_ref.get()
-        
-        if not quiz_doc.exists:
+        context = await get_answer_context(request.video_id, request.quiz_id)
+        if context is None:
             raise HTTPException(status_code=404, detail="Quiz not found")
         
-        quiz_data = quiz_doc.to_dict()
-        questions = quiz_data.get('questions', [])
-        
         # Find the question by question_number
-        question = None
-        for q in questions:
-            if q.get('question_number') == request.question_number:
-                question = q
-                break
-        
+        question = context['questions'].get(request.question_number)
         if not question:
             raise HTTPException(status_code=404, detail=f"Question {request.question_number} not found")
         
-        # Get transcript context from segment if available
-        segment_id = quiz_data.get('segment_id')
-        transcript = ""
-        if segment_id:
-            segment_ref = db.collection('videos').document(request.video_id) \
-                          .collection('segments').document(str(segment_id))
-            segment_doc = segment_ref.get()
-            if segment_doc.exists:
-                segment_data = segment_doc.to_dict()
-                transcript_entries = segment_data.get('transcript', [])
-                transcript = " ".join([t.get('text', '') for t in transcript_entries])
-        
-        # Call the Kotlin validation service
-        validation_payload = {
-            "transcript": transcript,
-            "question_text": question.get('question', ''),
-            "question_type": question.get('type', 'mcq'),
-            "correct_answer": question.get('answer', ''),
+        verdict = await grade_answer(context, question, request.user_answer)
+        return {
+            "video_id": request.video_id,
+            "quiz_id": request.quiz_id,
+            "question_number": request.question_number,
+            "is_correct": verdict['is_correct'],
             "user_answer": request.user_answer,
-            "options": question.get('options')
+            "correct_answer": question.get('answer', ''),
+            "feedback": verdict['feedback'],
+            "explanation": question.get('explanation', '')
         }
+    except QuizServiceUnavailable:
+        raise HTTPException(status_code=503, detail="Validation service unavailable")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error validating answer: {str(e)}")
+
+
+@app.post("/video/submit-answers", response_model=BatchAnswerValidationResponse)
+async def submit_answers(request: BatchAnswerSubmission):
+    """Submit all answers for a quiz in one request; short answers are validated concurrently."""
+    try:
+        context = await get_answer_context(request.video_id, request.quiz_id)
+        if context is None:
+            raise HTTPException(status_code=404, detail="Quiz not found")
         
-        response = requests.post(
-            "http://localhost:8080/quiz/validate-answer",
-            json=validation_payload,
-            headers={"Content-Type": "application/json"},
-            timeout=30
-        )
+        questions = []
+        for answer in request.answers:
+            question = context['questions'].get(answer.question_number)
+            if not question:
+                raise HTTPException(status_code=404, detail=f"Question {answer.question_number} not found")
+            questions.append(question)
         
-        if response.status_code == 200:
-            result = response.json()
-            
-            return {
-                "video_id": request.video_id,
-                "quiz_id": request.quiz_id,
-                "question_number": request.question_number,
-                "is_correct": result.get('is_correct', False),
-                "user_answer": request.user_answer,
-                "correct_answer": question.get('answer', ''),
-                "feedback": result.get('feedback', ''),
-                "explanation": question.get('explanation', '')
-            }
-        else:
-            # Fallback to lenient comparison
-            correct_answer = question.get('answer', '')
-            question_type = question.get('type', 'mcq')
-            
-            if question_type == 'mcq':
-                is_correct = request.user_answer.strip().upper() == correct_answer.strip().upper()
-            else:
-                # Lenient short answer comparison - check for word overlap
-                user_words = set(w.lower() for w in request.user_answer.split() if len(w) > 2)
-                correct_words = set(w.lower() for w in correct_answer.split() if len(w) > 2)
-                overlap = user_words & correct_words
-                # Check for substring matches or stem matches
-                has_overlap = len(overlap) > 0
-                has_substring = request.user_answer.lower()[:15] in correct_answer.lower() or correct_answer.lower()[:15] in request.user_answer.lower()
-                has_stem_match = any(uw in cw or cw in uw for uw in user_words for cw in correct_words)
-                is_correct = has_overlap or has_substring or has_stem_match
-            
-            return {
-                "video_id": request.video_id,
-                "quiz_id": request.quiz_id,
-                "question_number": request.question_number,
-                "is_correct": is_correct,
-                "user_answer": request.user_answer,
-                "correct_answer": correct_answer,
-                "feedback": "Good answer!" if is_correct else f"The expected answer was: {correct_answer}",
-                "explanation": question.get('explanation', '')
-            }
-            
-    except requests.exceptions.ConnectionError:
+        verdicts = await asyncio.gather(*(
+            grade_answer(context, question, answer.user_answer)
+            for question, answer in zip(questions, request.answers)
+        ))
+        
+        results = [{
+            "video_id": request.video_id,
+            "quiz_id": request.quiz_id,
+            "question_number": answer.question_number,
+            "is_correct": verdict['is_correct'],
+            "user_answer": answer.user_answer,
+            "correct_answer": question.get('answer', ''),
+            "feedback": verdict['feedback'],
+            "explanation": question.get('explanation', '')
+        } for question, answer, verdict in zip(questions, request.answers, verdicts)]
+        
+        return {
+            "video_id": request.video_id,
+            "quiz_id": request.quiz_id,
+            "total_questions": len(results),
+            "correct_count": sum(1 for r in results if r['is_correct']),
+            "results": results
+        }
+    except QuizServiceUnavailable:
         raise HTTPException(status_code=503, detail="Validation service unavailable")
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error validating answer: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error validating answers: {str(e)}")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,80 @@
+import time
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, CounterMetricFamily
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cache import all_cache_stats
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "lectureai_http_request_duration_seconds",
+    "FastAPI request latency by route",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+
+class CacheStatsCollector:
+    """Exports the hit/miss counters of every named cache at scrape time."""
+
+    def collect(self):
+        hits = CounterMetricFamily("lectureai_cache_hits", "Cache hits by cache", labels=["cache"])
+        misses = CounterMetricFamily("lectureai_cache_misses", "Cache misses by cache", labels=["cache"])
+        for stats in all_cache_stats():
+            hits.add_metric([stats.name], stats.hits)
+            misses.add_metric([stats.name], stats.misses)
+        yield hits
+        yield misses
+
+
+REGISTRY.register(CacheStatsCollector())
+
+
+def route_template(scope: Scope) -> str:
+    """The matched route's path template (e.g. /video/{video_id}/segments), to keep label cardinality bounded."""
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware observing request latency for every route. Messages are forwarded untouched, so
+    server extensions such as http.response.zerocopysend reach the server (call_next-style middleware
+    only passes http.response.body through).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(
+                method=scope["method"],
+                route=route_template(scope),
+                status=str(status),
+            ).observe(time.perf_counter() - start)
+
+
+def metrics_response() -> Response:
+    """Everything registered with the default Prometheus registry, in text exposition format."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+class QuizServiceUnavailable(Exception):
+    """The quiz service could not be reached, dropped the connection or did not answer in time."""
+
+
+class QuizServiceError(Exception):
+    """The quiz service answered with a non-200 status."""
+
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"Quiz service returned {status_code}: {body}")
+        self.status_code = status_code
+        self.body = body
+
+
+class QuizServiceClient:
+    """
+    Shared async client for the Kotlin quiz service.
+
+    One pooled httpx.AsyncClient is opened at app startup and reused (keep-alive), each route has its
+    own timeout, and at most max_concurrency requests are in flight so a burst of slow LLM generations
+    queues here instead of piling onto the quiz service.
+    """
+
+    def __init__(self, base_url: str, max_concurrency: int = 8, generation_timeout: float = 120.0,
+                 validation_timeout: float = 30.0, connect_timeout: float = 5.0):
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.generation_timeout = generation_timeout
+        self.validation_timeout = validation_timeout
+        self.connect_timeout = connect_timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            timeout=httpx.Timeout(self.validation_timeout, connect=self.connect_timeout),
+        )
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def generate_structured_quiz(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /quiz/structured"""
+        return await self._post("/quiz/structured", payload, self.generation_timeout)
+
+    async def validate_answer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /quiz/validate-answer"""
+        return await self._post("/quiz/validate-answer", payload, self.validation_timeout)
+
+    async def _post(self, path: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        if self._client is None:
+            await self.start()
+        async with self._slots:
+            try:
+                response = await self._client.post(
+                    path,
+                    json=payload,
+                    timeout=httpx.Timeout(timeout, connect=self.connect_timeout),
+                )
+            except httpx.TransportError as e:
+                # Connect, timeout, protocol and read errors alike: the service is unreachable, not wrong
+                raise QuizServiceUnavailable(f"{path}: {e!r}") from e
+        if response.status_code != 200:
+            raise QuizServiceError(response.status_code, response.text)
+        return response.json()
@@ -0,0 +1,125 @@
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from answer_grading import normalize_answer
+
+# (video_id, segment_number, index of the transcript entry in the segment)
+DocKey = Tuple[str, Any, int]
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i if in into is it its of on or so that the their then there
+these they this to was we were what when where which who will with you your our us do does did not can just
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Search terms of a text: the same normalization (case, punctuation, suffixes) as short answers, minus stopwords."""
+    return [term for term in normalize_answer(text).split() if term not in STOPWORDS]
+
+
+class TranscriptSearchIndex:
+    """
+    In-memory inverted index over transcript entries with BM25 ranking.
+
+    Every transcript entry (a few seconds of speech) is one document, so a hit points at the exact moment a
+    term is said. Videos are added or replaced whole, as they are ingested.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[DocKey, int]] = defaultdict(dict)
+        self._docs: Dict[DocKey, Dict[str, Any]] = {}
+        self._video_terms: Dict[str, set] = {}
+        self._video_docs: Dict[str, List[DocKey]] = {}
+        self._video_titles: Dict[str, str] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def video_count(self) -> int:
+        return len(self._video_terms)
+
+    def add_video(self, video_id: str, segments: List[Dict[str, Any]], lecture_title: str = '') -> None:
+        """Index (or re-index) every transcript entry of a video's segments."""
+        with self._lock:
+            self.remove_video(video_id)
+            terms_seen = set()
+            doc_keys = []
+            for segment in segments:
+                segment_number = segment.get('segment_number')
+                for i, entry in enumerate(segment.get('transcript') or []):
+                    text = entry.get('text', '')
+                    terms = Counter(tokenize(text))
+                    if not terms:
+                        continue
+                    key = (video_id, segment_number, i)
+                    length = sum(terms.values())
+                    self._docs[key] = {
+                        'segment_title': segment.get('segment_title', ''),
+                        'start_ms': int(round(entry.get('start_timestamp', 0.0) * 1000)),
+                        'end_ms': int(round(entry.get('end_timestamp', 0.0) * 1000)),
+                        'text': text,
+                        'length': length
+                    }
+                    self._total_length += length
+                    doc_keys.append(key)
+                    for term, tf in terms.items():
+                        self._postings[term][key] = tf
+                    terms_seen.update(terms)
+            self._video_terms[video_id] = terms_seen
+            self._video_docs[video_id] = doc_keys
+            self._video_titles[video_id] = lecture_title
+
+    def remove_video(self, video_id: str) -> None:
+        with self._lock:
+            for term in self._video_terms.pop(video_id, ()):
+                postings = self._postings[term]
+                for key in [key for key in postings if key[0] == video_id]:
+                    del postings[key]
+                if not postings:
+                    del self._postings[term]
+            for key in self._video_docs.pop(video_id, ()):
+                self._total_length -= self._docs.pop(key)['length']
+            self._video_titles.pop(video_id, None)
+
+    def search(self, query: str, limit: int = 20, video_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Best matching transcript entries for query across the library (or one video), highest score first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or not self._docs:
+                return []
+            doc_count = len(self._docs)
+            avg_length = self._total_length / doc_count
+            scores: Dict[DocKey, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    if video_id is not None and key[0] != video_id:
+                        continue
+                    length = self._docs[key]['length']
+                    scores[key] += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+
+            results = []
+            for key, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+                doc = self._docs[key]
+                results.append({
+                    'video_id': key[0],
+                    'lecture_title': self._video_titles.get(key[0], ''),
+                    'segment_id': str(key[1]),
+                    'segment_title': doc['segment_title'],
+                    'start_ms': doc['start_ms'],
+                    'end_ms': doc['end_ms'],
+                    'text': doc['text'],
+                    'score': round(score, 4)
+                })
+            return results
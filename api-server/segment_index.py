@@ -0,0 +1,39 @@
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional
+
+
+class SegmentIntervalIndex:
+    """
+    Sorted segment boundaries for one video, answering "which segment is playing at t" by binary search.
+
+    Each segment is a dict with segment_id, segment_number, segment_title, segment_start_timestamp and
+    segment_end_timestamp (no transcript), so an index is small enough to keep many of them cached.
+    """
+
+    def __init__(self, segments: List[Dict[str, Any]]):
+        self.segments = sorted(segments, key=lambda s: s.get('segment_start_timestamp', 0.0))
+        self._starts = [s.get('segment_start_timestamp', 0.0) for s in self.segments]
+        # Running max of end timestamps, lets lookups step back over overlapping chapters
+        self._max_ends = []
+        max_end = float('-inf')
+        for segment in self.segments:
+            max_end = max(max_end, segment.get('segment_end_timestamp', 0.0))
+            self._max_ends.append(max_end)
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def segment_at(self, timestamp: float) -> Optional[Dict[str, Any]]:
+        """The segment covering timestamp (bounds inclusive), or None if it falls in a gap or past the end."""
+        i = bisect_right(self._starts, timestamp) - 1
+        # Walk back only while an earlier segment could still reach timestamp
+        while i >= 0 and self._max_ends[i] >= timestamp:
+            if self.segments[i].get('segment_end_timestamp', 0.0) >= timestamp:
+                return self.segments[i]
+            i -= 1
+        return None
+
+    def next_segment(self, timestamp: float) -> Optional[Dict[str, Any]]:
+        """The first segment starting strictly after timestamp."""
+        i = bisect_right(self._starts, timestamp)
+        return self.segments[i] if i < len(self.segments) else None
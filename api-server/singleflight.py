@@ -0,0 +1,84 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from cache import CacheStats
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads: the first caller for a key starts the fetch, everyone arriving
+    while it runs awaits the same task, and the result is reused for ttl_seconds afterwards.
+
+    Only successful results are kept. The fetch runs as its own task, so a caller disconnecting does not
+    cancel it for the others. Results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float = 1.0, maxsize: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.stats = CacheStats(name)
+        self.stats.size_fn = lambda: len(self._results)
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._results: Dict[Hashable, tuple] = {}
+        # Bumped when a key is invalidated mid-fetch, so that fetch's result is not stored afterwards
+        self._generations: Dict[Hashable, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        self._loop = asyncio.get_running_loop()
+        entry = self._results.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            if time.monotonic() - stored_at < self.ttl_seconds:
+                self.stats.record(hit=True)
+                return value
+            self._results.pop(key, None)
+
+        task = self._in_flight.get(key)
+        self.stats.record(hit=task is not None)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[key] = task
+            generation = self._generations.get(key, 0)
+            task.add_done_callback(lambda t: self._finished(key, t, generation))
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Forget a stored result. A fetch already in flight still completes for its waiters, but its result is not
+        stored and later callers start a new fetch. Safe to call from any thread: the state belongs to the event
+        loop, so calls from other threads are handed to it.
+        """
+        loop = self._loop
+        if loop is not None and not loop.is_closed() and not self._on_loop(loop):
+            loop.call_soon_threadsafe(self._invalidate, key)
+        else:
+            self._invalidate(key)
+
+    @staticmethod
+    def _on_loop(loop: asyncio.AbstractEventLoop) -> bool:
+        try:
+            return asyncio.get_running_loop() is loop
+        except RuntimeError:
+            return False
+
+    def _invalidate(self, key: Hashable) -> None:
+        self._results.pop(key, None)
+        if self._in_flight.pop(key, None) is not None:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def _finished(self, key: Hashable, task: asyncio.Task, generation: int) -> None:
+        if self._in_flight.get(key) is task:
+            self._in_flight.pop(key)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self._generations.get(key, 0) != generation:
+            return
+        if len(self._results) >= self.maxsize:
+            now = time.monotonic()
+            for stale in [k for k, (_, stored_at) in list(self._results.items()) if now - stored_at >= self.ttl_seconds]:
+                self._results.pop(stale, None)
+            if len(self._results) >= self.maxsize:
+                self._results.clear()
+        self._results[key] = (task.result(), time.monotonic())
@@ -0,0 +1,498 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+SEGMENT_OUTLINE_FIELDS = ['segment_number', 'segment_title', 'segment_start_timestamp', 'segment_end_timestamp']
+VIDEO_FEED_FIELDS = ['lecture_url', 'lecture_title', 'lecture_topic', 'segment_count', 'status', 'created_at', 'video_filename']
+
+
+def outline_entry(segment_id: str, segment: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'segment_id': segment_id,
+        'segment_number': segment.get('segment_number'),
+        'segment_title': segment.get('segment_title', ''),
+        'segment_start_timestamp': segment.get('segment_start_timestamp', 0.0),
+        'segment_end_timestamp': segment.get('segment_end_timestamp', 0.0)
+    }
+
+
+class Repository(ABC):
+    """
+    Storage for videos, their segments and quizzes, and batch submissions.
+
+    Layout mirrors Firestore: videos/{video_id} with segments/{segment_number}, summaries/{segment_number} and
+    quizzes/{quiz_id} under it, and batches/{batch_id}. All methods are blocking; the API calls them through run_db.
+    """
+
+    @abstractmethod
+    def get_video(self, video_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def create_video(self, video_id: str, video_data: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def update_video(self, video_id: str, fields: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def video_feed_page(self, limit: int, cursor: Optional[str] = None, status: Optional[str] = None,
+                        topic: Optional[str] = None) -> Optional[Tuple[List[Tuple[str, Dict[str, Any]]], bool]]:
+        """
+        One page of (video_id, VIDEO_FEED_FIELDS) newest first as (videos, has_more),
+        or None if cursor is not a known video. status and topic are equality filters.
+        """
+
+    @abstractmethod
+    def count_videos(self, status: Optional[str] = None, topic: Optional[str] = None) -> int:
+        """Number of videos matching the same filters as video_feed_page."""
+
+    @abstractmethod
+    def list_video_ids(self, status: Optional[str] = None) -> List[str]: ...
+
+    @abstractmethod
+    def get_segment(self, video_id: str, segment_id) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def list_segments(self, video_id: str) -> List[Dict[str, Any]]:
+        """Every segment of a video, with transcripts, ordered by segment_number."""
+
+    @abstractmethod
+    def list_segment_outline(self, video_id: str) -> List[Dict[str, Any]]:
+        """Outline entries (no transcripts) read from the segments themselves, ordered by segment_number."""
+
+    @abstractmethod
+    def write_segments(self, video_id: str, segments: List[Dict[str, Any]], video_update: Dict[str, Any]) -> None:
+        """Store a video's segments, applying video_update only once every segment is stored."""
+
+    @abstractmethod
+    def get_segment_summary(self, video_id: str, segment_number) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def list_segment_summaries(self, video_id: str) -> List[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def write_segment_summaries(self, video_id: str, summaries: List[Dict[str, Any]]) -> None:
+        """Store one summary entry per segment, kept apart from the video document so its reads stay small."""
+
+    @abstractmethod
+    def get_quiz(self, video_id: str, quiz_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def list_segment_quizzes(self, video_id: str, segment_id: int) -> List[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def list_video_quizzes(self, video_id: str) -> List[Dict[str, Any]]:
+        """All quizzes for a video, newest first."""
+
+    @abstractmethod
+    def find_quiz_by_content_hash(self, video_id: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """A stored quiz generated from identical segment content and parameters, if there is one."""
+
+    @abstractmethod
+    def save_quiz(self, video_id: str, quiz_doc: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def save_batch(self, batch: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]: ...
+
+
+class FirestoreRepository(Repository):
+    # Firestore batched writes: at most 500 writes and 10 MiB per commit
+    BATCH_MAX_WRITES = 500
+    BATCH_MAX_BYTES = 9 * 1024 * 1024
+    WRITE_PARALLELISM = 4
+    COMMIT_ATTEMPTS = 3
+    RETRY_BASE_DELAY = 0.5
+
+    def __init__(self, credentials_path: str = "ic_hack.json"):
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        cred = credentials.Certificate(credentials_path)
+        firebase_admin.initialize_app(cred)
+        self._firestore = firestore
+        self.db = firestore.client()
+
+    def _video_ref(self, video_id: str):
+        return self.db.collection('videos').document(video_id)
+
+    def get_video(self, video_id: str) -> Optional[Dict[str, Any]]:
+        video_doc = self._video_ref(video_id).get()
+        return video_doc.to_dict() if video_doc.exists else None
+
+    def create_video(self, video_id: str, video_data: Dict[str, Any]) -> None:
+        self._video_ref(video_id).set(video_data)
+
+    def update_video(self, video_id: str, fields: Dict[str, Any]) -> None:
+        self._video_ref(video_id).update(fields)
+
+    def video_feed_page(self, limit, cursor=None, status=None, topic=None):
+        videos_query = self.db.collection('videos')
+        if status:
+            videos_query = videos_query.where('status', '==', status)
+        if topic:
+            videos_query = videos_query.where('lecture_topic', '==', topic)
+        # Filtered pages need the composite indexes (filter fields + created_at) in firestore.indexes.json
+        videos_query = videos_query.select(VIDEO_FEED_FIELDS).order_by(
+            'created_at', direction=self._firestore.Query.DESCENDING)
+
+        if cursor:
+            cursor_doc = self._video_ref(cursor).get()
+            if not cursor_doc.exists:
+                return None
+            videos_query = videos_query.start_after(cursor_doc)
+
+        # One extra document tells us whether another page exists
+        video_docs = list(videos_query.limit(limit + 1).stream())
+        return [(video_doc.id, video_doc.to_dict()) for video_doc in video_docs[:limit]], len(video_docs) > limit
+
+    def count_videos(self, status=None, topic=None):
+        videos_query = self.db.collection('videos')
+        if status:
+            videos_query = videos_query.where('status', '==', status)
+        if topic:
+            videos_query = videos_query.where('lecture_topic', '==', topic)
+        # Aggregation query, counted from the index without reading the documents
+        return int(videos_query.count().get()[0][0].value)
+
+    def list_video_ids(self, status: Optional[str] = None) -> List[str]:
+        videos_query = self.db.collection('videos')
+        if status:
+            videos_query = videos_query.where('status', '==', status)
+        return [video_doc.id for video_doc in videos_query.select([]).stream()]
+
+    def get_segment(self, video_id: str, segment_id) -> Optional[Dict[str, Any]]:
+        segment_doc = self._video_ref(video_id).collection('segments').document(str(segment_id)).get()
+        return segment_doc.to_dict() if segment_doc.exists else None
+
+    def list_segments(self, video_id: str) -> List[Dict[str, Any]]:
+        segments_ref = self._video_ref(video_id).collection('segments').order_by('segment_number')
+        return [segment_doc.to_dict() for segment_doc in segments_ref.stream()]
+
+    def list_segment_outline(self, video_id: str) -> List[Dict[str, Any]]:
+        # Projection query, the transcripts never leave Firestore
+        segments_ref = self._video_ref(video_id).collection('segments')
+        return [
+            outline_entry(segment_doc.id, segment_doc.to_dict())
+            for segment_doc in segments_ref.select(SEGMENT_OUTLINE_FIELDS).order_by('segment_number').stream()
+        ]
+
+    def _commit_with_retry(self, batch, description: str) -> None:
+        """Commit a write batch, retrying with exponential backoff (batch writes are idempotent sets)."""
+        for attempt in range(1, self.COMMIT_ATTEMPTS + 1):
+            try:
+                batch.commit()
+                return
+            except Exception as e:
+                if attempt == self.COMMIT_ATTEMPTS:
+                    raise
+                delay = self.RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                print(f"Commit of {description} failed (attempt {attempt}/{self.COMMIT_ATTEMPTS}): {e}. Retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def write_segments(self, video_id: str, segments: List[Dict[str, Any]], video_update: Dict[str, Any]) -> None:
+        """
+        Batched writes, committing video_update in the same batch as the last segments. A lecture normally
+        fits in one batch, so its segments and 'completed' status land atomically. Larger ones are split by
+        write count and payload size; the earlier batches commit in parallel first, so the status update is
+        only ever committed once every segment is stored.
+        """
+        video_ref = self._video_ref(video_id)
+        segments_ref = video_ref.collection('segments')
+
+        # Split into groups below the per-batch limits, leaving room for the video update in the last one
+        groups: List[List[Dict[str, Any]]] = [[]]
+        group_bytes = 0
+        for segment in segments:
+            segment_bytes = len(json.dumps(segment))
+            if groups[-1] and (len(groups[-1]) >= self.BATCH_MAX_WRITES - 1
+                               or group_bytes + segment_bytes > self.BATCH_MAX_BYTES):
+                groups.append([])
+                group_bytes = 0
+            groups[-1].append(segment)
+            group_bytes += segment_bytes
+
+        def commit_group(index: int, group: List[Dict[str, Any]], update: Optional[Dict[str, Any]] = None) -> None:
+            batch = self.db.batch()
+            for segment in group:
+                batch.set(segments_ref.document(str(segment.get("segment_number"))), segment)
+            if update is not None:
+                batch.update(video_ref, update)
+            self._commit_with_retry(batch, f"video {video_id} segment batch {index + 1}/{len(groups)}")
+
+        if len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=self.WRITE_PARALLELISM) as pool:
+                list(pool.map(commit_group, range(len(groups) - 1), groups[:-1]))
+        commit_group(len(groups) - 1, groups[-1], video_update)
+
+    def get_segment_summary(self, video_id: str, segment_number) -> Optional[Dict[str, Any]]:
+        summary_doc = self._video_ref(video_id).collection('summaries').document(str(segment_number)).get()
+        return summary_doc.to_dict() if summary_doc.exists else None
+
+    def list_segment_summaries(self, video_id: str) -> List[Dict[str, Any]]:
+        return [summary_doc.to_dict() for summary_doc in self._video_ref(video_id).collection('summaries').stream()]
+
+    def write_segment_summaries(self, video_id: str, summaries: List[Dict[str, Any]]) -> None:
+        summaries_ref = self._video_ref(video_id).collection('summaries')
+        for start in range(0, len(summaries), self.BATCH_MAX_WRITES):
+            batch = self.db.batch()
+            for entry in summaries[start:start + self.BATCH_MAX_WRITES]:
+                batch.set(summaries_ref.document(str(entry.get('segment_number'))), entry)
+            self._commit_with_retry(batch, f"video {video_id} summaries from {start}")
+
+    def get_quiz(self, video_id: str, quiz_id: str) -> Optional[Dict[str, Any]]:
+        quiz_doc = self._video_ref(video_id).collection('quizzes').document(quiz_id).get()
+        return quiz_doc.to_dict() if quiz_doc.exists else None
+
+    def list_segment_quizzes(self, video_id: str, segment_id: int) -> List[Dict[str, Any]]:
+        quizzes_ref = self._video_ref(video_id).collection('quizzes').where('segment_id', '==', segment_id)
+        return [quiz_doc.to_dict() for quiz_doc in quizzes_ref.stream()]
+
+    def list_video_quizzes(self, video_id: str) -> List[Dict[str, Any]]:
+        quizzes_ref = self._video_ref(video_id).collection('quizzes') \
+                          .order_by('created_at', direction=self._firestore.Query.DESCENDING)
+        return [quiz_doc.to_dict() for quiz_doc in quizzes_ref.stream()]
+
+    def find_quiz_by_content_hash(self, video_id: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        quizzes_ref = self._video_ref(video_id).collection('quizzes') \
+                          .where('content_hash', '==', content_hash) \
+                          .limit(1)
+        for quiz_doc in quizzes_ref.stream():
+            return quiz_doc.to_dict()
+        return None
+
+    def save_quiz(self, video_id: str, quiz_doc: Dict[str, Any]) -> None:
+        self._video_ref(video_id).collection('quizzes').document(quiz_doc['quiz_id']).set(quiz_doc)
+
+    def save_batch(self, batch: Dict[str, Any]) -> None:
+        self.db.collection('batches').document(batch['batch_id']).set(batch)
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        batch_doc = self.db.collection('batches').document(batch_id).get()
+        return batch_doc.to_dict() if batch_doc.exists else None
+
+
+class SQLiteRepository(Repository):
+    """
+    Local backend for running the API, its tests and benchmarks offline. Documents are stored as JSON with the
+    fields we filter or sort on copied into columns. path=":memory:" keeps everything in process memory.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS videos (
+            video_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL DEFAULT '',
+            status TEXT,
+            lecture_topic TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS videos_feed ON videos (created_at DESC, video_id DESC);
+        CREATE TABLE IF NOT EXISTS segments (
+            video_id TEXT NOT NULL,
+            segment_id TEXT NOT NULL,
+            segment_number INTEGER,
+            data TEXT NOT NULL,
+            PRIMARY KEY (video_id, segment_id)
+        );
+        CREATE TABLE IF NOT EXISTS segment_summaries (
+            video_id TEXT NOT NULL,
+            segment_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (video_id, segment_id)
+        );
+        CREATE TABLE IF NOT EXISTS quizzes (
+            video_id TEXT NOT NULL,
+            quiz_id TEXT NOT NULL,
+            segment_id INTEGER,
+            content_hash TEXT,
+            created_at TEXT NOT NULL DEFAULT '',
+            data TEXT NOT NULL,
+            PRIMARY KEY (video_id, quiz_id)
+        );
+        CREATE INDEX IF NOT EXISTS quizzes_segment ON quizzes (video_id, segment_id);
+        CREATE INDEX IF NOT EXISTS quizzes_content_hash ON quizzes (video_id, content_hash);
+        CREATE TABLE IF NOT EXISTS batches (
+            batch_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        # One shared connection; calls arrive from the run_db pool, so access is serialized by a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def _one(self, sql: str, params: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _all(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def _put_video(self, video_id: str, video_data: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO videos (video_id, created_at, status, lecture_topic, data) VALUES (?, ?, ?, ?, ?)",
+            (video_id, video_data.get('created_at', ''), video_data.get('status'),
+             video_data.get('lecture_topic'), json.dumps(video_data))
+        )
+
+    def _update_video(self, video_id: str, fields: Dict[str, Any]) -> None:
+        row = self._conn.execute("SELECT data FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        if row is None:
+            # Same as Firestore's update() on a missing document
+            raise KeyError(f"No video {video_id}")
+        video_data = json.loads(row[0])
+        video_data.update(fields)
+        self._put_video(video_id, video_data)
+
+    def get_video(self, video_id: str) -> Optional[Dict[str, Any]]:
+        return self._one("SELECT data FROM videos WHERE video_id = ?", (video_id,))
+
+    def create_video(self, video_id: str, video_data: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._put_video(video_id, video_data)
+
+    def update_video(self, video_id: str, fields: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._update_video(video_id, fields)
+
+    def video_feed_page(self, limit, cursor=None, status=None, topic=None):
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if topic:
+            where.append("lecture_topic = ?")
+            params.append(topic)
+
+        with self._lock:
+            if cursor:
+                cursor_row = self._conn.execute(
+                    "SELECT created_at FROM videos WHERE video_id = ?", (cursor,)).fetchone()
+                if cursor_row is None:
+                    return None
+                where.append("(created_at < ? OR (created_at = ? AND video_id < ?))")
+                params.extend([cursor_row[0], cursor_row[0], cursor])
+
+            sql = "SELECT video_id, data FROM videos"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += " ORDER BY created_at DESC, video_id DESC LIMIT ?"
+            rows = self._conn.execute(sql, (*params, limit + 1)).fetchall()
+
+        videos = []
+        for video_id, data in rows[:limit]:
+            video_data = json.loads(data)
+            videos.append((video_id, {field: video_data[field] for field in VIDEO_FEED_FIELDS if field in video_data}))
+        return videos, len(rows) > limit
+
+    def count_videos(self, status=None, topic=None):
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if topic:
+            where.append("lecture_topic = ?")
+            params.append(topic)
+        sql = "SELECT COUNT(*) FROM videos"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def list_video_ids(self, status: Optional[str] = None) -> List[str]:
+        with self._lock:
+            if status:
+                rows = self._conn.execute("SELECT video_id FROM videos WHERE status = ?", (status,)).fetchall()
+            else:
+                rows = self._conn.execute("SELECT video_id FROM videos").fetchall()
+        return [row[0] for row in rows]
+
+    def get_segment(self, video_id: str, segment_id) -> Optional[Dict[str, Any]]:
+        return self._one("SELECT data FROM segments WHERE video_id = ? AND segment_id = ?", (video_id, str(segment_id)))
+
+    def list_segments(self, video_id: str) -> List[Dict[str, Any]]:
+        return self._all("SELECT data FROM segments WHERE video_id = ? ORDER BY segment_number", (video_id,))
+
+    def list_segment_outline(self, video_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT segment_id, data FROM segments WHERE video_id = ? ORDER BY segment_number",
+                (video_id,)
+            ).fetchall()
+        return [outline_entry(segment_id, json.loads(data)) for segment_id, data in rows]
+
+    def write_segments(self, video_id: str, segments: List[Dict[str, Any]], video_update: Dict[str, Any]) -> None:
+        # One transaction: the segments and the status update land together
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO segments (video_id, segment_id, segment_number, data) VALUES (?, ?, ?, ?)",
+                [(video_id, str(segment.get('segment_number')), segment.get('segment_number'), json.dumps(segment))
+                 for segment in segments]
+            )
+            self._update_video(video_id, video_update)
+
+    def get_segment_summary(self, video_id: str, segment_number) -> Optional[Dict[str, Any]]:
+        return self._one("SELECT data FROM segment_summaries WHERE video_id = ? AND segment_id = ?",
+                         (video_id, str(segment_number)))
+
+    def list_segment_summaries(self, video_id: str) -> List[Dict[str, Any]]:
+        return self._all("SELECT data FROM segment_summaries WHERE video_id = ?", (video_id,))
+
+    def write_segment_summaries(self, video_id: str, summaries: List[Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO segment_summaries (video_id, segment_id, data) VALUES (?, ?, ?)",
+                [(video_id, str(entry.get('segment_number')), json.dumps(entry)) for entry in summaries]
+            )
+
+    def get_quiz(self, video_id: str, quiz_id: str) -> Optional[Dict[str, Any]]:
+        return self._one("SELECT data FROM quizzes WHERE video_id = ? AND quiz_id = ?", (video_id, quiz_id))
+
+    def list_segment_quizzes(self, video_id: str, segment_id: int) -> List[Dict[str, Any]]:
+        return self._all("SELECT data FROM quizzes WHERE video_id = ? AND segment_id = ?", (video_id, segment_id))
+
+    def list_video_quizzes(self, video_id: str) -> List[Dict[str, Any]]:
+        return self._all("SELECT data FROM quizzes WHERE video_id = ? ORDER BY created_at DESC", (video_id,))
+
+    def find_quiz_by_content_hash(self, video_id: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        return self._one("SELECT data FROM quizzes WHERE video_id = ? AND content_hash = ? LIMIT 1", (video_id, content_hash))
+
+    def save_quiz(self, video_id: str, quiz_doc: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quizzes (video_id, quiz_id, segment_id, content_hash, created_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, quiz_doc['quiz_id'], quiz_doc.get('segment_id'), quiz_doc.get('content_hash'),
+                 quiz_doc.get('created_at', ''), json.dumps(quiz_doc))
+            )
+
+    def save_batch(self, batch: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO batches (batch_id, data) VALUES (?, ?)",
+                               (batch['batch_id'], json.dumps(batch)))
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        return self._one("SELECT data FROM batches WHERE batch_id = ?", (batch_id,))
+
+
+def create_repository(backend: str, **options) -> Repository:
+    """Repository for STORAGE_BACKEND: "firestore" (credentials_path) or "sqlite" (path, ":memory:" for in-memory)."""
+    if backend == "firestore":
+        return FirestoreRepository(**options)
+    if backend == "sqlite":
+        return SQLiteRepository(**options)
+    raise ValueError(f"Unknown storage backend: {backend}")
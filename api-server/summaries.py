@@ -0,0 +1,111 @@
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from embedding_index import embed_texts
+
+SEGMENT_SUMMARY_MAX_CHARS = 600
+PRIOR_CONTEXT_MAX_CHARS = 1500
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if len(sentence.strip()) > 20]
+
+
+def truncate_words(text: str, max_chars: int) -> str:
+    """text cut to at most max_chars at a word boundary."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars + 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut[:max_chars].rstrip()
+
+
+def summarize(text: str, max_chars: int) -> str:
+    """
+    Extractive summary: the sentences closest to the text's centroid embedding, up to max_chars,
+    kept in their original order.
+    """
+    sentences = split_sentences(text)
+    if sum(len(s) + 1 for s in sentences) <= max_chars:
+        return ' '.join(sentences)
+
+    vectors = embed_texts(sentences)
+    centroid = vectors.mean(axis=0)
+    scores = vectors @ centroid
+    chosen, used = [], 0
+    for i in np.argsort(-scores):
+        if used + len(sentences[i]) + 1 > max_chars:
+            continue
+        chosen.append(i)
+        used += len(sentences[i]) + 1
+    if not chosen:
+        # Every sentence is longer than max_chars, typically unpunctuated transcript text
+        return truncate_words(sentences[0], max_chars)
+    return ' '.join(sentences[i] for i in sorted(chosen))
+
+
+def _hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def segment_text(segment: Dict[str, Any]) -> str:
+    return ' '.join(entry.get('text', '').strip() for entry in segment.get('transcript') or [])
+
+
+def build_summaries(segments: List[Dict[str, Any]],
+                    existing: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Per-segment summaries plus, for every segment, a rolling summary of everything before it (prior_context).
+
+    prior_context of segment N is the summary of prior_context(N-1) followed by the summary of segment N-1,
+    so it stays within PRIOR_CONTEXT_MAX_CHARS however long the lecture is. Entries from a previous run
+    (existing) are reused when the segment text and everything before it are unchanged.
+    """
+    previous = {entry.get('segment_number'): entry for entry in existing or []}
+    entries: List[Dict[str, Any]] = []
+    prior_hash = _hash()
+    for segment in sorted(segments, key=lambda s: s.get('segment_number') or 0):
+        number = segment.get('segment_number')
+        title = segment.get('segment_title', '')
+        content_hash = _hash(title, segment_text(segment))
+        # Covers this segment and every one before it, so a match means prior_context is still valid too
+        context_hash = _hash(prior_hash, content_hash)
+        prior_hash = context_hash
+
+        old = previous.get(number)
+        if old is not None and old.get('context_hash') == context_hash:
+            entries.append(old)
+            continue
+
+        if old is not None and old.get('content_hash') == content_hash:
+            summary = old['summary']
+        else:
+            summary = summarize(segment_text(segment), SEGMENT_SUMMARY_MAX_CHARS)
+
+        if entries:
+            last = entries[-1]
+            rolling = f"{last['prior_context']} {last['segment_title']}: {last['summary']}".strip()
+            prior_context = summarize(rolling, PRIOR_CONTEXT_MAX_CHARS)
+        else:
+            prior_context = ''
+
+        entries.append({
+            'segment_number': number,
+            'segment_title': title,
+            'content_hash': content_hash,
+            'context_hash': context_hash,
+            'summary': summary,
+            'prior_context': prior_context
+        })
+    return entries
+
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Checks for local answer grading: MCQ option matching, short-answer normalization and the lenient fallback.
+
+Run with pytest, or directly: python api-server/test_answer_grading.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from answer_grading import grade_mcq, grade_short_answer_leniently, mcq_choice, normalize_answer  # noqa: E402
+
+QUESTION = {
+    "type": "mcq",
+    "question": "Which city is the capital of France?",
+    "options": [{"id": "A", "text": "Berlin"}, {"id": "B", "text": "Paris."},
+                {"id": "C", "text": "A city in Spain"}, {"id": "D", "text": "Rome"}],
+    "answer": "B",
+    "explanation": "Paris has been the capital since 987."
+}
+
+
+def test_mcq_choice_accepts_option_ids():
+    for answer in ("B", "b", " b ", "B)", "(b)", "B.", "b:"):
+        assert mcq_choice(QUESTION, answer) == "B", answer
+
+
+def test_mcq_choice_accepts_option_text_ignoring_punctuation_and_case():
+    assert mcq_choice(QUESTION, "Paris") == "B"
+    assert mcq_choice(QUESTION, "paris!") == "B"
+    assert mcq_choice(QUESTION, "B. Paris") == "B"
+    assert mcq_choice(QUESTION, "(b) paris") == "B"
+
+
+def test_mcq_choice_text_starting_with_a_letter_is_not_a_prefix():
+    # "A city in Spain" is option C's text, not option A
+    assert mcq_choice(QUESTION, "A city in Spain") == "C"
+    # A letter followed by another option's text matches nothing
+    assert mcq_choice(QUESTION, "A Paris") is None
+
+
+def test_mcq_choice_unknown_answer():
+    assert mcq_choice(QUESTION, "London") is None
+    assert mcq_choice(QUESTION, "E") is None
+
+
+def test_mcq_choice_without_options_compares_letters():
+    assert mcq_choice({"answer": "C"}, " c. ") == "C"
+
+
+def test_grade_mcq_feedback():
+    is_correct, feedback = grade_mcq(QUESTION, "paris")
+    assert is_correct and feedback.startswith("Correct!")
+    is_correct, feedback = grade_mcq(QUESTION, "A")
+    assert not is_correct
+    assert "B) Paris." in feedback and QUESTION["explanation"] in feedback
+
+
+def test_normalize_answer():
+    assert normalize_answer("Sorting, arrays!") == "sort array"
+    assert normalize_answer("  The   PROCESSES ") == normalize_answer("the process")
+
+
+def test_grade_short_answer_leniently():
+    assert grade_short_answer_leniently("gradient descent minimizes the loss", "it minimizes loss")[0]
+    is_correct, feedback = grade_short_answer_leniently("backpropagation", "no idea")
+    assert not is_correct and "backpropagation" in feedback
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    for test in tests:
+        test()
+        print(f"ok  {test.__name__}")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Checks for the bounded in-memory job registry (TTL and size-cap eviction of finished jobs) and the
+priority job scheduler.
+
+Run with pytest, or directly: python api-server/test_job_registry.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from job_registry import JobRegistry  # noqa: E402
+from job_scheduler import JobScheduler, PRIORITY_BATCH, PRIORITY_INTERACTIVE  # noqa: E402
+
+
+def test_registry_behaves_like_a_dict():
+    jobs = JobRegistry()
+    jobs["a"] = {"status": "pending"}
+    jobs["a"]["status"] = "processing"
+    assert "a" in jobs and len(jobs) == 1
+    assert jobs["a"]["status"] == "processing"
+    assert jobs.get("missing") is None
+    del jobs["a"]
+    assert "a" not in jobs
+
+
+def test_cap_evicts_oldest_finished_jobs_only():
+    jobs = JobRegistry(max_jobs=3)
+    jobs["running"] = {"status": "processing"}
+    jobs["done-1"] = {"status": "completed"}
+    jobs["done-2"] = {"status": "failed"}
+    jobs["new-1"] = {"status": "pending"}
+    assert list(jobs._jobs) == ["running", "done-2", "new-1"]
+    jobs["new-2"] = {"status": "pending"}
+    jobs["new-3"] = {"status": "pending"}
+    # Running jobs are kept even above the cap
+    assert list(jobs._jobs) == ["running", "new-1", "new-2", "new-3"]
+
+
+def test_finished_jobs_expire_after_ttl():
+    jobs = JobRegistry(ttl_seconds=0.05)
+    jobs["a"] = {"status": "completed"}
+    jobs["b"] = {"status": "pending"}
+    time.sleep(0.06)
+    # a was first seen finished when b was added, so its TTL runs from then
+    jobs["c"] = {"status": "pending"}
+    assert "a" not in jobs
+    assert "b" in jobs and "c" in jobs
+
+
+def test_expiry_stops_at_the_first_running_job():
+    jobs = JobRegistry(ttl_seconds=0.05)
+    jobs["running"] = {"status": "processing"}
+    jobs["done"] = {"status": "completed"}
+    time.sleep(0.06)
+    jobs["new"] = {"status": "pending"}
+    # Expiry is not checked past the older running job
+    assert "done" in jobs
+    jobs["running"]["status"] = "completed"
+    jobs["newer"] = {"status": "pending"}
+    time.sleep(0.06)
+    jobs["newest"] = {"status": "pending"}
+    assert "running" not in jobs
+    # done is only seen finished once the job before it has gone
+    assert "done" in jobs
+
+
+def test_status_changes_in_place_are_picked_up():
+    jobs = JobRegistry(max_jobs=1)
+    jobs["a"] = {"status": "pending"}
+    jobs["b"] = {"status": "pending"}
+    assert "a" in jobs
+    jobs["a"]["status"] = "cancelled"
+    jobs["c"] = {"status": "pending"}
+    assert "a" not in jobs
+
+
+def test_list_pages_newest_first():
+    jobs = JobRegistry()
+    for i in range(5):
+        jobs[f"job-{i}"] = {"status": "completed" if i % 2 else "pending"}
+    page, total = jobs.list(offset=1, limit=2)
+    assert [job_id for job_id, _ in page] == ["job-3", "job-2"] and total == 5
+    page, total = jobs.list(status="completed")
+    assert [job_id for job_id, _ in page] == ["job-3", "job-1"] and total == 2
+
+
+def test_scheduler_runs_interactive_jobs_before_queued_batch_jobs():
+    order = []
+
+    async def scenario():
+        scheduler = JobScheduler(max_concurrent_jobs=1)
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+
+        def job(name):
+            async def run():
+                order.append(name)
+            return run
+
+        first = scheduler.submit(blocker, PRIORITY_BATCH)
+        await asyncio.sleep(0)
+        done = [scheduler.submit(job("batch-1"), PRIORITY_BATCH), scheduler.submit(job("batch-2"), PRIORITY_BATCH),
+                scheduler.submit(job("interactive"), PRIORITY_INTERACTIVE)]
+        assert scheduler.queued() == 3
+        release.set()
+        await asyncio.gather(first, *done)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert order == ["interactive", "batch-1", "batch-2"]
+
+
+def test_scheduler_survives_failing_jobs():
+    async def scenario():
+        scheduler = JobScheduler(max_concurrent_jobs=1)
+
+        async def failing():
+            raise RuntimeError("job failed")
+
+        ran = []
+
+        async def succeeding():
+            ran.append(True)
+
+        await asyncio.gather(scheduler.submit(failing), scheduler.submit(succeeding))
+        await scheduler.stop()
+        return ran
+
+    assert asyncio.run(scenario()) == [True]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    for test in tests:
+        test()
+        print(f"ok  {test.__name__}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Checks for the BM25 transcript search index: tokenization, ranking, filtering and re-indexing.
+
+Run with pytest, or directly: python api-server/test_search_index.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from search_index import TranscriptSearchIndex, tokenize  # noqa: E402
+
+
+def segment(number, title, texts, start=0.0):
+    return {
+        "segment_number": number,
+        "segment_title": title,
+        "transcript": [{"start_timestamp": start + i * 4.0, "end_timestamp": start + i * 4.0 + 4.0, "text": text}
+                       for i, text in enumerate(texts)]
+    }
+
+
+LECTURE_A = [
+    segment(1, "Networks", ["Today we look at neural networks.", "A network has layers of neurons."]),
+    segment(2, "Training", ["Gradient descent trains the network.", "The learning rate sets the step size.",
+                            "Gradient descent needs the gradient of the loss."], start=60.0),
+]
+LECTURE_B = [
+    segment(1, "Sorting", ["Quicksort partitions the array.", "Merge sort splits the array in halves."]),
+]
+
+
+def build_index():
+    index = TranscriptSearchIndex()
+    index.add_video("a", LECTURE_A, "Deep Learning")
+    index.add_video("b", LECTURE_B, "Algorithms")
+    return index
+
+
+def test_tokenize_normalizes_and_drops_stopwords():
+    assert tokenize("The Networks are training!") == ["network", "train"]
+
+
+def test_search_ranks_repeated_terms_first():
+    results = build_index().search("gradient descent")
+    assert [r["video_id"] for r in results] == ["a", "a"]
+    assert results[0]["text"] == "Gradient descent needs the gradient of the loss."
+    assert results[0]["score"] >= results[1]["score"]
+
+
+def test_search_result_points_at_the_transcript_entry():
+    result = build_index().search("learning rate")[0]
+    assert result == {
+        "video_id": "a",
+        "lecture_title": "Deep Learning",
+        "segment_id": "2",
+        "segment_title": "Training",
+        "start_ms": 64000,
+        "end_ms": 68000,
+        "text": "The learning rate sets the step size.",
+        "score": result["score"]
+    }
+
+
+def test_search_matches_across_word_forms():
+    results = build_index().search("sorted arrays")
+    assert {r["video_id"] for r in results} == {"b"}
+    assert len(results) == 2
+
+
+def test_search_filters_by_video_and_limits():
+    index = build_index()
+    assert index.search("array", video_id="a") == []
+    assert len(index.search("network", limit=1)) == 1
+
+
+def test_search_without_terms():
+    index = build_index()
+    assert index.search("the and of") == []
+    assert TranscriptSearchIndex().search("network") == []
+
+
+def test_add_video_replaces_previous_entries():
+    index = build_index()
+    documents = len(index)
+    index.add_video("b", [segment(1, "Hashing", ["Hash tables give constant time lookups."])], "Algorithms")
+    assert index.search("quicksort") == []
+    assert index.search("hash")[0]["video_id"] == "b"
+    assert len(index) == documents - 1
+    assert index.video_count == 2
+
+
+def test_remove_video():
+    index = build_index()
+    index.remove_video("a")
+    assert index.search("network") == []
+    assert index.video_count == 1
+    assert len(index) == 2
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    for test in tests:
+        test()
+        print(f"ok  {test.__name__}")
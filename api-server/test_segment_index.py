@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Checks for the segment interval index behind the player's segment-at-time and next-segment lookups.
+
+Run with pytest, or directly: python api-server/test_segment_index.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from segment_index import SegmentIntervalIndex  # noqa: E402
+
+
+def segment(number, start, end):
+    return {"segment_id": str(number), "segment_number": number,
+            "segment_start_timestamp": start, "segment_end_timestamp": end}
+
+
+def numbers(found):
+    return found["segment_number"] if found else None
+
+
+def test_segment_at_with_inclusive_bounds_and_gaps():
+    index = SegmentIntervalIndex([segment(2, 60.0, 120.0), segment(1, 0.0, 60.0), segment(3, 150.0, 200.0)])
+    assert len(index) == 3
+    assert numbers(index.segment_at(0.0)) == 1
+    assert numbers(index.segment_at(30.0)) == 1
+    assert numbers(index.segment_at(60.0)) == 2
+    assert numbers(index.segment_at(130.0)) is None
+    assert numbers(index.segment_at(200.0)) == 3
+    assert numbers(index.segment_at(200.1)) is None
+    assert numbers(index.segment_at(-1.0)) is None
+
+
+def test_segment_at_steps_back_over_overlapping_chapters():
+    # A long chapter that a shorter later one sits inside
+    index = SegmentIntervalIndex([segment(1, 0.0, 300.0), segment(2, 100.0, 150.0), segment(3, 310.0, 400.0)])
+    assert numbers(index.segment_at(120.0)) == 2
+    assert numbers(index.segment_at(200.0)) == 1
+    assert numbers(index.segment_at(305.0)) is None
+
+
+def test_next_segment():
+    index = SegmentIntervalIndex([segment(1, 0.0, 60.0), segment(2, 60.0, 120.0)])
+    assert numbers(index.next_segment(-5.0)) == 1
+    assert numbers(index.next_segment(0.0)) == 2
+    assert numbers(index.next_segment(59.9)) == 2
+    assert numbers(index.next_segment(60.0)) is None
+
+
+def test_empty_index():
+    index = SegmentIntervalIndex([])
+    assert index.segment_at(10.0) is None and index.next_segment(10.0) is None
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    for test in tests:
+        test()
+        print(f"ok  {test.__name__}")
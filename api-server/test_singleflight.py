@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Checks for SingleFlight read coalescing: shared fetches, result reuse within the TTL, failures,
+and invalidation while a fetch is in flight or from another thread.
+
+Run with pytest, or directly: python api-server/test_singleflight.py
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from singleflight import SingleFlight  # noqa: E402
+
+
+class Source:
+    """A fetch that counts its calls and returns the call number, optionally after a delay."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        return call
+
+
+def test_concurrent_callers_share_one_fetch():
+    async def scenario():
+        reads, source = SingleFlight("test_shared", ttl_seconds=60), Source(delay=0.01)
+        results = await asyncio.gather(*(reads.do("key", source.fetch) for _ in range(10)))
+        return results, source.calls
+
+    assert asyncio.run(scenario()) == ([1] * 10, 1)
+
+
+def test_result_reused_within_ttl_only():
+    async def scenario():
+        reads, source = SingleFlight("test_ttl", ttl_seconds=0.05), Source()
+        first = await reads.do("key", source.fetch)
+        second = await reads.do("key", source.fetch)
+        await asyncio.sleep(0.06)
+        third = await reads.do("key", source.fetch)
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (1, 1, 2)
+
+
+def test_failures_are_not_stored():
+    async def scenario():
+        reads = SingleFlight("test_failure", ttl_seconds=60)
+
+        async def failing():
+            raise RuntimeError("storage down")
+
+        try:
+            await reads.do("key", failing)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("expected the fetch error")
+        return await reads.do("key", Source().fetch)
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_invalidate_drops_stored_result():
+    async def scenario():
+        reads, source = SingleFlight("test_invalidate", ttl_seconds=60), Source()
+        await reads.do("key", source.fetch)
+        await reads.do("other", source.fetch)
+        reads.invalidate("key")
+        return await reads.do("key", source.fetch), await reads.do("other", source.fetch)
+
+    assert asyncio.run(scenario()) == (3, 2)
+
+
+def test_invalidate_during_fetch_does_not_store_stale_result():
+    async def scenario():
+        reads, source = SingleFlight("test_in_flight", ttl_seconds=60), Source(delay=0.02)
+        stale = asyncio.ensure_future(reads.do("key", source.fetch))
+        await asyncio.sleep(0.005)
+        reads.invalidate("key")
+        # Arrives after the invalidation, so it must not join the stale fetch
+        fresh = await reads.do("key", source.fetch)
+        # The stale fetch still answers its own waiter, but is not reused afterwards
+        return await stale, fresh, await reads.do("key", source.fetch)
+
+    assert asyncio.run(scenario()) == (1, 2, 2)
+
+
+def test_stale_fetch_finishing_last_is_not_stored():
+    async def scenario():
+        reads = SingleFlight("test_finish_order", ttl_seconds=60)
+        slow, fast = Source(delay=0.03), Source()
+
+        stale = asyncio.ensure_future(reads.do("key", slow.fetch))
+        await asyncio.sleep(0.005)
+        reads.invalidate("key")
+        assert await reads.do("key", fast.fetch) == 1
+        await stale
+        # Still the fresh result, not the one that finished later
+        return await reads.do("key", Source().fetch), slow.calls, fast.calls
+
+    assert asyncio.run(scenario()) == (1, 1, 1)
+
+
+def test_invalidate_from_another_thread_runs_on_the_loop():
+    async def scenario():
+        reads, source = SingleFlight("test_thread", ttl_seconds=60), Source()
+        await reads.do("key", source.fetch)
+        loop_thread = threading.get_ident()
+        ran_on = []
+        original = reads._invalidate
+
+        def recording_invalidate(key):
+            ran_on.append(threading.get_ident())
+            original(key)
+
+        reads._invalidate = recording_invalidate
+        worker = threading.Thread(target=reads.invalidate, args=("key",))
+        worker.start()
+        worker.join()
+        # Handed to the loop, so nothing has changed until it gets a turn
+        assert ran_on == []
+        await asyncio.sleep(0)
+        assert ran_on == [loop_thread]
+        return await reads.do("key", source.fetch)
+
+    assert asyncio.run(scenario()) == 2
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    for test in tests:
+        test()
+        print(f"ok  {test.__name__}")
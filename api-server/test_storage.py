@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Checks for the Repository contract against the in-memory SQLite backend: the feed's cursor pagination and
+filters, segments and their outline, summaries, quizzes and batches.
+
+Run with pytest, or directly: python api-server/test_storage.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from storage import SQLiteRepository, create_repository, outline_entry  # noqa: E402
+
+
+def make_repository():
+    repository = create_repository("sqlite", path=":memory:")
+    for i in range(7):
+        repository.create_video(f"video-{i}", {
+            "lecture_title": f"Lecture {i}",
+            "lecture_topic": "ml" if i % 2 else "algorithms",
+            "status": "completed" if i < 5 else "processing",
+            # Two videos share a timestamp, the id breaks the tie
+            "created_at": f"2024-01-0{min(i, 5) + 1}T10:00:00",
+            "segments_collection": f"videos/video-{i}/segments"
+        })
+    return repository
+
+
+def segment(number, start):
+    return {"segment_number": number, "segment_title": f"Part {number}", "segment_start_timestamp": start,
+            "segment_end_timestamp": start + 60.0, "transcript": [{"text": "hello", "start_timestamp": start}]}
+
+
+def test_create_repository():
+    assert isinstance(make_repository(), SQLiteRepository)
+    try:
+        create_repository("postgres")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError for an unknown backend")
+
+
+def test_video_documents():
+    repository = make_repository()
+    repository.update_video("video-1", {"status": "failed", "error": "boom"})
+    video = repository.get_video("video-1")
+    assert video["status"] == "failed" and video["lecture_title"] == "Lecture 1"
+    assert repository.get_video("missing") is None
+    try:
+        repository.update_video("missing", {"status": "failed"})
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("expected KeyError updating a missing video, as Firestore raises")
+
+
+def test_feed_pages_newest_first_without_gaps_or_repeats():
+    repository = make_repository()
+    seen, cursor = [], None
+    while True:
+        videos, has_more = repository.video_feed_page(3, cursor)
+        seen.extend(video_id for video_id, _ in videos)
+        if not has_more:
+            break
+        cursor = videos[-1][0]
+    assert seen == ["video-6", "video-5", "video-4", "video-3", "video-2", "video-1", "video-0"]
+
+
+def test_feed_projects_fields_and_filters():
+    repository = make_repository()
+    videos, has_more = repository.video_feed_page(10, status="completed", topic="ml")
+    assert [video_id for video_id, _ in videos] == ["video-3", "video-1"] and not has_more
+    assert "segments_collection" not in videos[0][1]
+    assert repository.count_videos() == 7
+    assert repository.count_videos(status="completed", topic="ml") == 2
+    assert repository.video_feed_page(3, cursor="missing") is None
+
+
+def test_list_video_ids():
+    repository = make_repository()
+    assert sorted(repository.list_video_ids(status="processing")) == ["video-5", "video-6"]
+    assert len(repository.list_video_ids()) == 7
+
+
+def test_segments_outline_and_status_update():
+    repository = make_repository()
+    repository.write_segments("video-0", [segment(2, 60.0), segment(1, 0.0)],
+                              {"status": "completed", "segment_count": 2})
+    assert [s["segment_number"] for s in repository.list_segments("video-0")] == [1, 2]
+    assert repository.get_segment("video-0", 2)["segment_start_timestamp"] == 60.0
+    assert repository.get_segment("video-0", 3) is None
+    assert repository.list_segment_outline("video-0") == [outline_entry("1", segment(1, 0.0)),
+                                                           outline_entry("2", segment(2, 60.0))]
+    assert repository.get_video("video-0")["segment_count"] == 2
+
+
+def test_segment_summaries():
+    repository = make_repository()
+    repository.write_segment_summaries("video-0", [{"segment_number": 1, "prior_context": ""},
+                                                   {"segment_number": 2, "prior_context": "Part 1: intro"}])
+    assert repository.get_segment_summary("video-0", 2)["prior_context"] == "Part 1: intro"
+    assert repository.get_segment_summary("video-0", "2") == repository.get_segment_summary("video-0", 2)
+    assert repository.get_segment_summary("video-1", 2) is None
+    assert len(repository.list_segment_summaries("video-0")) == 2
+    assert "segment_summaries" not in repository.get_video("video-0")
+
+
+def test_quizzes():
+    repository = make_repository()
+    for i, (segment_id, created_at) in enumerate([(1, "2024-01-01"), (2, "2024-01-03"), (1, "2024-01-02")]):
+        repository.save_quiz("video-0", {"quiz_id": f"quiz-{i}", "segment_id": segment_id,
+                                         "content_hash": f"hash-{i}", "created_at": created_at})
+    assert repository.get_quiz("video-0", "quiz-1")["segment_id"] == 2
+    assert sorted(q["quiz_id"] for q in repository.list_segment_quizzes("video-0", 1)) == ["quiz-0", "quiz-2"]
+    assert [q["quiz_id"] for q in repository.list_video_quizzes("video-0")] == ["quiz-1", "quiz-2", "quiz-0"]
+    assert repository.find_quiz_by_content_hash("video-0", "hash-2")["quiz_id"] == "quiz-2"
+    assert repository.find_quiz_by_content_hash("video-1", "hash-2") is None
+
+
+def test_batches():
+    repository = make_repository()
+    repository.save_batch({"batch_id": "batch-1", "job_ids": ["video-0", "video-1"]})
+    assert repository.get_batch("batch-1")["job_ids"] == ["video-0", "video-1"]
+    assert repository.get_batch("batch-2") is None
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    for test in tests:
+        test()
+        print(f"ok  {test.__name__}")
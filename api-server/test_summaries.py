@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Checks for the extractive segment summaries and the rolling prior context built at ingestion.
+
+Run with pytest, or directly: python api-server/test_summaries.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import summaries  # noqa: E402
+from summaries import build_summaries, split_sentences, summarize, truncate_words  # noqa: E402
+
+
+def make_segment(number, sentences):
+    return {
+        "segment_number": number,
+        "segment_title": f"Part {number}",
+        "transcript": [{"start_timestamp": i * 5.0, "end_timestamp": i * 5.0 + 5, "text": sentence}
+                       for i, sentence in enumerate(sentences)]
+    }
+
+
+SEGMENTS = [
+    make_segment(1, ["Neural networks are built from layers of simple units.",
+                     "Each unit computes a weighted sum of its inputs and applies an activation."]),
+    make_segment(2, ["Training adjusts the weights of the network to reduce the loss.",
+                     "Gradient descent follows the negative gradient of the loss function."]),
+    make_segment(3, ["Backpropagation computes those gradients layer by layer.",
+                     "It applies the chain rule from the output back to the inputs."]),
+]
+
+
+def test_split_sentences_drops_fragments():
+    assert split_sentences("Short. This sentence is long enough to keep. Ok!") == \
+        ["This sentence is long enough to keep."]
+
+
+def test_summarize_keeps_short_text_whole():
+    text = "The first sentence is fairly short. The second sentence is short as well."
+    assert summarize(text, 600) == text
+
+
+def test_summarize_respects_max_chars_and_order():
+    sentences = [f"Sentence number {i} talks about neural network training and weights." for i in range(30)]
+    summary = summarize(" ".join(sentences), 300)
+    assert 0 < len(summary) <= 300
+    kept = split_sentences(summary)
+    assert kept == sorted(kept, key=sentences.index)
+
+
+def test_summarize_unpunctuated_text_is_truncated_at_a_word():
+    summary = summarize(" ".join(["word"] * 400), 600)
+    assert summary and len(summary) <= 600
+    assert set(summary.split()) == {"word"}
+
+
+def test_truncate_words():
+    assert truncate_words("abc def ghi", 7) == "abc def"
+    assert truncate_words("abcdefghij", 4) == "abcd"
+    assert truncate_words("short", 10) == "short"
+
+
+def test_build_summaries_chains_prior_context():
+    entries = build_summaries(SEGMENTS)
+    assert [entry["segment_number"] for entry in entries] == [1, 2, 3]
+    assert entries[0]["prior_context"] == ""
+    assert "Part 1" in entries[1]["prior_context"]
+    assert "Part 1" in entries[2]["prior_context"] and "Part 2" in entries[2]["prior_context"]
+    assert all(len(entry["prior_context"]) <= summaries.PRIOR_CONTEXT_MAX_CHARS for entry in entries)
+
+
+def test_build_summaries_reuses_unchanged_entries():
+    existing = build_summaries(SEGMENTS)
+    calls = []
+    original = summaries.summarize
+
+    def counting_summarize(text, max_chars):
+        calls.append(text)
+        return original(text, max_chars)
+
+    summaries.summarize = counting_summarize
+    try:
+        assert build_summaries(SEGMENTS, existing) == existing
+        assert calls == []
+
+        # Changing segment 2 keeps segment 1, resummarizes segment 2 and rebuilds segment 3's prior context only
+        changed = [SEGMENTS[0], make_segment(2, ["Training now uses momentum to speed up gradient descent."]),
+                   SEGMENTS[2]]
+        entries = build_summaries(changed, existing)
+    finally:
+        summaries.summarize = original
+
+    assert entries[0] is existing[0]
+    assert entries[1]["content_hash"] != existing[1]["content_hash"]
+    assert entries[2]["summary"] == existing[2]["summary"]
+    assert entries[2]["context_hash"] != existing[2]["context_hash"]
+    assert "momentum" in entries[2]["prior_context"]
+    # segment 2's text, segment 2's prior context, segment 3's prior context
+    assert len(calls) == 3
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    for test in tests:
+        test()
+        print(f"ok  {test.__name__}")
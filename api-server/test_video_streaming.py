@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Checks for GET /video/{id}/stream through the full middleware stack, with and without the ASGI
+http.response.zerocopysend extension in the scope (uvicorn does not offer it, so it needs driving directly).
+
+Run with pytest, or directly: python api-server/test_video_streaming.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="test_video_streaming_")
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["STORAGE_SQLITE_PATH"] = ":memory:"
+os.environ["VIDEO_STORAGE_DIR"] = _workdir
+os.environ["SEARCH_INDEX_WARM"] = "false"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main  # noqa: E402
+from video_streaming import ZERO_COPY_EXTENSION  # noqa: E402
+
+VIDEO_ID = "stream-test-video"
+VIDEO_BYTES = bytes(range(256)) * 64
+
+with open(os.path.join(main.VIDEO_DIR, "stream-test.mp4"), "wb") as _f:
+    _f.write(VIDEO_BYTES)
+main.storage.create_video(VIDEO_ID, {"status": "completed", "created_at": "2024-01-01T00:00:00",
+                                     "video_filename": "stream-test.mp4"})
+
+
+def request_stream(headers, extensions=None, method="GET"):
+    """Call the app with a raw ASGI scope and return every message it sends."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": f"/video/{VIDEO_ID}/stream",
+        "raw_path": f"/video/{VIDEO_ID}/stream".encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+        "extensions": extensions or {},
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == ZERO_COPY_EXTENSION:
+            # What the server would do: send count bytes of the file from offset
+            message = dict(message, data=os.pread(message["file"].fileno(), message["count"], message["offset"]))
+        messages.append(message)
+
+    asyncio.run(main.app(scope, receive, send))
+    return messages
+
+
+def response_headers(start_message):
+    return {name.decode(): value.decode() for name, value in start_message["headers"]}
+
+
+def test_range_with_zero_copy_extension():
+    messages = request_stream({"range": "bytes=100-4195"}, extensions={ZERO_COPY_EXTENSION: {}})
+    assert [m["type"] for m in messages] == ["http.response.start", ZERO_COPY_EXTENSION]
+    assert messages[0]["status"] == 206
+    assert response_headers(messages[0])["content-range"] == f"bytes 100-4195/{len(VIDEO_BYTES)}"
+    assert messages[1]["offset"] == 100 and messages[1]["count"] == 4096
+    assert messages[1]["data"] == VIDEO_BYTES[100:4196]
+
+
+def test_range_without_extension():
+    messages = request_stream({"range": "bytes=-1000"})
+    assert messages[0]["status"] == 206
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    assert body == VIDEO_BYTES[-1000:]
+    assert messages[-1]["more_body"] is False
+
+
+def test_full_file_with_zero_copy_extension():
+    messages = request_stream({}, extensions={ZERO_COPY_EXTENSION: {}})
+    assert messages[0]["status"] == 200
+    assert response_headers(messages[0])["content-length"] == str(len(VIDEO_BYTES))
+    assert messages[1]["type"] == ZERO_COPY_EXTENSION and messages[1]["data"] == VIDEO_BYTES
+
+
+def test_unsatisfiable_range():
+    messages = request_stream({"range": f"bytes={len(VIDEO_BYTES)}-"}, extensions={ZERO_COPY_EXTENSION: {}})
+    assert messages[0]["status"] == 416
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    for test in tests:
+        test()
+        print(f"ok  {test.__name__}")
@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+
+try:
+    from python_multipart.exceptions import FormParserError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:
+    # python-multipart before 0.0.13 installs as "multipart"
+    from multipart.exceptions import FormParserError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+
+class UploadError(Exception):
+    """The request body is not a usable multipart upload."""
+
+
+class _UploadTarget:
+    """The file part being received: written to a temporary name, hashed as it is written."""
+
+    def __init__(self, destination_dir: str, original_filename: str):
+        self.original_filename = original_filename
+        self.extension = os.path.splitext(original_filename)[1] or '.mp4'
+        self.temp_path = os.path.join(destination_dir, f".upload-{uuid.uuid4()}{self.extension}")
+        self.file = open(self.temp_path, 'wb')
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunks: List[bytes]) -> None:
+        for chunk in chunks:
+            self.digest.update(chunk)
+            self.file.write(chunk)
+            self.size += len(chunk)
+
+
+async def receive_upload(request: Request, file_field: str, destination_dir: str) -> Dict[str, Any]:
+    """
+    Stream a multipart/form-data request body straight to destination_dir, storing the file_field part under
+    its content hash (identical uploads share one file) and hashing it as it arrives. Nothing is spooled first,
+    so the body is written to disk once and hashing overlaps the upload. Disk writes run in a worker thread.
+
+    Returns {'fields': other form fields as str, 'filename', 'original_filename', 'size', 'sha256',
+    'already_stored': whether an identical upload was there before}.
+    Raises UploadError for a body that is not multipart or has no file_field part.
+    """
+    content_type, params = parse_options_header(request.headers.get('content-type', ''))
+    boundary = params.get(b'boundary')
+    if content_type != b'multipart/form-data' or not boundary:
+        raise UploadError("Expected a multipart/form-data body")
+
+    os.makedirs(destination_dir, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    fields: Dict[str, str] = {}
+    target: Optional[_UploadTarget] = None
+    # Parser callbacks are synchronous: they collect data, which is written after each chunk is parsed
+    part: Dict[str, Any] = {}
+    pending: List[bytes] = []
+
+    def on_part_begin():
+        part.clear()
+        part.update(headers={}, header_field=b'', header_value=b'', data=bytearray(), is_file=False)
+
+    def on_header_field(data, start, end):
+        part['header_field'] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part['header_value'] += data[start:end]
+
+    def on_header_end():
+        part['headers'][part['header_field'].lower()] = part['header_value']
+        part['header_field'] = part['header_value'] = b''
+
+    def on_headers_finished():
+        nonlocal target
+        _, disposition = parse_options_header(part['headers'].get(b'content-disposition', b''))
+        part['name'] = disposition.get(b'name', b'').decode('utf-8', errors='replace')
+        if part['name'] == file_field and target is None:
+            filename = disposition.get(b'filename', b'').decode('utf-8', errors='replace')
+            target = _UploadTarget(destination_dir, filename)
+            part['is_file'] = True
+
+    def on_part_data(data, start, end):
+        if part['is_file']:
+            pending.append(bytes(data[start:end]))
+        else:
+            part['data'] += data[start:end]
+
+    def on_part_end():
+        if not part['is_file'] and part.get('name'):
+            fields[part['name']] = part['data'].decode('utf-8', errors='replace')
+
+    parser = MultipartParser(boundary, {
+        'on_part_begin': on_part_begin,
+        'on_part_data': on_part_data,
+        'on_part_end': on_part_end,
+        'on_header_field': on_header_field,
+        'on_header_value': on_header_value,
+        'on_header_end': on_header_end,
+        'on_headers_finished': on_headers_finished,
+    })
+
+    try:
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                if pending:
+                    chunks = pending[:]
+                    pending.clear()
+                    await loop.run_in_executor(None, target.write, chunks)
+            parser.finalize()
+        except FormParserError as e:
+            raise UploadError(f"Malformed multipart body: {e}")
+        if target is None:
+            raise UploadError(f"No '{file_field}' file in the upload")
+        target.file.close()
+        sha256 = target.digest.hexdigest()
+        filename = f"{sha256}{target.extension}"
+        destination = os.path.join(destination_dir, filename)
+        already_stored = os.path.exists(destination)
+        os.replace(target.temp_path, destination)
+    except BaseException:
+        if target is not None:
+            target.file.close()
+            if os.path.exists(target.temp_path):
+                os.remove(target.temp_path)
+        raise
+
+    return {
+        'fields': fields,
+        'filename': filename,
+        'original_filename': target.original_filename,
+        'size': target.size,
+        'sha256': sha256,
+        'already_stored': already_stored
+    }
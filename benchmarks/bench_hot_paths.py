@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the Python hot paths, on synthetic lectures 1x, 10x and 100x the bundled chapters.json.
+
+Covers transcript parsing (parse_lines, is_garbage, timestamp_to_seconds), chapter assembly, chapters JSON
+load/dump and the API read endpoints over an in-memory SQLite repository. Every run is appended to a results
+file and compared with the previous run on the same machine, so regressions show up between runs.
+
+Usage: python benchmarks/bench_hot_paths.py [--scales 1,10,100] [--repeat N] [--only parse,json,api]
+                                            [--results PATH] [--threshold 0.25] [--no-save] [--fail-on-regression]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import synthetic
+
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "hot_paths.json")
+GROUPS = ("parse", "json", "api")
+VIDEO_ID = "bench-video"
+
+
+def time_call(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Median and min wall time of fn() in milliseconds, after one warm-up call. setup() runs untimed before each call."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples)}
+
+
+def repeats_for(scale: int, repeat: int) -> int:
+    # Keep the 100x runs to a few seconds without starving the 1x ones of samples
+    return max(3, repeat // scale)
+
+
+def bench_parse(segments: List[Dict[str, Any]], scale: int, repeat: int, workdir: str) -> Dict[str, Dict[str, float]]:
+    sys.path.append(os.path.join(synthetic.REPO_ROOT, "transcription"))
+    try:
+        from process_transcript import assemble_chapters, is_garbage, parse_lines, timestamp_to_seconds
+    except ImportError as e:
+        print(f"  skipped: transcription modules unavailable ({e})")
+        return {}
+
+    lines = synthetic.transcript_lines(segments)
+    path = os.path.join(workdir, f"transcript_{scale}x.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    texts = [line.split("] ", 1)[1] for line in lines]
+    stamps = [line[1:13] for line in lines]
+    valid_lines = parse_lines(path)
+    chapters = synthetic.llm_chapters(segments)
+    n = repeats_for(scale, repeat)
+
+    return {
+        "parse_lines": time_call(lambda: parse_lines(path), n),
+        "is_garbage": time_call(lambda: [is_garbage(text) for text in texts], n),
+        "timestamp_to_seconds": time_call(lambda: [timestamp_to_seconds(ts) for ts in stamps], n),
+        # assemble_chapters sorts its input in place, so every call gets a fresh list
+        "assemble_chapters": time_call(lambda: assemble_chapters(list(chapters), valid_lines), n),
+    }
+
+
+def bench_json(segments: List[Dict[str, Any]], scale: int, repeat: int, workdir: str) -> Dict[str, Dict[str, float]]:
+    path = os.path.join(workdir, f"chapters_{scale}x.json")
+
+    def dump():
+        # As process_transcript_file writes it
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(segments, f, indent=4)
+
+    def load():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    dump()
+    n = repeats_for(scale, repeat)
+    return {"chapters_json_dump": time_call(dump, n), "chapters_json_load": time_call(load, n)}
+
+
+def load_api():
+    """Import the API against an in-memory SQLite repository, with nothing running in the background."""
+    os.environ["STORAGE_BACKEND"] = "sqlite"
+    os.environ["STORAGE_SQLITE_PATH"] = ":memory:"
+    os.environ["SEARCH_INDEX_WARM"] = "false"
+    os.environ.setdefault("EMBEDDING_INDEX_DIR", tempfile.mkdtemp(prefix="bench_embeddings_"))
+    sys.path.append(synthetic.API_SERVER_DIR)
+    import main
+    from fastapi.testclient import TestClient
+    return main, TestClient
+
+
+def bench_api(segments: List[Dict[str, Any]], scale: int, repeat: int, workdir: str) -> Dict[str, Dict[str, float]]:
+    try:
+        main, TestClient = load_api()
+    except (ImportError, SystemExit) as e:
+        print(f"  skipped: API server unavailable ({e})")
+        return {}
+
+    video_id = f"{VIDEO_ID}-{scale}x"
+    synthetic.seed_repository(main.storage, video_id, segments)
+    main.video_changed(video_id)
+    main.search_index.add_video(video_id, segments, "Benchmark Lecture")
+    middle = segments[len(segments) // 2]
+    routes = {
+        "GET /video/{id}/segments": f"/video/{video_id}/segments",
+        "GET /video/{id}/metadata": f"/video/{video_id}/metadata",
+        "GET /video/{id}/segment-at-time": f"/video/{video_id}/segment-at-time?timestamp={middle['segment_start_timestamp'] + 1}",
+        "GET /video/{id}/segment/{n}/quizzes": f"/video/{video_id}/segment/{middle['segment_number']}/quizzes",
+        "GET /video/{id}/quizzes": f"/video/{video_id}/quizzes",
+        "GET /video/feed": "/video/feed",
+        "GET /search": f"/search?q=neural+network+training&video_id={video_id}",
+    }
+
+    def drop_read_caches():
+        # Everything the read routes cache for this video, so the next request goes to storage
+        main.video_changed(video_id)
+        main.video_reads.invalidate(('quizzes', video_id))
+        main.video_reads.invalidate(('segment_quizzes', video_id, middle['segment_number']))
+
+    n = repeats_for(scale, repeat)
+    results = {}
+    with TestClient(main.app) as client:
+        for name, url in routes.items():
+            response = client.get(url)
+            if response.status_code != 200:
+                print(f"  {name}: HTTP {response.status_code}, not timed")
+                continue
+            # warm: repeated requests within the cache TTLs, as a player polling sees them;
+            # cold: caches dropped before every request, so storage reads and outline/index building are timed
+            results[f"{name} (warm)"] = time_call(lambda: client.get(url), n)
+            results[f"{name} (cold)"] = time_call(lambda: client.get(url), n, setup=drop_read_caches)
+    return results
+
+
+BENCHMARKS = {"parse": bench_parse, "json": bench_json, "api": bench_api}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=synthetic.REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path: str, history: List[Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def compare(results: Dict[str, Dict[str, float]], previous: Optional[Dict[str, Any]], threshold: float) -> List[str]:
+    """Print every timing next to the previous run's and return the names that got slower than threshold."""
+    baseline = (previous or {}).get("results", {})
+    regressions = []
+    print(f"\n{'benchmark':58} {'median ms':>10} {'previous':>10} {'change':>8}")
+    for name, timing in results.items():
+        before = baseline.get(name, {}).get("median_ms")
+        if before:
+            change = timing["median_ms"] / before - 1
+            flag = "  REGRESSION" if change > threshold else ""
+            print(f"{name:58} {timing['median_ms']:10.3f} {before:10.3f} {change:+8.1%}{flag}")
+            if flag:
+                regressions.append(name)
+        else:
+            print(f"{name:58} {timing['median_ms']:10.3f} {'-':>10} {'-':>8}")
+    return regressions
+
+
+def main(args) -> int:
+    source = synthetic.load_chapters(args.chapters)
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory(prefix="bench_hot_paths_") as workdir:
+        for scale in args.scales:
+            segments = synthetic.scale_segments(source, scale)
+            entries = sum(len(segment["transcript"]) for segment in segments)
+            print(f"Scale {scale}x: {len(segments)} segments, {entries} transcript entries")
+            for group in args.only:
+                for name, timing in BENCHMARKS[group](segments, scale, args.repeat, workdir).items():
+                    results[f"{group}/{name}@{scale}x"] = timing
+
+    history = load_history(args.results)
+    regressions = compare(results, history[-1] if history else None, args.threshold)
+
+    if not args.no_save:
+        history.append({
+            "timestamp": datetime.now().isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "repeat": args.repeat,
+            "results": results
+        })
+        save_history(args.results, history)
+        print(f"\nSaved run {len(history)} to {args.results}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) more than {args.threshold:.0%} slower than the previous run")
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chapters", default=synthetic.CHAPTERS_PATH, help="Lecture to scale up")
+    parser.add_argument("--scales", default="1,10,100", type=lambda value: [int(s) for s in value.split(",")])
+    parser.add_argument("--repeat", type=int, default=50, help="Samples at 1x; larger scales take proportionally fewer")
+    parser.add_argument("--only", default=",".join(GROUPS),
+                        type=lambda value: [g for g in value.split(",") if g in BENCHMARKS])
+    parser.add_argument("--results", default=RESULTS_PATH, help="Run history to compare with and append to")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Slowdown that counts as a regression")
+    parser.add_argument("--no-save", action="store_true", help="Compare only, do not record this run")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on a regression")
+    sys.exit(main(parser.parse_args()))
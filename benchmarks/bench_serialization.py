@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Serialization and compression benchmark on the bundled chapters.json.
+Compares the stdlib encoder FastAPI uses by default with orjson, and gzip/brotli sizes and times.
+
+Usage: python benchmarks/bench_serialization.py [path/to/chapters.json] [--repeat N]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_call(fn, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def stdlib_dumps(content) -> bytes:
+    # Same settings as starlette's JSONResponse
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def run(path: str, repeat: int) -> None:
+    with open(path, "r", encoding="utf-8") as f:
+        segments = json.load(f)
+
+    # What /video/{id}/quizzes-style endpoints return: the documents wrapped in a small envelope
+    payload = {"video_id": "bench", "segments": segments, "segment_count": len(segments)}
+    body = stdlib_dumps(payload)
+    print(f"Payload: {len(segments)} segments, {len(body) / 1024:.1f} KiB JSON\n")
+
+    print("Serialization (median ms):")
+    print(f"  json.dumps                     {time_call(lambda: stdlib_dumps(payload), repeat):8.3f}")
+    if jsonable_encoder is not None:
+        print(f"  jsonable_encoder + json.dumps  {time_call(lambda: stdlib_dumps(jsonable_encoder(payload)), repeat):8.3f}")
+    if orjson is not None:
+        print(f"  orjson.dumps                   {time_call(lambda: orjson.dumps(payload), repeat):8.3f}")
+    else:
+        print("  orjson.dumps                   (orjson not installed)")
+
+    print("\nCompression (size KiB, median ms):")
+    for level in (1, 6):
+        compressed = gzip.compress(body, compresslevel=level)
+        print(f"  gzip level {level}                   {len(compressed) / 1024:8.1f} {time_call(lambda: gzip.compress(body, compresslevel=level), repeat):8.3f}")
+    if brotli is not None:
+        for quality in (4, 11):
+            compressed = brotli.compress(body, quality=quality)
+            print(f"  brotli quality {quality:<2}              {len(compressed) / 1024:8.1f} {time_call(lambda: brotli.compress(body, quality=quality), repeat):8.3f}")
+    else:
+        print("  brotli                         (brotli not installed)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default=os.path.join(REPO_ROOT, "chapters.json"))
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(args.path, args.repeat)
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Async load test replaying the student flow from test_quiz_endpoints.py: fetch a video's segments, get a quiz
+for one of them, submit answers to every question. Reports throughput and p50/p95/p99 latency per route.
+
+Answers go one question at a time to /video/submit-answer, as the frontend sends them; --submit-mode bulk sends
+each quiz's answers in one /video/submit-answers request instead.
+
+--scenario polling measures what students watching a video see instead: players poll segment-at-time (and now and
+then the segment list) for --phase-seconds on an idle server, then again while --students keep quiz generation in
+flight, and the two phases' latencies are reported side by side.
+
+Run it against a running API (--api-url, --video-id), or with --spawn to start the quiz service stub and the API
+locally (SQLite storage seeded with the bundled lecture) for the duration of the run.
+
+Usage: python benchmarks/load_test.py --spawn [--students 60] [--flows 3] [--ramp-up 5] [--fresh-ratio 0.1]
+                                      [--submit-mode per-question|bulk] [--stub-generation-latency-ms 2000]
+                                      [--stub-error-rate 0.05] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+import synthetic
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SPAWNED_VIDEO_ID = "load-test-video"
+
+ROUTE_SEGMENTS = "GET /video/{id}/segments"
+ROUTE_SEGMENT_AT_TIME = "GET /video/{id}/segment-at-time"
+ROUTE_QUESTIONS = "POST /video/segment-questions"
+ROUTE_ANSWER = "POST /video/submit-answer"
+ROUTE_ANSWERS = "POST /video/submit-answers"
+
+
+class RouteStats:
+    """Latencies (ms) and response statuses of one route; status 0 counts transport errors and timeouts."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if status == 0 or status >= 400)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+async def timed_request(client: httpx.AsyncClient, stats: Dict[str, RouteStats], route: str, method: str,
+                        url: str, **kwargs) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        response = None
+    stats[route].latencies.append((time.perf_counter() - start) * 1000)
+    stats[route].statuses[response.status_code if response is not None else 0] += 1
+    return response
+
+
+def pick_answers(questions: List[Dict[str, Any]], rng: random.Random) -> List[Dict[str, Any]]:
+    """Answers a class would give: roughly half right, MCQs by option id, short answers as free text."""
+    answers = []
+    for question in questions:
+        correct = rng.random() < 0.5
+        if question.get("type") == "mcq":
+            option_ids = [str(option.get("id")) for option in question.get("options") or []] or ["A", "B", "C", "D"]
+            user_answer = question.get("answer", "A") if correct else rng.choice(option_ids)
+        else:
+            user_answer = question.get("answer", "") if correct else "I am not sure about this one"
+        answers.append({"question_number": question.get("question_number"), "user_answer": user_answer})
+    return answers
+
+
+async def student(client: httpx.AsyncClient, stats: Dict[str, RouteStats], args, rng: random.Random,
+                  completed: Counter) -> None:
+    """One student: args.flows times segments -> quiz -> answers. A failed step ends that flow."""
+    for _ in range(args.flows):
+        response = await timed_request(client, stats, ROUTE_SEGMENTS, "GET", f"/video/{args.video_id}/segments")
+        if response is None or response.status_code != 200:
+            continue
+        segments = response.json().get("segments") or []
+        if not segments:
+            continue
+        segment_id = int(rng.choice(segments)["segment_id"])
+
+        response = await timed_request(client, stats, ROUTE_QUESTIONS, "POST", "/video/segment-questions", json={
+            "video_id": args.video_id,
+            "segment_id": segment_id,
+            "num_questions": args.num_questions,
+            "fresh": rng.random() < args.fresh_ratio
+        })
+        if response is None or response.status_code != 200:
+            continue
+        body = response.json()
+        questions = (body.get("quiz_data") or {}).get("questions") or []
+        if not questions or not body.get("quiz_id"):
+            continue
+
+        answers = pick_answers(questions, rng)
+        if args.submit_mode == "bulk":
+            response = await timed_request(client, stats, ROUTE_ANSWERS, "POST", "/video/submit-answers", json={
+                "video_id": args.video_id,
+                "quiz_id": body["quiz_id"],
+                "answers": answers
+            })
+            answered = response is not None and response.status_code == 200
+        else:
+            answered = True
+            for answer in answers:
+                response = await timed_request(client, stats, ROUTE_ANSWER, "POST", "/video/submit-answer", json={
+                    "video_id": args.video_id,
+                    "quiz_id": body["quiz_id"],
+                    **answer
+                })
+                if response is None or response.status_code != 200:
+                    answered = False
+                    break
+        if answered:
+            completed["flows"] += 1
+
+
+async def run_load(args) -> Dict[str, Any]:
+    stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+    completed: Counter = Counter()
+    limits = httpx.Limits(max_connections=args.students, max_keepalive_connections=args.students)
+    async with httpx.AsyncClient(base_url=args.api_url, limits=limits, timeout=args.timeout) as client:
+
+        async def delayed_student(index: int) -> None:
+            # Spread the arrivals over the ramp-up, like a class opening the quiz after a lecture
+            await asyncio.sleep(args.ramp_up * index / max(1, args.students))
+            await student(client, stats, args, random.Random(args.seed * 100_003 + index), completed)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(delayed_student(i) for i in range(args.students)))
+        elapsed = time.perf_counter() - start
+    return {"stats": stats, "elapsed": elapsed, "flows": completed["flows"]}
+
+
+def summarize_route(route_stats: RouteStats, elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(route_stats.latencies)
+    return {
+        "requests": len(latencies),
+        "errors": route_stats.errors,
+        "statuses": {str(status): count for status, count in sorted(route_stats.statuses.items())},
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else 0.0
+    }
+
+
+def summarize(run: Dict[str, Any]) -> Dict[str, Any]:
+    routes = {route: summarize_route(run["stats"][route], run["elapsed"])
+              for route in (ROUTE_SEGMENTS, ROUTE_QUESTIONS, ROUTE_ANSWER, ROUTE_ANSWERS) if route in run["stats"]}
+    return {"elapsed_seconds": run["elapsed"], "completed_flows": run["flows"], "routes": routes}
+
+
+def print_report(summary: Dict[str, Any], args) -> None:
+    elapsed = summary["elapsed_seconds"]
+    print(f"\n{args.students} students x {args.flows} flows in {elapsed:.1f}s: {summary['completed_flows']} flows "
+          f"completed ({summary['completed_flows'] / elapsed if elapsed else 0:.2f} flows/s)\n")
+    print(f"{'route':32} {'requests':>8} {'errors':>7} {'req/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for route, r in summary["routes"].items():
+        print(f"{route:32} {r['requests']:8d} {r['errors']:7d} {r['throughput_rps']:7.2f} "
+              f"{r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['p99_ms']:9.1f} {r['max_ms']:9.1f}")
+    for route, r in summary["routes"].items():
+        failed = {status: count for status, count in r["statuses"].items() if status == "0" or int(status) >= 400}
+        if failed:
+            print(f"  {route} failures by status: {failed}")
+
+
+async def player(client: httpx.AsyncClient, stats: Dict[str, RouteStats], args, rng: random.Random,
+                 duration: float, stop: asyncio.Event) -> None:
+    """One student watching: segment-at-time every --poll-interval as playback advances, the segment list every 5th poll."""
+    position = rng.uniform(0, duration)
+    await asyncio.sleep(rng.uniform(0, args.poll_interval))
+    polls = 0
+    while not stop.is_set():
+        await timed_request(client, stats, ROUTE_SEGMENT_AT_TIME, "GET", f"/video/{args.video_id}/segment-at-time",
+                            params={"timestamp": round(position, 3)})
+        if polls % 5 == 0:
+            await timed_request(client, stats, ROUTE_SEGMENTS, "GET", f"/video/{args.video_id}/segments")
+        polls += 1
+        position = (position + args.poll_interval) % duration if duration else 0.0
+        await asyncio.sleep(args.poll_interval)
+
+
+async def quiz_generator(client: httpx.AsyncClient, stats: Dict[str, RouteStats], args, rng: random.Random,
+                         segment_ids: List[int], stop: asyncio.Event) -> None:
+    """Keeps one fresh (never cached) quiz generation in flight until stop is set."""
+    while not stop.is_set():
+        await timed_request(client, stats, ROUTE_QUESTIONS, "POST", "/video/segment-questions", json={
+            "video_id": args.video_id,
+            "segment_id": rng.choice(segment_ids),
+            "num_questions": args.num_questions,
+            "fresh": True
+        })
+
+
+async def run_polling(args) -> Dict[str, Any]:
+    """Player polling on an idle server, then with args.students quiz generations constantly in flight."""
+    connections = args.pollers + args.students
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=args.api_url, limits=limits, timeout=args.timeout) as client:
+        response = await client.get(f"/video/{args.video_id}/segments")
+        response.raise_for_status()
+        segments = response.json().get("segments") or []
+        if not segments:
+            raise RuntimeError(f"Video {args.video_id} has no segments")
+        duration = max(segment.get("segment_end_timestamp", 0.0) for segment in segments)
+        segment_ids = [int(segment["segment_id"]) for segment in segments]
+
+        phases = {}
+        for phase, generators in (("idle", 0), ("loaded", args.students)):
+            stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+            stop = asyncio.Event()
+            tasks = [asyncio.create_task(player(client, stats, args, random.Random(args.seed * 100_003 + i), duration, stop))
+                     for i in range(args.pollers)]
+            tasks += [asyncio.create_task(quiz_generator(client, stats, args, random.Random(args.seed * 200_003 + i),
+                                                         segment_ids, stop))
+                      for i in range(generators)]
+            start = time.perf_counter()
+            await asyncio.sleep(args.phase_seconds)
+            stop.set()
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - start
+            phases[phase] = {route: summarize_route(route_stats, elapsed) for route, route_stats in stats.items()}
+    return phases
+
+
+def print_polling_report(phases: Dict[str, Any], args) -> None:
+    print(f"\n{args.pollers} players polling every {args.poll_interval:g}s, {args.phase_seconds:g}s per phase; "
+          f"loaded = {args.students} quiz generations kept in flight\n")
+    print(f"{'route':34} {'phase':7} {'requests':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for route in (ROUTE_SEGMENT_AT_TIME, ROUTE_SEGMENTS, ROUTE_QUESTIONS):
+        for phase in ("idle", "loaded"):
+            r = phases[phase].get(route)
+            if r is None:
+                continue
+            print(f"{route:34} {phase:7} {r['requests']:8d} {r['errors']:7d} "
+                  f"{r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['p99_ms']:9.1f} {r['max_ms']:9.1f}")
+    for route in (ROUTE_SEGMENT_AT_TIME, ROUTE_SEGMENTS):
+        idle, loaded = phases["idle"].get(route), phases["loaded"].get(route)
+        if idle and loaded and idle["p95_ms"]:
+            print(f"  {route} p95 under load: {loaded['p95_ms'] / idle['p95_ms']:.1f}x idle")
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode} before it was ready")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} was not ready after {timeout:.0f}s")
+
+
+@contextlib.contextmanager
+def spawned_services(args):
+    """Quiz service stub plus the API on SQLite storage seeded with the bundled lecture, stopped on exit."""
+    with tempfile.TemporaryDirectory(prefix="load_test_") as workdir:
+        database = os.path.join(workdir, "lectureai.sqlite3")
+        sys.path.append(synthetic.API_SERVER_DIR)
+        from storage import SQLiteRepository
+        synthetic.seed_repository(SQLiteRepository(database),
+                                  SPAWNED_VIDEO_ID, synthetic.scale_segments(synthetic.load_chapters(), args.scale))
+
+        stub_url = f"http://127.0.0.1:{args.stub_port}"
+        stub_env = dict(os.environ,
+                        QUIZ_STUB_GENERATION_LATENCY_MS=str(args.stub_generation_latency_ms),
+                        QUIZ_STUB_VALIDATION_LATENCY_MS=str(args.stub_validation_latency_ms),
+                        QUIZ_STUB_JITTER=str(args.stub_jitter),
+                        QUIZ_STUB_ERROR_RATE=str(args.stub_error_rate),
+                        QUIZ_STUB_SEED=str(args.seed))
+        api_env = dict(os.environ,
+                       STORAGE_BACKEND="sqlite",
+                       STORAGE_SQLITE_PATH=database,
+                       QUIZ_SERVICE_URL=stub_url,
+                       SEARCH_INDEX_WARM="false",
+                       EMBEDDING_INDEX_DIR=os.path.join(workdir, "embedding_index"))
+        uvicorn = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--log-level", "warning"]
+        processes = []
+        try:
+            processes.append(subprocess.Popen(uvicorn + ["--port", str(args.stub_port), "quiz_service_stub:app"],
+                                              cwd=BENCHMARKS_DIR, env=stub_env))
+            wait_until_up(f"{stub_url}/health", processes[-1])
+            processes.append(subprocess.Popen(uvicorn + ["--port", str(args.api_port), "main:app"],
+                                              cwd=synthetic.API_SERVER_DIR, env=api_env,
+                                              stdout=None if args.verbose else subprocess.DEVNULL))
+            api_url = f"http://127.0.0.1:{args.api_port}"
+            wait_until_up(f"{api_url}/", processes[-1])
+            yield api_url
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+def main(args) -> int:
+    run_scenario = run_polling if args.scenario == "polling" else run_load
+    if args.spawn:
+        args.video_id = args.video_id or SPAWNED_VIDEO_ID
+        with spawned_services(args) as api_url:
+            args.api_url = api_url
+            print(f"Stub: generation {args.stub_generation_latency_ms:.0f} ms, validation "
+                  f"{args.stub_validation_latency_ms:.0f} ms, +/-{args.stub_jitter:.0%} jitter, "
+                  f"{args.stub_error_rate:.0%} errors")
+            run = asyncio.run(run_scenario(args))
+    elif not args.video_id:
+        print("--video-id is required unless --spawn is given")
+        return 2
+    else:
+        run = asyncio.run(run_scenario(args))
+
+    if args.scenario == "polling":
+        summary = {"phases": run}
+        print_polling_report(run, args)
+    else:
+        summary = summarize(run)
+        print_report(summary, args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k != "json"}, **summary}, f, indent=2)
+        print(f"\nWrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=("flow", "polling"), default="flow",
+                        help="Student quiz flows, or player polling idle vs. with quiz generation in flight")
+    parser.add_argument("--video-id", default=None, help="Video to quiz on (a seeded one with --spawn)")
+    parser.add_argument("--students", type=int, default=60, help="Concurrent simulated students")
+    parser.add_argument("--flows", type=int, default=3, help="Segment -> quiz -> answers flows per student")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which the students arrive")
+    parser.add_argument("--num-questions", type=int, default=3)
+    parser.add_argument("--fresh-ratio", type=float, default=0.0,
+                        help="Fraction of quiz requests that bypass the quiz cache and always generate")
+    parser.add_argument("--submit-mode", choices=("per-question", "bulk"), default="per-question",
+                        help="One /video/submit-answer request per question (as the frontend does), or one "
+                             "/video/submit-answers request per quiz")
+    parser.add_argument("--pollers", type=int, default=30, help="Players polling segment-at-time (polling scenario)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between a player's polls")
+    parser.add_argument("--phase-seconds", type=float, default=15.0, help="Length of the idle and loaded phases")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Client timeout per request, seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default=None, help="Also write the summary to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the spawned API's output")
+    spawn = parser.add_argument_group("local services (--spawn)")
+    spawn.add_argument("--spawn", action="store_true", help="Start the quiz service stub and the API for this run")
+    spawn.add_argument("--scale", type=int, default=1, help="Size of the seeded lecture, in copies of chapters.json")
+    spawn.add_argument("--api-port", type=int, default=8000)
+    spawn.add_argument("--stub-port", type=int, default=8080)
+    spawn.add_argument("--stub-generation-latency-ms", type=float, default=2000.0)
+    spawn.add_argument("--stub-validation-latency-ms", type=float, default=500.0)
+    spawn.add_argument("--stub-jitter", type=float, default=0.25)
+    spawn.add_argument("--stub-error-rate", type=float, default=0.0)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Kotlin quiz service (localhost:8080) for load tests: same routes and response shapes,
+no LLM calls, with configurable latency and error injection.
+
+Usage: python benchmarks/quiz_service_stub.py [--port 8080] [--generation-latency-ms 2000] [--validation-latency-ms 500]
+                                              [--jitter 0.25] [--error-rate 0.0] [--seed N]
+
+The same settings can be given as environment variables (QUIZ_STUB_GENERATION_LATENCY_MS, ...) when the app is
+served with uvicorn directly: uvicorn quiz_service_stub:app --port 8080
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import uuid
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+settings = {
+    "generation_latency_ms": float(os.environ.get("QUIZ_STUB_GENERATION_LATENCY_MS", "2000")),
+    "validation_latency_ms": float(os.environ.get("QUIZ_STUB_VALIDATION_LATENCY_MS", "500")),
+    # Each latency is drawn uniformly from +/- jitter around its mean
+    "jitter": float(os.environ.get("QUIZ_STUB_JITTER", "0.25")),
+    # Fraction of requests answered with a 500, after the usual latency
+    "error_rate": float(os.environ.get("QUIZ_STUB_ERROR_RATE", "0")),
+}
+rng = random.Random(os.environ.get("QUIZ_STUB_SEED"))
+counters = {"requests": 0, "errors": 0}
+
+app = FastAPI(title="Quiz service stub")
+
+
+async def simulate(latency_ms: float):
+    """Sleep like a model call would and decide whether this request fails; returns an error response or None."""
+    counters["requests"] += 1
+    jitter = settings["jitter"]
+    await asyncio.sleep(max(0.0, latency_ms * rng.uniform(1 - jitter, 1 + jitter)) / 1000)
+    if rng.random() < settings["error_rate"]:
+        counters["errors"] += 1
+        return JSONResponse(status_code=500, content={"error": "injected_error", "message": "Injected failure"})
+    return None
+
+
+def stub_questions(segments: List[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+    """Alternating MCQ and short-answer questions built from the segments' transcript lines."""
+    lines = [entry.get("text", "") for segment in segments for entry in segment.get("transcript") or []] or [""]
+    title = segments[0].get("segment_title", "this segment") if segments else "this segment"
+    questions = []
+    for i in range(count):
+        line = lines[(i * 7) % len(lines)].strip()
+        if i % 2 == 0:
+            questions.append({
+                "type": "mcq",
+                "question": f"Which statement about {title} was made in the lecture?",
+                "options": [{"id": "A", "text": line or "The lecture statement"}, {"id": "B", "text": "A distractor"},
+                            {"id": "C", "text": "Another distractor"}, {"id": "D", "text": "None of these"}],
+                "answer": "A",
+                "explanation": "Stated directly in the segment.",
+                "difficulty": "easy"
+            })
+        else:
+            questions.append({
+                "type": "short_answer",
+                "question": f"Summarize this point from {title}.",
+                "answer": line,
+                "explanation": "Paraphrases of the transcript line are accepted.",
+                "difficulty": "medium"
+            })
+    return questions
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy", "version": "stub"}
+
+
+@app.get("/stub/stats")
+async def stats():
+    return {**counters, **settings}
+
+
+@app.post("/quiz/structured")
+async def generate_structured_quiz(request: Request):
+    payload = await request.json()
+    error = await simulate(settings["generation_latency_ms"])
+    if error is not None:
+        return error
+    segments = payload.get("segments") or []
+    duration = max((s.get("segment_end_timestamp", 0.0) for s in segments), default=0.0) - \
+        min((s.get("segment_start_timestamp", 0.0) for s in segments), default=0.0)
+    return {
+        "quiz_id": payload.get("quiz_id") or str(uuid.uuid4()),
+        "source_window_minutes": int(duration / 60),
+        "questions": stub_questions(segments, payload.get("questions_per_segment") or 3)
+    }
+
+
+@app.post("/quiz/validate-answer")
+async def validate_answer(request: Request):
+    payload = await request.json()
+    error = await simulate(settings["validation_latency_ms"])
+    if error is not None:
+        return error
+    correct = set(str(payload.get("correct_answer", "")).lower().split())
+    given = set(str(payload.get("user_answer", "")).lower().split())
+    is_correct = bool(correct) and len(correct & given) / len(correct) >= 0.5
+    return {"is_correct": is_correct, "feedback": "Matches the lecture." if is_correct else "Not quite."}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--generation-latency-ms", type=float, default=settings["generation_latency_ms"])
+    parser.add_argument("--validation-latency-ms", type=float, default=settings["validation_latency_ms"])
+    parser.add_argument("--jitter", type=float, default=settings["jitter"])
+    parser.add_argument("--error-rate", type=float, default=settings["error_rate"])
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    settings.update(generation_latency_ms=args.generation_latency_ms, validation_latency_ms=args.validation_latency_ms,
+                    jitter=args.jitter, error_rate=args.error_rate)
+    if args.seed is not None:
+        rng.seed(args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
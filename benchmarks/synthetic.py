@@ -0,0 +1,138 @@
+"""
+Synthetic inputs for the benchmarks, built from the bundled chapters.json.
+
+A scale of N repeats the lecture N times back to back (timestamps shifted, segments renumbered), so inputs grow
+the way a longer recording would instead of with N copies of the same short document.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAPTERS_PATH = os.path.join(REPO_ROOT, "chapters.json")
+API_SERVER_DIR = os.path.join(REPO_ROOT, "api-server")
+
+# Lines the transcription model emits on silence; parse_lines should drop them
+GARBAGE_LINES = ["ag ag ag ag ag ag ag ag", "'''''''''''''''''''''''''", "gats"]
+
+
+def load_chapters(path: str = CHAPTERS_PATH) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def lecture_duration(segments: List[Dict[str, Any]]) -> float:
+    ends = [entry["end_timestamp"] for segment in segments for entry in segment.get("transcript", [])]
+    ends.extend(segment.get("segment_end_timestamp", 0.0) for segment in segments)
+    return max(ends, default=0.0)
+
+
+def scale_segments(segments: List[Dict[str, Any]], scale: int) -> List[Dict[str, Any]]:
+    """The lecture repeated scale times, each copy starting where the previous one ended."""
+    duration = lecture_duration(segments)
+    scaled = []
+    for copy in range(scale):
+        offset = copy * duration
+        for segment in segments:
+            scaled.append({
+                "segment_number": len(scaled) + 1,
+                "segment_title": segment["segment_title"] if scale == 1 else f"{segment['segment_title']} ({copy + 1})",
+                "segment_start_timestamp": segment["segment_start_timestamp"] + offset,
+                "segment_end_timestamp": segment["segment_end_timestamp"] + offset,
+                "transcript": [{
+                    "start_timestamp": entry["start_timestamp"] + offset,
+                    "end_timestamp": entry["end_timestamp"] + offset,
+                    "text": entry["text"]
+                } for entry in segment.get("transcript", [])]
+            })
+    return scaled
+
+
+def format_timestamp(seconds: float) -> str:
+    """Seconds as HH:MM:SS.mmm, the format the transcription step writes."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def transcript_lines(segments: List[Dict[str, Any]], garbage_every: int = 25) -> List[str]:
+    """Timestamped transcript lines as transcribe_audio writes them, with a garbage line every garbage_every lines."""
+    lines = []
+    for segment in segments:
+        for entry in segment.get("transcript", []):
+            start, end = format_timestamp(entry["start_timestamp"]), format_timestamp(entry["end_timestamp"])
+            if garbage_every and len(lines) % garbage_every == garbage_every - 1:
+                lines.append(f"[{start} -> {end}] {GARBAGE_LINES[len(lines) % len(GARBAGE_LINES)]}")
+            lines.append(f"[{start} -> {end}] {entry['text']}")
+    return lines
+
+
+def llm_chapters(segments: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Chapters in the shape the submit_chapters tool returns them, as input to assemble_chapters."""
+    return [{
+        "title": segment["segment_title"],
+        "start_timestamp": format_timestamp(segment["segment_start_timestamp"]),
+        "end_timestamp": format_timestamp(segment["segment_end_timestamp"])
+    } for segment in segments]
+
+
+def quiz_document(video_id: str, segment: Dict[str, Any]) -> Dict[str, Any]:
+    """A stored quiz for a segment, with one MCQ and one short-answer question."""
+    number = segment["segment_number"]
+    return {
+        "quiz_id": f"quiz-{video_id}-{number}",
+        "video_id": video_id,
+        "segment_id": number,
+        "source_window_minutes": 5,
+        "created_at": "2024-01-01T00:00:00",
+        "questions": [
+            {
+                "question_number": 1,
+                "type": "mcq",
+                "question": f"What is the main idea of {segment['segment_title']}?",
+                "options": [{"id": option_id, "text": text} for option_id, text in
+                            zip("ABCD", ["The first idea", "The second idea", "The third idea", "None of these"])],
+                "answer": "A",
+                "explanation": "It is introduced at the start of the segment.",
+                "difficulty": "easy"
+            },
+            {
+                "question_number": 2,
+                "type": "short_answer",
+                "question": f"Explain {segment['segment_title']} in one sentence.",
+                "answer": segment["transcript"][0]["text"] if segment.get("transcript") else "",
+                "explanation": "",
+                "difficulty": "medium"
+            }
+        ]
+    }
+
+
+def seed_repository(repository, video_id: str, segments: List[Dict[str, Any]]) -> None:
+    """Store a completed video with its segments, summaries and one quiz per segment, as ingestion would leave it."""
+    if API_SERVER_DIR not in sys.path:
+        sys.path.append(API_SERVER_DIR)
+    from storage import outline_entry
+    from summaries import build_summaries
+
+    repository.create_video(video_id, {
+        "lecture_url": "https://example.com/lecture",
+        "lecture_title": "Benchmark Lecture",
+        "lecture_topic": "Deep Learning",
+        "status": "processing",
+        "created_at": datetime.now().isoformat()
+    })
+    repository.write_segment_summaries(video_id, build_summaries(segments))
+    repository.write_segments(video_id, segments, {
+        "status": "completed",
+        "segment_count": len(segments),
+        "segment_outline": [outline_entry(str(segment["segment_number"]), segment) for segment in segments],
+        "processed_at": datetime.now().isoformat()
+    })
+    for segment in segments:
+        repository.save_quiz(video_id, quiz_document(video_id, segment))
@@ -1,5 +1,7 @@
+import glob
 import os
 import sys
+from typing import Optional
 
 # Add current directory to path so we can import local modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,61 +13,117 @@ if transcription_dir not in sys.path:
     sys.path.append(transcription_dir)
 
 try:
-    from transcription_pipeline import download_panopto_audio, transcribe_audio
+    from transcription_pipeline import download_panopto_audio, extract_audio, transcribe_audio
     from process_transcript import process_transcript_file
+    from cancellation import check_cancelled
 except ImportError as e:
     print(f"Error importing modules: {e}")
     print("Ensure transcription_pipeline.py and process_transcript.py are in the same directory.")
     sys.exit(1)
 
-def get_data(video_url: str, output_json_path: str = "chapters.json"):
+def get_data(video_url: str, output_json_path: Optional[str] = None, cancel_event=None):
     """
     Full pipeline: Video URL -> Audio -> Transcript -> Chapters JSON
+    Setting cancel_event (threading.Event) stops the pipeline at the next step, raising PipelineCancelled.
+    Intermediate files are named after output_json_path, so concurrent jobs never share them, and removed afterwards.
+    Without output_json_path the output goes to chapters.json and the intermediate files (transcript, chapters.md)
+    are kept, as when running this script by hand.
     """
     print(f"--- Starting Pipeline for: {video_url} ---")
-    
-    # Define file paths
-    # We use a fixed name for simplicity, or we could derive from video title if possible
-    # For now, let's keep it consistent with the existing scripts
-    audio_output = "lecture_audio.mp3"
-    transcript_base = "full_transcript"
-    transcript_file_with_ts = f"{transcript_base}_with_timestamps.txt"
-    chapters_md = "chapters.md"
-    chapters_json = output_json_path
 
-    # Step 1: Download Audio
-    if not os.path.exists(audio_output):
+    keep_work_files = output_json_path is None
+    output_json_path = output_json_path or "chapters.json"
+    work_base = os.path.splitext(output_json_path)[0]
+    audio_output = f"{work_base}_audio.mp3"
+    transcript_base = f"{work_base}_transcript"
+    chapters_md = f"{work_base}.md"
+
+    try:
+        # Step 1: Download Audio
         print(f"Downloading audio to {audio_output}...")
         try:
-            download_panopto_audio(video_url, audio_output)
+            download_panopto_audio(video_url, audio_output, cancel_event=cancel_event)
         except Exception as e:
             print(f"Failed to download audio: {e}")
             raise
-    else:
-        print(f"Audio file {audio_output} already exists. Skipping download.")
+
+        check_cancelled(cancel_event)
+
+        return transcribe_and_chapter(audio_output, transcript_base, chapters_md, output_json_path, cancel_event)
+    finally:
+        if not keep_work_files:
+            remove_work_files(f"{work_base}_audio", transcript_base, chapters_md)
+
+
+def remove_work_files(audio_base: str, transcript_base: str, chapters_md: str) -> None:
+    """
+    Delete a job's intermediate files, including partial downloads (audio_base.*) left by a cancelled job.
+    Runs in finally blocks, so a file that cannot be removed is reported rather than raised over the job's own error.
+    """
+    paths = glob.glob(f"{glob.escape(audio_base)}.*")
+    paths += [f"{transcript_base}.txt", f"{transcript_base}_with_timestamps.txt",
+              f"{transcript_base}_word_timestamps.txt", chapters_md]
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Failed to remove work file {path}: {e}")
+
+
+def transcribe_and_chapter(audio_path: str, transcript_base: str, chapters_md: str, chapters_json: str, cancel_event=None):
+    """Steps 2 and 3: Audio -> Transcript -> Chapters JSON"""
+    transcript_file_with_ts = f"{transcript_base}_with_timestamps.txt"
 
     # Step 2: Transcribe
     if not os.path.exists(transcript_file_with_ts):
         print(f"Transcribing audio to {transcript_file_with_ts}...")
         try:
-            transcribe_audio(audio_output, output_base_name=transcript_base)
+            transcribe_audio(audio_path, output_base_name=transcript_base, cancel_event=cancel_event)
         except Exception as e:
              print(f"Failed to transcribe: {e}")
              raise
     else:
         print(f"Transcript file {transcript_file_with_ts} already exists. Skipping transcription.")
 
+    check_cancelled(cancel_event)
+
     # Step 3: Process Transcript into Chapters
     print(f"Processing transcript to generate chapters...")
     try:
-        chapters_data = process_transcript_file(transcript_file_with_ts, chapters_md, chapters_json)
+        chapters_data = process_transcript_file(transcript_file_with_ts, chapters_md, chapters_json, cancel_event=cancel_event)
     except Exception as e:
         print(f"Failed to process transcript: {e}")
         raise
 
-    print(f"Pipeline Complete! Output in {output_json_path}")
+    print(f"Pipeline Complete! Output in {chapters_json}")
     return chapters_data
 
+
+def get_data_from_file(media_path: str, output_json_path: Optional[str] = None, cancel_event=None):
+    """
+    Pipeline for a local video file: Video -> Audio -> Transcript -> Chapters JSON, with no network access.
+    Intermediate files are named after output_json_path and removed afterwards; without output_json_path,
+    as for get_data, the output goes to chapters.json and they are kept.
+    """
+    print(f"--- Starting Pipeline for file: {media_path} ---")
+
+    keep_work_files = output_json_path is None
+    output_json_path = output_json_path or "chapters.json"
+    work_base = os.path.splitext(output_json_path)[0]
+    audio_output = f"{work_base}_audio.wav"
+    transcript_base = f"{work_base}_transcript"
+    chapters_md = f"{work_base}.md"
+
+    try:
+        extract_audio(media_path, audio_output, cancel_event=cancel_event)
+        check_cancelled(cancel_event)
+        return transcribe_and_chapter(audio_output, transcript_base, chapters_md, output_json_path, cancel_event)
+    finally:
+        if not keep_work_files:
+            remove_work_files(f"{work_base}_audio", transcript_base, chapters_md)
+
 if __name__ == "__main__":
     # Example URL
     test_url = "https://imperial.cloud.panopto.eu/Panopto/Pages/Viewer.aspx?id=ba149b5d-e639-4525-8a58-b3d40083a406"
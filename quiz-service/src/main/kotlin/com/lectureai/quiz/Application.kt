@@ -193,7 +193,8 @@ fun Application.configureApplication(apiKey: String) {
             // Build optimized prompt
             val optimizedTranscript = TranscriptProcessor.buildOptimizedPrompt(
                 processed,
-                request.targetSegment
+                request.targetSegment,
+                request.priorContext
             )
             
             logger.info { 
@@ -30,7 +30,8 @@ data class StructuredQuizRequest(
     val segments: List<TranscriptSegment>,
     @SerialName("quiz_id") val quizId: String? = null,
     @SerialName("target_segment") val targetSegment: String? = null, // Optional: generate quiz for specific segment
-    @SerialName("questions_per_segment") val questionsPerSegment: Int? = null // Optional: distribute questions
+    @SerialName("questions_per_segment") val questionsPerSegment: Int? = null, // Optional: distribute questions
+    @SerialName("prior_context") val priorContext: String? = null // Optional: summary of the segments before these
 )
 
 /**
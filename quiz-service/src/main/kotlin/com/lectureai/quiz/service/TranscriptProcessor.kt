@@ -129,7 +129,11 @@ object TranscriptProcessor {
      * Build an optimized prompt for the LLM based on processed transcript.
      * This creates a structured summary that helps the LLM generate better questions.
      */
-    fun buildOptimizedPrompt(processed: ProcessedTranscript, targetSegment: String? = null): String {
+    fun buildOptimizedPrompt(
+        processed: ProcessedTranscript,
+        targetSegment: String? = null,
+        priorContext: String? = null
+    ): String {
         val sb = StringBuilder()
         
         sb.appendLine("Generate a quiz from the following lecture content.")
@@ -142,6 +146,13 @@ object TranscriptProcessor {
         }
         sb.appendLine()
         
+        // Summary of what came before, so questions can build on it without being about it
+        if (!priorContext.isNullOrBlank()) {
+            sb.appendLine("EARLIER IN THIS LECTURE (background only, do not ask about it directly):")
+            sb.appendLine(priorContext)
+            sb.appendLine()
+        }
+        
         // Add content - either specific segment or all
         if (targetSegment != null) {
             val segment = processed.segments.find { 
@@ -0,0 +1,11 @@
+class PipelineCancelled(Exception):
+    """Raised inside the pipeline when the job it is running for has been cancelled."""
+
+
+def check_cancelled(cancel_event) -> None:
+    """
+    Raise PipelineCancelled if cancel_event (a threading.Event or None) has been set.
+    Called between pipeline steps so a cancelled job stops at the next safe point.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise PipelineCancelled("Job was cancelled")
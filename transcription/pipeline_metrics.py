@@ -0,0 +1,59 @@
+import time
+from contextlib import contextmanager
+
+# prometheus_client is optional so the pipeline scripts still run standalone without it
+try:
+    from prometheus_client import Counter, Histogram
+except ImportError:
+    Counter = Histogram = None
+
+if Histogram is not None:
+    PIPELINE_STAGE_SECONDS = Histogram(
+        "lectureai_pipeline_stage_seconds",
+        "Time spent in each lecture pipeline stage",
+        ["stage"],
+        buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+    )
+    PIPELINE_BYTES = Counter(
+        "lectureai_pipeline_bytes_total",
+        "Bytes downloaded, uploaded or written by the lecture pipeline",
+        ["kind"],
+    )
+    LLM_TOKENS = Counter(
+        "lectureai_llm_tokens_total",
+        "Tokens used by pipeline LLM calls",
+        ["direction"],
+    )
+else:
+    PIPELINE_STAGE_SECONDS = PIPELINE_BYTES = LLM_TOKENS = None
+
+
+@contextmanager
+def stage_timer(stage: str, timings: dict = None):
+    """
+    Time a pipeline stage, e.g. `with stage_timer("transcription"): ...`.
+    The duration is observed on the stage histogram, printed, and added to timings[stage] when given.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if PIPELINE_STAGE_SECONDS is not None:
+            PIPELINE_STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+        print(f"[timing] stage={stage} seconds={elapsed:.3f}")
+
+
+def record_bytes(kind: str, num_bytes: int) -> None:
+    if PIPELINE_BYTES is not None and num_bytes:
+        PIPELINE_BYTES.labels(kind=kind).inc(num_bytes)
+
+
+def record_llm_usage(usage) -> None:
+    """Count tokens from an Anthropic response's usage block."""
+    if LLM_TOKENS is None or usage is None:
+        return
+    LLM_TOKENS.labels(direction="input").inc(getattr(usage, "input_tokens", 0) or 0)
+    LLM_TOKENS.labels(direction="output").inc(getattr(usage, "output_tokens", 0) or 0)
@@ -5,6 +5,9 @@ import math
 import json
 from collections import Counter
 
+from cancellation import check_cancelled
+from pipeline_metrics import stage_timer, record_llm_usage
+
 # --- CONFIGURATION ---
 input_file = "full_transcript_with_timestamps.txt"
 output_file = "chapters.md"
@@ -113,13 +116,67 @@ def parse_lines(file_path):
                 
     return valid_lines
 
-def process_transcript_file(input_file_path, output_md_path, output_json_path):
+def assemble_chapters(all_chapters, valid_lines):
+    """
+    Builds the markdown and JSON chapter outputs from Claude's chapters and the valid transcript lines.
+    Returns (final_md, chapters_json_data).
+    """
+    final_md = "# Summary\n\n(Generated from segmented processing)\n\n"
+    chapters_json_data = []
+    
+    # Remove duplicates or overlaps?
+    # Simple approach: Trust the timestamps. Sort by start time.
+    # If Claude returns chapters nicely, we just list them.
+    # Note: If a chapter spans across chunks, we might get "Part 1" and "Part 2".
+    # We can just concatenate them.
+    
+    # Sort chapters by start timestamp
+    all_chapters.sort(key=lambda x: x['start_timestamp'])
+    
+    for idx, ch in enumerate(all_chapters, start=1):
+        title = ch['title']
+        t_start = ch['start_timestamp']
+        t_end = ch['end_timestamp']
+        
+        final_md += f"## {title}\n\n"
+        
+        # Data structure for this chapter
+        chapter_data = {
+            "segment_number": idx,
+            "segment_title": title,
+            "segment_start_timestamp": timestamp_to_seconds(t_start),
+            "segment_end_timestamp": timestamp_to_seconds(t_end),
+            "transcript": []
+        }
+        
+        chapter_text = []
+        for line in valid_lines:
+             # Check for overlap. We use string comparison for HH:MM:SS.mmm which works effectively
+             # providing the format is consistent.
+             if t_start <= line['start'] <= t_end:
+                 chapter_text.append(line['full_line'])
+                 
+                 chapter_data["transcript"].append({
+                     "start_timestamp": line.get('start_seconds', timestamp_to_seconds(line['start'])),
+                     "end_timestamp": line.get('end_seconds', timestamp_to_seconds(line.get('end', ''))),
+                     "text": line['text']
+                 })
+        
+        chapters_json_data.append(chapter_data)
+        
+        if chapter_text:
+             final_md += "\n".join(chapter_text) + "\n\n"
+
+    return final_md, chapters_json_data
+
+def process_transcript_file(input_file_path, output_md_path, output_json_path, cancel_event=None):
     if not os.path.exists(input_file_path):
         print(f"Error: {input_file_path} not found.")
         return []
 
     print("Step 1: Filtering garbage lines...")
-    valid_lines = parse_lines(input_file_path)
+    with stage_timer("garbage_filter"):
+        valid_lines = parse_lines(input_file_path)
     print(f"Found {len(valid_lines)} valid lines.")
     
     # Prepare text for Claude to segment
@@ -193,6 +250,8 @@ TRANSCRIPT:
     all_chapters = []
     
     for i, chunk in enumerate(chunks):
+        # Skip the remaining chunks (and their Claude calls) once the job is cancelled
+        check_cancelled(cancel_event)
         print(f"Processing chunk {i+1}/{len(chunks)} ({len(chunk)} lines)...")
         chunk_text = "\n".join([f"[{l['start']}] {l['text']}" for l in chunk])
         
@@ -208,15 +267,17 @@ TRANSCRIPT CHUNK:
 {chunk_text}
 """
         try:
-            message = client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=4096,
-                temperature=0,
-                system=system_prompt,
-                tools=[tool_schema],
-                tool_choice={"type": "tool", "name": "submit_chapters"},
-                messages=[{"role": "user", "content": chunk_prompt}]
-            )
+            with stage_timer("llm_chunk"):
+                message = client.messages.create(
+                    model="claude-3-haiku-20240307",
+                    max_tokens=4096,
+                    temperature=0,
+                    system=system_prompt,
+                    tools=[tool_schema],
+                    tool_choice={"type": "tool", "name": "submit_chapters"},
+                    messages=[{"role": "user", "content": chunk_prompt}]
+                )
+            record_llm_usage(getattr(message, "usage", None))
             
             tool_input = None
             for block in message.content:
@@ -233,52 +294,9 @@ TRANSCRIPT CHUNK:
 
     print("Step 3: Reconstructing final transcript...")
     
-    final_md = "# Summary\n\n(Generated from segmented processing)\n\n"
-    chapters_json_data = []
-    
-    # Remove duplicates or overlaps?
-    # Simple approach: Trust the timestamps. Sort by start time.
-    # If Claude returns chapters nicely, we just list them.
-    # Note: If a chapter spans across chunks, we might get "Part 1" and "Part 2".
-    # We can just concatenate them.
-    
-    # Sort chapters by start timestamp
-    all_chapters.sort(key=lambda x: x['start_timestamp'])
-    
-    for idx, ch in enumerate(all_chapters, start=1):
-        title = ch['title']
-        t_start = ch['start_timestamp']
-        t_end = ch['end_timestamp']
-        
-        final_md += f"## {title}\n\n"
-        
-        # Data structure for this chapter
-        chapter_data = {
-            "segment_number": idx,
-            "segment_title": title,
-            "segment_start_timestamp": timestamp_to_seconds(t_start),
-            "segment_end_timestamp": timestamp_to_seconds(t_end),
-            "transcript": []
-        }
-        
-        chapter_text = []
-        for line in valid_lines:
-             # Check for overlap. We use string comparison for HH:MM:SS.mmm which works effectively
-             # providing the format is consistent.
-             if t_start <= line['start'] <= t_end:
-                 chapter_text.append(line['full_line'])
-                 
-                 chapter_data["transcript"].append({
-                     "start_timestamp": line.get('start_seconds', timestamp_to_seconds(line['start'])),
-                     "end_timestamp": line.get('end_seconds', timestamp_to_seconds(line.get('end', ''))),
-                     "text": line['text']
-                 })
-        
-        chapters_json_data.append(chapter_data)
-        
-        if chapter_text:
-             final_md += "\n".join(chapter_text) + "\n\n"
-             
+    with stage_timer("chapter_assembly"):
+        final_md, chapters_json_data = assemble_chapters(all_chapters, valid_lines)
+
     with open(output_md_path, "w", encoding="utf-8") as f:
         f.write(final_md)
         
@@ -1,6 +1,11 @@
 import os
+import subprocess
 import yt_dlp
 import mlx_whisper
+from mlx_whisper.audio import load_audio, SAMPLE_RATE
+
+from cancellation import check_cancelled
+from pipeline_metrics import stage_timer, record_bytes
 
 # --- CONFIGURATION ---
 video_url = "https://imperial.cloud.panopto.eu/Panopto/Pages/Viewer.aspx?id=906c7b79-4228-44db-8218-b34b00a5b3eb"
@@ -12,6 +17,11 @@ model_size = "base"
 # Timestamp modes
 WORD_TIMESTAMPS = False  # True = word-level timestamps (slower, more detailed)
 
+# Audio is transcribed in windows of this many seconds so a cancelled job stops between windows.
+# Consecutive windows overlap, so speech cut off at the end of one window is heard whole at the start of the next.
+TRANSCRIBE_WINDOW_SECONDS = 600
+TRANSCRIBE_WINDOW_OVERLAP_SECONDS = 30
+
 
 def format_timestamp(seconds: float) -> str:
     """Format seconds -> HH:MM:SS.mmm"""
@@ -23,7 +33,7 @@ def format_timestamp(seconds: float) -> str:
     return f"{hrs:02d}:{mins:02d}:{secs:06.3f}"
 
 
-def download_panopto_audio(url: str, output_path: str) -> None:
+def download_panopto_audio(url: str, output_path: str, cancel_event=None) -> None:
     print("Step 1: Downloading audio from Panopto...")
 
     base_no_ext = os.path.splitext(output_path)[0]
@@ -43,18 +53,53 @@ def download_panopto_audio(url: str, output_path: str) -> None:
         # Optional: more robust in some cases
         "noplaylist": True,
         "quiet": False,
+        # Raising from a progress hook aborts the download mid-stream
+        "progress_hooks": [lambda _: check_cancelled(cancel_event)],
     }
 
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+    with stage_timer("audio_download"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
         ydl.download([url])
 
     if not os.path.exists(output_path):
         # yt-dlp sometimes outputs slightly different names; you can add logic here if needed.
         raise FileNotFoundError(f"Expected output not found: {output_path}")
+    record_bytes("audio_download", os.path.getsize(output_path))
 
     print(f"Download complete: {output_path}")
 
 
+def extract_audio(media_path: str, output_path: str, cancel_event=None) -> None:
+    """
+    Extract the audio track of a local video (or audio) file with ffmpeg, as 16 kHz mono WAV,
+    which is what Whisper resamples to anyway.
+    """
+    print(f"Step 1: Extracting audio from {media_path}...")
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+        "-i", media_path,
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-c:a", "pcm_s16le",
+        output_path,
+    ]
+    with stage_timer("audio_extract"):
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            while True:
+                try:
+                    _, stderr = proc.communicate(timeout=1)
+                    break
+                except subprocess.TimeoutExpired:
+                    check_cancelled(cancel_event)
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to extract audio: {stderr.decode(errors='replace').strip()}")
+    print(f"Audio extracted: {output_path}")
+
+
 def write_segment_transcript(segments, out_path: str) -> None:
     """Write segment-level timestamps + text."""
     with open(out_path, "w", encoding="utf-8") as f:
@@ -94,16 +139,66 @@ def write_word_transcript(segments, out_path: str) -> None:
                     f.write(f"  [{w_start} → {w_end}] {w_text}\n")
 
 
-def transcribe_audio(audio_path: str, output_base_name: str = "full_transcript"):
+def _transcribe_windows(audio_path: str, cancel_event=None):
+    """
+    Transcribe audio in overlapping windows, returns segments on the full recording's timeline.
+
+    Where two windows overlap, the earlier window's segments are kept up to the middle of the overlap
+    (finishing the one that crosses it) and the later window's take over from there. A later segment is
+    a duplicate when its midpoint falls before the end of the last kept one.
+    """
+    audio = load_audio(audio_path)
+    window_samples = TRANSCRIBE_WINDOW_SECONDS * SAMPLE_RATE
+    step_samples = (TRANSCRIBE_WINDOW_SECONDS - TRANSCRIBE_WINDOW_OVERLAP_SECONDS) * SAMPLE_RATE
+
+    segments = []
+    offset = 0
+    while True:
+        check_cancelled(cancel_event)
+
+        window_start = offset / SAMPLE_RATE
+        # Text heard before this window, so the wording carries on across the cut
+        prompt = " ".join((seg.get("text") or "").strip() for seg in segments[-10:]
+                          if seg.get("end", 0.0) <= window_start)
+        window_result = mlx_whisper.transcribe(
+            audio[offset:offset + window_samples],
+            path_or_hf_repo=f"mlx-community/whisper-{model_size}-mlx",
+            word_timestamps=WORD_TIMESTAMPS,
+            verbose=False,
+            initial_prompt=prompt[-200:] or None,
+        )
+
+        if offset > 0:
+            handover = window_start + TRANSCRIBE_WINDOW_OVERLAP_SECONDS / 2
+            while segments and segments[-1].get("start", 0.0) >= handover:
+                segments.pop()
+        kept_until = segments[-1].get("end", 0.0) if segments else 0.0
+
+        # Window timestamps are relative to the window, shift them back onto the full recording
+        for seg in window_result.get("segments", []):
+            seg["start"] = seg.get("start", 0.0) + window_start
+            seg["end"] = seg.get("end", 0.0) + window_start
+            if (seg["start"] + seg["end"]) / 2 < kept_until:
+                continue
+            for w in seg.get("words", []):
+                w["start"] = w.get("start", 0.0) + window_start
+                w["end"] = w.get("end", 0.0) + window_start
+            segments.append(seg)
+
+        if offset + window_samples >= len(audio):
+            return segments
+        offset += step_samples
+
+
+def transcribe_audio(audio_path: str, output_base_name: str = "full_transcript", cancel_event=None):
     print(f"Step 2: Transcribing with MLX Whisper ({model_size})...")
     print(f"Word timestamps: {WORD_TIMESTAMPS}")
 
-    result = mlx_whisper.transcribe(
-        audio_path,
-        path_or_hf_repo=f"mlx-community/whisper-{model_size}-mlx",
-        word_timestamps=WORD_TIMESTAMPS,
-        verbose=False,
-    )
+    with stage_timer("transcription"):
+        segments = _transcribe_windows(audio_path, cancel_event)
+
+    result = {"text": " ".join(t for t in ((seg.get("text") or "").strip() for seg in segments) if t),
+              "segments": segments}
 
     # Full plain text
     full_text = (result.get("text") or "").strip()
@@ -111,7 +206,6 @@ def transcribe_audio(audio_path: str, output_base_name: str = "full_transcript")
         f.write(full_text + "\n")
 
     # Timestamped output
-    segments = result.get("segments", [])
     if not segments:
         raise RuntimeError("No segments returned by transcription (unexpected).")
 